@@ -11,12 +11,13 @@
 |      |        |      |
 """
 
-from fastapi import FastAPI, Form, UploadFile, File, Response
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, Response, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8000
 
@@ -38,21 +39,26 @@ class YourModel(BaseModel):
 # ============================================
 # TODO: 전체 목록 조회 API 구현
 # - 이미지 BLOB 컬럼은 제외하고 조회
-# - ORDER BY id 정렬
-@app.get("/select_[테이블명s]")
-async def select_all():
-    conn = connect_db()
+# - ORDER BY id 정렬, keyset 페이지네이션 (after=마지막 id, limit=페이지 크기)
+# - pymysql 호출은 블로킹이므로 async def 가 아닌 def 로 선언 (FastAPI 스레드풀에서 실행)
+@router.get("/select_[테이블명s]")
+def select_all(
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
     curs = conn.cursor()
     
     # TODO: SQL 작성
     curs.execute("""
         SELECT id, ... 
         FROM [테이블명] 
+        WHERE id > %s
         ORDER BY id
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
     
-    rows = curs.fetchall()
-    conn.close()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
     
     # TODO: 결과 매핑
     result = [{
@@ -60,7 +66,7 @@ async def select_all():
         # ...
     } for row in rows]
     
-    return {"results": result}
+    return {"results": result, "next_cursor": next_cursor}
 
 
 # ============================================
@@ -68,9 +74,8 @@ async def select_all():
 # ============================================
 # TODO: ID로 단일 조회 API 구현
 # - 존재하지 않으면 에러 응답
-@app.get("/select_[테이블명]/{item_id}")
-async def select_one(item_id: int):
-    conn = connect_db()
+@router.get("/select_[테이블명]/{item_id}")
+def select_one(item_id: int, conn = Depends(get_db)):
     curs = conn.cursor()
     
     # TODO: SQL 작성
@@ -81,7 +86,6 @@ async def select_one(item_id: int):
     """, (item_id,))
     
     row = curs.fetchone()
-    conn.close()
     
     if row is None:
         return {"result": "Error", "message": "[테이블명] not found"}
@@ -101,13 +105,13 @@ async def select_one(item_id: int):
 # - Form 데이터로 받기: 파라미터 = Form(...)
 # - 성공 시 생성된 ID 반환
 # - 에러 처리 필수
-@app.post("/insert_[테이블명]")
-async def insert_one(
+@router.post("/insert_[테이블명]")
+def insert_one(
+    conn = Depends(get_db)
     # TODO: Form 파라미터 정의
     # 예: columnName: str = Form(...)
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -119,7 +123,6 @@ async def insert_one(
         
         conn.commit()
         inserted_id = curs.lastrowid
-        conn.close()
         
         return {"result": "OK", "id": inserted_id}
     except Exception as e:
@@ -131,13 +134,13 @@ async def insert_one(
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_[테이블명]")
-async def update_one(
+@router.post("/update_[테이블명]")
+def update_one(
     item_id: int = Form(...),
+    conn = Depends(get_db)
     # TODO: 수정할 Form 파라미터 정의
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -149,7 +152,6 @@ async def update_one(
         curs.execute(sql, (value1, value2, ..., item_id))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -161,17 +163,15 @@ async def update_one(
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_[테이블명]/{item_id}")
-async def delete_one(item_id: int):
+@router.delete("/delete_[테이블명]/{item_id}")
+def delete_one(item_id: int, conn = Depends(get_db)):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         sql = "DELETE FROM [테이블명] WHERE id=%s"
         curs.execute(sql, (item_id,))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -184,14 +184,12 @@ async def delete_one(item_id: int):
 # TODO: 이미지 바이너리 직접 반환
 # - Response 객체 사용
 # - media_type: "image/jpeg" 또는 "image/png"
-# @app.get("/view_[테이블명]_image/{item_id}")
-# async def view_image(item_id: int):
+# @router.get("/view_[테이블명]_image/{item_id}")
+# def view_image(item_id: int, conn = Depends(get_db)):
 #     try:
-#         conn = connect_db()
 #         curs = conn.cursor()
 #         curs.execute("SELECT [이미지컬럼] FROM [테이블명] WHERE id = %s", (item_id,))
 #         row = curs.fetchone()
-#         conn.close()
 #         
 #         if row is None:
 #             return {"result": "Error", "message": "Not found"}
@@ -213,20 +211,19 @@ async def delete_one(item_id: int):
 # ============================================
 # TODO: 이미지만 별도로 업데이트
 # - UploadFile = File(...) 사용
-# @app.post("/update_[테이블명]_image")
-# async def update_image(
+# @router.post("/update_[테이블명]_image")
+# def update_image(
 #     item_id: int = Form(...),
-#     file: UploadFile = File(...)
+#     file: UploadFile = File(...),
+#     conn = Depends(get_db)
 # ):
 #     try:
-#         image_data = await file.read()
+#         image_data = file.file.read()
 #         
-#         conn = connect_db()
 #         curs = conn.cursor()
 #         sql = "UPDATE [테이블명] SET [이미지컬럼]=%s WHERE id=%s"
 #         curs.execute(sql, (image_data, item_id))
 #         conn.commit()
-#         conn.close()
 #         
 #         return {"result": "OK"}
 #     except Exception as e:
@@ -238,6 +235,8 @@ async def delete_one(item_id: int):
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 [테이블명] API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
@@ -0,0 +1,186 @@
+"""
+인기 상품 순위 (메모리)
+
+최근 WINDOWS 일(7일 / 30일) 동안 팔린 수량으로 상품(Product.id) 순위를 매긴다.
+주문 항목 전체를 요청마다 세지 않도록 일별 판매 수량과 기간별 합계를 메모리에 들고 있는다.
+- 일별 판매 수량 {날짜: {pid: 수량}} 는 가장 긴 기간만큼만 남긴다
+- 기간별 합계 {기간: {pid: 수량}} 는 주문이 들어오면 더하고, 날짜가 바뀌어 기간에서 빠진 날은 뺀다
+- 순위(분류 / 제조사별)는 처음 조회할 때 합계로 만들고, 합계가 바뀌면 다시 만든다 (최대 TOP_K 개)
+- 분류 = ProductBase.pCategory, 제조사 = Product.mfid
+
+- 서버 시작 시 build() 로 최근 주문 이력에서 만든다 (main.py)
+- 주문 생성(/checkout) 커밋 후 record() 로 바로 반영한다
+- 다른 워커의 주문은 REBUILD_INTERVAL 마다 다시 만들면서 반영된다
+"""
+
+import datetime
+import threading
+import time
+
+
+REBUILD_INTERVAL = 300
+WINDOWS = (7, 30)
+TOP_K = 1000
+
+
+class BestsellerIndex:
+    def __init__(self, windows=WINDOWS, top_k=TOP_K, rebuild_interval=REBUILD_INTERVAL):
+        self.windows = tuple(sorted(windows))
+        self.top_k = top_k
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()   # build 는 한 번에 하나만
+        self._today = None
+        self._daily = {}      # 날짜 -> {pid: 수량}
+        self._totals = {window: {} for window in self.windows}   # 기간 -> {pid: 수량}
+        self._products = {}   # pid -> (분류, 제조사)
+        self._rankings = {}   # (기간, 분류, 제조사) -> [(pid, 수량), ...]
+        self._built_at = 0.0
+
+    # ------------------------------------------
+    # 색인
+    # ------------------------------------------
+    def _load_products(self, conn, pids):
+        """분류 / 제조사를 모르는 상품만 읽어 온다"""
+        missing = [pid for pid in pids if pid not in self._products]
+        if not missing:
+            return
+        curs = conn.cursor()
+        curs.execute(f"""
+            SELECT p.id, pb.pCategory, p.mfid
+            FROM Product as p
+            inner join ProductBase as pb
+            on pb.id = p.pbid
+            WHERE p.id IN ({', '.join(['%s'] * len(missing))})
+        """, missing)
+        for pid, category, mfid in curs.fetchall():
+            self._products[pid] = (category, mfid)
+
+    def _add(self, day, pid, quantity):
+        bucket = self._daily.setdefault(day, {})
+        bucket[pid] = bucket.get(pid, 0) + quantity
+        for window in self.windows:
+            if (self._today - day).days < window:
+                totals = self._totals[window]
+                totals[pid] = totals.get(pid, 0) + quantity
+
+    def _advance(self, today):
+        """오늘 날짜로 옮기면서 기간에서 빠진 날의 수량을 합계에서 뺀다"""
+        if self._today is not None and today <= self._today:
+            return
+        previous = self._today
+        self._today = today
+        if previous is None:
+            return
+        for day, bucket in self._daily.items():
+            for window in self.windows:
+                # 어제까지는 기간 안이었고 오늘부터 빠지는 날
+                if (previous - day).days < window <= (today - day).days:
+                    totals = self._totals[window]
+                    for pid, quantity in bucket.items():
+                        left = totals.get(pid, 0) - quantity
+                        if left > 0:
+                            totals[pid] = left
+                        else:
+                            totals.pop(pid, None)
+        longest = self.windows[-1]
+        self._daily = {day: bucket for day, bucket in self._daily.items() if (today - day).days < longest}
+        self._rankings = {}
+
+    def build(self, conn):
+        """최근 가장 긴 기간의 주문 이력으로 새로 만든다 (idx_purchase_time_stamp)"""
+        today = datetime.date.today()
+        since = today - datetime.timedelta(days=self.windows[-1] - 1)
+        curs = conn.cursor()
+        curs.execute("""
+            SELECT CAST(LEFT(pc.timeStamp, 10) AS DATE) AS sale_day, pi.pid, SUM(pi.pcQuantity)
+            FROM PurchaseItem as pi
+            inner join Purchase as pc
+            on pc.id = pi.pcid
+            WHERE pc.timeStamp >= %s AND pc.timeStamp REGEXP '^[0-9]{4}-[0-9]{2}-[0-9]{2}'
+            GROUP BY sale_day, pi.pid
+        """, (since.isoformat(),))
+        rows = [row for row in curs.fetchall() if row[0] is not None and row[0] <= today]
+        with self._lock:
+            self._today = today
+            self._daily = {}
+            self._totals = {window: {} for window in self.windows}
+            self._rankings = {}
+            self._products = {}
+            self._load_products(conn, sorted({row[1] for row in rows}))
+            for day, pid, quantity in rows:
+                self._add(day, pid, int(quantity))
+            self._built_at = time.monotonic()
+
+    def _stale(self):
+        return time.monotonic() - self._built_at > self.rebuild_interval
+
+    def ensure(self, conn):
+        """
+        인덱스가 없거나 오래됐으면 다시 만든다 (search_index.SearchIndex.ensure 와 같은 방식)
+        - 아직 없으면: 한 요청이 만들고 나머지는 기다렸다가 그 결과를 쓴다
+        - 오래됐으면: 먼저 온 한 요청만 다시 만들고 나머지는 기다리지 않고 기존 인덱스를 쓴다
+        """
+        if not self._stale():
+            return
+        if self._built_at == 0.0:
+            with self._build_lock:
+                if self._stale():
+                    self.build(conn)
+            return
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            if self._stale():
+                self.build(conn)
+        finally:
+            self._build_lock.release()
+
+    def record(self, conn, lines, day=None):
+        """
+        주문 반영 (커밋한 뒤에 호출)
+
+        Args:
+            lines: [(pid, 수량), ...]
+            day: 주문 날짜 (기본: 오늘)
+        """
+        day = day or datetime.date.today()
+        with self._lock:
+            self._advance(max(day, datetime.date.today()))
+            self._load_products(conn, sorted({pid for pid, _ in lines}))
+            for pid, quantity in lines:
+                self._add(day, pid, quantity)
+            self._rankings = {}
+
+    # ------------------------------------------
+    # 조회
+    # ------------------------------------------
+    def ranking(self, window, category=None, mfid=None):
+        """
+        기간 안 판매 수량 순위 (많이 팔린 순, 같으면 pid 순, 최대 top_k 개)
+
+        Returns:
+            [(pid, 판매 수량), ...]
+        """
+        if window not in self._totals:
+            raise ValueError(f"기간은 {', '.join(map(str, self.windows))}일 중 하나여야 합니다")
+        with self._lock:
+            self._advance(datetime.date.today())
+            key = (window, category, mfid)
+            ranking = self._rankings.get(key)
+            if ranking is None:
+                ranking = []
+                for pid, quantity in self._totals[window].items():
+                    product_category, product_mfid = self._products.get(pid, (None, None))
+                    if category is not None and product_category != category:
+                        continue
+                    if mfid is not None and product_mfid != mfid:
+                        continue
+                    ranking.append((pid, quantity))
+                ranking.sort(key=lambda item: (-item[1], item[0]))
+                ranking = ranking[:self.top_k]
+                self._rankings[key] = ranking
+            return ranking
+
+
+bestsellers = BestsellerIndex()
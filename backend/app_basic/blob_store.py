@@ -0,0 +1,134 @@
+"""
+이미지 파일 저장소 (내용 주소 기반 blob store)
+
+이미지 바이너리를 DB(MEDIUMBLOB) 대신 저장소에 두고 DB에는 SHA-256 해시만 저장한다.
+(u_image_hash, s_image_hash - image_http.image_hash 와 같은 값)
+같은 이미지는 같은 해시이므로 한 번만 저장된다.
+
+- 기본 저장소: 로컬 파일시스템 (LocalBlobStore)
+    <root>/<해시 0-2>/<해시 2-4>/<해시>  (한 폴더에 파일이 몰리지 않도록 두 단계로 나눔)
+- 다른 저장소(S3 등)를 쓰려면 BlobStore 를 상속해 구현하고 BLOB_STORES 에 등록한 뒤
+  BLOB_STORE_CONFIG['backend'] 를 바꾼다
+- 기존 DB BLOB 옮기기: python drain_image_blobs.py
+"""
+
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+
+from fastapi.responses import FileResponse, Response
+
+from image_http import image_hash
+
+
+# 저장소 설정 (나중에 환경변수로 변경)
+BLOB_STORE_CONFIG = {
+    'backend': 'local',
+    'root': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blobs'),
+}
+
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class BlobStore(ABC):
+    """저장소 공통 인터페이스 (put / exists / read 는 반드시 구현)"""
+
+    @abstractmethod
+    def put(self, data):
+        """저장하고 해시를 반환 (같은 내용이 이미 있으면 다시 쓰지 않는다)"""
+
+    def put_file(self, path, digest):
+        """다 받은 임시 파일(path, 내용 해시 digest)을 저장하고 해시를 반환"""
+        with open(path, 'rb') as f:
+            self.put(f.read())
+        return digest
+
+    def tmp_dir(self):
+        """업로드 임시 파일 폴더 (None 이면 시스템 임시 폴더)"""
+        return None
+
+    @abstractmethod
+    def exists(self, digest):
+        """digest 가 저장돼 있는지"""
+
+    @abstractmethod
+    def read(self, digest):
+        """저장된 바이너리 (없으면 None)"""
+
+    def response(self, digest, media_type="image/jpeg", headers=None):
+        """저장된 내용을 그대로 내려주는 응답"""
+        return Response(content=self.read(digest), media_type=media_type, headers=headers)
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, digest):
+        if not DIGEST_PATTERN.match(digest or ''):
+            raise ValueError(f"잘못된 이미지 해시: {digest!r}")
+        return os.path.join(self.root, digest[0:2], digest[2:4], digest)
+
+    def put(self, data):
+        digest = image_hash(data)
+        path = self.path(digest)
+        if os.path.exists(path):
+            return digest
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        # 임시 파일에 다 쓴 뒤 이름을 바꿔서, 읽는 쪽이 쓰다 만 파일을 보지 않게 한다
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest
+
+    def put_file(self, path, digest):
+        # 같은 파일시스템의 임시 파일이므로 복사 없이 이름만 바꾼다
+        target = self.path(digest)
+        if os.path.exists(target):
+            return digest
+        with open(path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        return digest
+
+    def tmp_dir(self):
+        folder = os.path.join(self.root, 'tmp')
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def read(self, digest):
+        try:
+            with open(self.path(digest), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def response(self, digest, media_type="image/jpeg", headers=None):
+        # 파일을 메모리에 올리지 않고 그대로 전송 (서버가 지원하면 sendfile 사용)
+        return FileResponse(self.path(digest), media_type=media_type, headers=headers)
+
+
+BLOB_STORES = {
+    'local': lambda config: LocalBlobStore(config['root']),
+}
+
+
+def create_blob_store(config):
+    return BLOB_STORES[config['backend']](config)
+
+
+blob_store = create_blob_store(BLOB_STORE_CONFIG)
@@ -11,12 +11,14 @@ branch API - [테이블 설명] CRUD
 |      |        |      |
 """
 
-from fastapi import FastAPI, Form, UploadFile, File, Response
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, Response, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from branch_index import branch_index
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "172.16.250.175"
 
 #"127.0.0.1"
@@ -41,20 +43,24 @@ class YourModel(BaseModel):
 # TODO: 전체 목록 조회 API 구현
 # - 이미지 BLOB 컬럼은 제외하고 조회
 # - ORDER BY id 정렬
-@app.get("/select_branch")
-async def select_all():
-    conn = connect_db()
+@router.get("/select_branch")
+def select_all(
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
     curs = conn.cursor()
     
     # TODO: SQL 작성
     curs.execute("""
         SELECT br_seq, br_phone, br_address, br_name, br_lat, br_lng
         FROM branch
+        WHERE br_seq > %s
         ORDER BY br_seq
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
     
-    rows = curs.fetchall()
-    conn.close()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
     
     # TODO: 결과 매핑
     result = [{
@@ -66,7 +72,7 @@ async def select_all():
       'br_lng':row[5]
     } for row in rows]
     
-    return {"results": result}
+    return {"results": result, "next_cursor": next_cursor}
 
 
 # ============================================
@@ -74,9 +80,8 @@ async def select_all():
 # ============================================
 # TODO: ID로 단일 조회 API 구현
 # - 존재하지 않으면 에러 응답
-@app.get("/select_branch/{br_seq}")
-async def select_one(br_seq: int):
-    conn = connect_db()
+@router.get("/select_branch/{br_seq}")
+def select_one(br_seq: int, conn = Depends(get_db)):
     curs = conn.cursor()
     
     # TODO: SQL 작성
@@ -87,7 +92,6 @@ async def select_one(br_seq: int):
     """, (br_seq,))
     
     row = curs.fetchone()
-    conn.close()
     
     if row is None:
         return {"result": "Error", "message": "branch not found"}
@@ -104,6 +108,30 @@ async def select_one(br_seq: int):
     return {"result": result}
 
 
+# ============================================
+# 가까운 매장 조회
+# ============================================
+# 기준 좌표(lat, lng)에서 가까운 매장 k 개를 거리(km)와 함께 가까운 순으로 반환
+# radius_km 를 주면 그 거리 안의 매장만 (메모리 격자 인덱스: branch_index.py)
+@router.get("/nearest_branches")
+def nearest_branches(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=MAX_LIMIT),
+    radius_km: Optional[float] = Query(None, gt=0),
+    conn = Depends(get_db)
+):
+    try:
+        branch_index.ensure(conn)
+        result = [
+            dict(branch, distance_km=round(distance, 3))
+            for distance, branch in branch_index.nearest(lat, lng, k, radius_km)
+        ]
+        return {"results": result}
+    except Exception as e:
+        return {"result": "Error", "errorMsg": str(e)}
+
+
 # ============================================
 # 추가 (Create)//pk x
 # ============================================
@@ -111,18 +139,18 @@ async def select_one(br_seq: int):
 # - Form 데이터로 받기: 파라미터 = Form(...)
 # - 성공 시 생성된 ID 반환
 # - 에러 처리 필수
-@app.post("/insert_branch")
-async def insert_one(
+@router.post("/insert_branch")
+def insert_one(
     br_phone: str = Form(...),
     br_address: str = Form(...),
     br_name: str = Form(...),
     br_lat: float = Form(...),
-    br_lng: float = Form(...)
+    br_lng: float = Form(...),
+    conn = Depends(get_db)
     # TODO: Form 파라미터 정의
     # 예: columnName: str = Form(...)
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -134,7 +162,7 @@ async def insert_one(
         
         conn.commit()
         inserted_id = curs.lastrowid
-        conn.close()
+        branch_index.upsert(inserted_id, br_phone, br_address, br_name, br_lat, br_lng)
         
         return {"result": "OK", "id": inserted_id}
     except Exception as e:
@@ -146,18 +174,18 @@ async def insert_one(
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_branch")
-async def update_one(
+@router.post("/update_branch")
+def update_one(
     br_seq: int = Form(...),
     br_phone: str = Form(...),
     br_address: str = Form(...),
     br_name: str = Form(...),
     br_lat: float = Form(...),
-    br_lng: float = Form(...)
+    br_lng: float = Form(...),
+    conn = Depends(get_db)
     # TODO: 수정할 Form 파라미터 정의
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -169,7 +197,7 @@ async def update_one(
         curs.execute(sql, (br_phone, br_address, br_name, br_lat, br_lng, br_seq))
         #1=pbid
         conn.commit()
-        conn.close()
+        branch_index.upsert(br_seq, br_phone, br_address, br_name, br_lat, br_lng)
         
         return {"result": "OK"}
     except Exception as e:
@@ -181,17 +209,16 @@ async def update_one(
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_branch/{br_seq}")
-async def delete_one(br_seq: int):
+@router.delete("/delete_branch/{br_seq}")
+def delete_one(br_seq: int, conn = Depends(get_db)):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         sql = "DELETE FROM branch WHERE br_seq=%s"
         curs.execute(sql, (br_seq,))
         
         conn.commit()
-        conn.close()
+        branch_index.remove(br_seq)
         
         return {"result": "OK"}
     except Exception as e:
@@ -204,7 +231,7 @@ async def delete_one(br_seq: int):
 # TODO: 이미지 바이너리 직접 반환
 # - Response 객체 사용
 # - media_type: "image/jpeg" 또는 "image/png"
-# @app.get("/view_[테이블명]_image/{item_id}")
+# @router.get("/view_[테이블명]_image/{item_id}")
 # async def view_image(item_id: int):
 #     try:
 #         conn = connect_db()
@@ -233,7 +260,7 @@ async def delete_one(br_seq: int):
 # ============================================
 # TODO: 이미지만 별도로 업데이트
 # - UploadFile = File(...) 사용
-# @app.post("/update_[테이블명]_image")
+# @router.post("/update_[테이블명]_image")
 # async def update_image(
 #     item_id: int = Form(...),
 #     file: UploadFile = File(...)
@@ -258,6 +285,8 @@ async def delete_one(br_seq: int):
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 [product] API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
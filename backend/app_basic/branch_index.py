@@ -0,0 +1,185 @@
+"""
+매장 위치 인덱스 (메모리 격자)
+
+매장 좌표(br_lat, br_lng)를 위도/경도 CELL_DEG 크기 격자 칸에 나눠 담아 두고
+기준 좌표가 있는 칸부터 바깥 고리(ring)로 넓혀 가며 가까운 매장을 찾는다.
+아직 보지 않은 칸의 매장은 최소 r 칸 거리만큼 떨어져 있으므로
+k 번째로 가까운 매장이 그 거리보다 가까우면(또는 radius_km 를 넘으면) 멈춘다.
+MAX_RINGS 고리 안에서 끝나지 않으면(매장에서 먼 좌표) 남은 고리를 훑지 않고 전체 매장과 거리를 잰다
+(매장 수는 많지 않다).
+거리는 하버사인(대원 거리, km)으로 계산한다.
+
+- 서버 시작 시 build() 로 만든다 (main.py)
+- 매장 추가/수정/삭제 시 upsert() / remove() 로 바로 반영한다
+- 다른 워커에서 바뀐 내용은 REBUILD_INTERVAL 마다 다시 만들면서 반영된다
+"""
+
+import math
+import threading
+import time
+
+
+REBUILD_INTERVAL = 300
+CELL_DEG = 0.05            # 격자 칸 크기 (위도 0.05도 = 약 5.6km)
+MAX_RINGS = 20             # 격자로 넓혀 볼 최대 고리 수 (약 110km), 넘으면 전체 매장 거리 계산
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180
+
+BRANCH_COLUMNS = ('br_seq', 'br_phone', 'br_address', 'br_name', 'br_lat', 'br_lng')
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """두 좌표 사이 대원 거리 (km)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def cell_of(lat, lng, cell_deg=CELL_DEG):
+    return (math.floor(lat / cell_deg), math.floor(lng / cell_deg))
+
+
+class BranchIndex:
+    def __init__(self, cell_deg=CELL_DEG, rebuild_interval=REBUILD_INTERVAL, max_rings=MAX_RINGS):
+        self.cell_deg = cell_deg
+        self.max_rings = max_rings
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()   # build 는 한 번에 하나만
+        self._branches = {}   # br_seq -> 매장 정보 dict
+        self._cells = {}      # (위도 칸, 경도 칸) -> br_seq set
+        self._built_at = 0.0
+
+    # ------------------------------------------
+    # 색인
+    # ------------------------------------------
+    def _upsert(self, branch):
+        self._remove(branch['br_seq'])
+        if branch['br_lat'] is None or branch['br_lng'] is None:
+            return
+        branch = dict(branch, br_lat=float(branch['br_lat']), br_lng=float(branch['br_lng']))
+        self._branches[branch['br_seq']] = branch
+        cell = cell_of(branch['br_lat'], branch['br_lng'], self.cell_deg)
+        self._cells.setdefault(cell, set()).add(branch['br_seq'])
+
+    def _remove(self, br_seq):
+        branch = self._branches.pop(br_seq, None)
+        if branch is None:
+            return
+        cell = cell_of(branch['br_lat'], branch['br_lng'], self.cell_deg)
+        members = self._cells[cell]
+        members.discard(br_seq)
+        if not members:
+            del self._cells[cell]
+
+    def build(self, conn):
+        """branch 테이블 전체로 인덱스를 새로 만든다"""
+        curs = conn.cursor()
+        curs.execute(f"SELECT {', '.join(BRANCH_COLUMNS)} FROM branch")
+        rows = curs.fetchall()
+        with self._lock:
+            self._branches = {}
+            self._cells = {}
+            for row in rows:
+                self._upsert(dict(zip(BRANCH_COLUMNS, row)))
+            self._built_at = time.monotonic()
+
+    def _stale(self):
+        return time.monotonic() - self._built_at > self.rebuild_interval
+
+    def ensure(self, conn):
+        """
+        인덱스가 없거나 오래됐으면 다시 만든다 (search_index.SearchIndex.ensure 와 같은 방식)
+        - 아직 없으면: 한 요청이 만들고 나머지는 기다렸다가 그 결과를 쓴다
+        - 오래됐으면: 먼저 온 한 요청만 다시 만들고 나머지는 기다리지 않고 기존 인덱스를 쓴다
+        """
+        if not self._stale():
+            return
+        if self._built_at == 0.0:
+            with self._build_lock:
+                if self._stale():
+                    self.build(conn)
+            return
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            if self._stale():
+                self.build(conn)
+        finally:
+            self._build_lock.release()
+
+    def upsert(self, br_seq, br_phone, br_address, br_name, br_lat, br_lng):
+        """매장 추가/수정 반영"""
+        with self._lock:
+            self._upsert(dict(zip(BRANCH_COLUMNS, (br_seq, br_phone, br_address, br_name, br_lat, br_lng))))
+
+    def remove(self, br_seq):
+        """매장 삭제 반영"""
+        with self._lock:
+            self._remove(br_seq)
+
+    # ------------------------------------------
+    # 조회
+    # ------------------------------------------
+    def _ring(self, center, r):
+        """center 칸에서 r 칸 떨어진 고리의 칸들"""
+        lat0, lng0 = center
+        if r == 0:
+            yield center
+            return
+        for d in range(-r, r + 1):
+            yield (lat0 - r, lng0 + d)
+            yield (lat0 + r, lng0 + d)
+        for d in range(-r + 1, r):
+            yield (lat0 + d, lng0 - r)
+            yield (lat0 + d, lng0 + r)
+
+    def nearest(self, lat, lng, k=5, radius_km=None):
+        """
+        가까운 매장 k 개 (가까운 순)
+
+        Returns:
+            [(거리 km, 매장 정보 dict), ...]
+        """
+        with self._lock:
+            if not self._cells:
+                return []
+            center = cell_of(lat, lng, self.cell_deg)
+            # 매장이 있는 칸까지의 최대 고리 수 (이보다 넓히면 더 찾을 매장이 없다)
+            max_ring = max(
+                max(abs(cell[0] - center[0]), abs(cell[1] - center[1])) for cell in self._cells
+            )
+            rings = min(max_ring, self.max_rings)
+            # 경도 1칸의 최소 거리는 고위도일수록 줄어든다 -> 보수적으로 가장 높은 위도 기준
+            lat_edge = min(89.9, abs(lat) + (rings + 1) * self.cell_deg)
+            cell_km = self.cell_deg * KM_PER_DEG * math.cos(math.radians(lat_edge))
+
+            found = []
+            for r in range(rings + 1):
+                for cell in self._ring(center, r):
+                    for br_seq in self._cells.get(cell, ()):
+                        branch = self._branches[br_seq]
+                        distance = haversine_km(lat, lng, branch['br_lat'], branch['br_lng'])
+                        if radius_km is None or distance <= radius_km:
+                            found.append((distance, branch))
+                # 다음 고리의 매장은 최소 r * cell_km 떨어져 있다
+                bound = r * cell_km
+                if radius_km is not None and bound > radius_km:
+                    break
+                if len(found) >= k and sorted(distance for distance, _ in found)[k - 1] <= bound:
+                    break
+            else:
+                if max_ring > rings:
+                    # 고리 제한까지 못 찾음 -> 전체 매장 거리 계산
+                    found = []
+                    for branch in self._branches.values():
+                        distance = haversine_km(lat, lng, branch['br_lat'], branch['br_lng'])
+                        if radius_km is None or distance <= radius_km:
+                            found.append((distance, branch))
+            found.sort(key=lambda item: (item[0], item[1]['br_seq']))
+            return found[:k]
+
+
+branch_index = BranchIndex()
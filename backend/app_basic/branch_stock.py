@@ -0,0 +1,159 @@
+"""
+branch_stock API - 매장별 재고 조회 / 수정
+개별 실행: python branch_stock.py
+
+product(사이즈별 상품) x branch(매장) 재고 (migrations/004_branch_stock.sql)
+상품은 사이즈마다 p_seq 가 따로 있으므로 "상품 + 사이즈" = p_seq 하나다.
+
+작성일: 2026-10-18
+
+수정 이력:
+| 날짜 | 작성자 | 내용 |
+|------|--------|------|
+|      |        |      |
+"""
+
+from fastapi import FastAPI, APIRouter, Form, Depends, Query
+from typing import Optional
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from response_cache import availability_cache
+from branch_index import haversine_km
+
+router = APIRouter()
+ipAddress = "127.0.0.1"
+port = 8000
+
+
+# ============================================
+# 재고 있는 매장 조회 (픽업용)
+# ============================================
+# 이 상품(p_seq)을 min_quantity 개 이상 가진 매장 목록 (PK (p_seq, br_seq) 범위 읽기 한 번)
+# - 결과는 availability_cache 에 짧게(TTL 10초) 캐시한다
+# - lat/lng 를 주면 거리(distance_km)를 붙여 가까운 순, 없으면 br_seq 순
+# - radius_km / k 로 거리/개수 제한
+@router.get("/branch_availability")
+def branch_availability(
+    p_seq: int,
+    min_quantity: int = Query(1, ge=1),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0),
+    k: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
+    try:
+        cache_key = availability_cache.make_key("branch_availability", p_seq=p_seq, min_quantity=min_quantity)
+        branches = availability_cache.get(cache_key)
+        if branches is None:
+            # DB 를 읽기 전 세대 (읽는 사이에 재고가 바뀌면 저장하지 않는다)
+            generation = availability_cache.generation()
+            curs = conn.cursor()
+            curs.execute("""
+                SELECT b.br_seq, b.br_name, b.br_address, b.br_phone, b.br_lat, b.br_lng, bs.bs_stock
+                FROM branch_stock as bs
+                inner join branch as b
+                on b.br_seq = bs.br_seq
+                WHERE bs.p_seq = %s AND bs.bs_stock >= %s
+                ORDER BY bs.br_seq
+            """, (p_seq, min_quantity))
+            branches = [{
+                'br_seq': row[0],
+                'br_name': row[1],
+                'br_address': row[2],
+                'br_phone': row[3],
+                'br_lat': None if row[4] is None else float(row[4]),
+                'br_lng': None if row[5] is None else float(row[5]),
+                'bs_stock': row[6],
+            } for row in curs.fetchall()]
+            availability_cache.set(cache_key, branches, generation)
+
+        result = [dict(branch) for branch in branches]
+        if lat is not None and lng is not None:
+            for branch in result:
+                if branch['br_lat'] is not None and branch['br_lng'] is not None:
+                    branch['distance_km'] = round(haversine_km(lat, lng, branch['br_lat'], branch['br_lng']), 3)
+                else:
+                    branch['distance_km'] = None
+            if radius_km is not None:
+                result = [branch for branch in result
+                          if branch['distance_km'] is not None and branch['distance_km'] <= radius_km]
+            # 좌표 없는 매장은 뒤로
+            result.sort(key=lambda branch: (branch['distance_km'] is None, branch['distance_km'] or 0))
+        if k is not None:
+            result = result[:k]
+        return {"p_seq": p_seq, "results": result}
+    except Exception as e:
+        return {"result": "Error", "errorMsg": str(e)}
+
+
+# ============================================
+# 매장별 재고 목록
+# ============================================
+@router.get("/select_branch_stock")
+def select_all(
+    br_seq: int,
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT p_seq, br_seq, bs_stock, updated_at
+        FROM branch_stock
+        WHERE br_seq = %s AND p_seq > %s
+        ORDER BY p_seq
+        LIMIT %s
+    """, (br_seq, after or 0, limit + 1))
+
+    rows, next_cursor = paginate(curs.fetchall(), limit)
+
+    result = [{
+        'p_seq': row[0],
+        'br_seq': row[1],
+        'bs_stock': row[2],
+        'updated_at': str(row[3]),
+    } for row in rows]
+
+    return {"results": result, "next_cursor": next_cursor}
+
+
+# ============================================
+# 매장 재고 수정 (없으면 추가)
+# ============================================
+@router.post("/update_branch_stock")
+def update_one(
+    br_seq: int = Form(...),
+    p_seq: int = Form(...),
+    bs_stock: int = Form(..., ge=0),
+    conn = Depends(get_db)
+):
+    try:
+        curs = conn.cursor()
+        sql = """
+            INSERT INTO branch_stock (p_seq, br_seq, bs_stock)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE bs_stock = VALUES(bs_stock)
+        """
+        curs.execute(sql, (p_seq, br_seq, bs_stock))
+
+        conn.commit()
+        availability_cache.invalidate()
+
+        return {"result": "OK"}
+    except Exception as e:
+        conn.rollback()
+        return {"result": "Error", "errorMsg": str(e)}
+
+
+# ============================================
+# 개별 실행
+# ============================================
+if __name__ == "__main__":
+    import uvicorn
+    app = FastAPI()
+    app.include_router(router)
+    print(f"🚀 [branch_stock] API 서버 시작")
+    print(f"   서버 주소: http://{ipAddress}:{port}")
+    print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
+    uvicorn.run(app, host=ipAddress, port=port)
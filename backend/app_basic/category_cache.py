@@ -0,0 +1,82 @@
+"""
+카테고리 조회 테이블 캐시
+color_category / gender_category / size_category / kind_category / maker
+
+거의 바뀌지 않는 작은 테이블이라 메모리에 올려두고
+product 조회 시 join 대신 seq -> 이름 변환을 파이썬에서 처리한다.
+
+- 서버 시작 시 load() 로 미리 읽어둔다 (main.py)
+- TTL(초)이 지나면 다음 조회 때 다시 읽는다
+- 캐시에 없는 seq/이름이 나오면 한 번 다시 읽는다 (새로 추가된 카테고리)
+- 카테고리 테이블을 수정한 경우 invalidate() 호출
+"""
+
+import threading
+import time
+
+
+# 종류: (테이블, seq 컬럼, 이름 컬럼)
+CATEGORY_TABLES = {
+    'color': ('color_category', 'cc_seq', 'cc_name'),
+    'gender': ('gender_category', 'gc_seq', 'gc_name'),
+    'size': ('size_category', 'sc_seq', 'sc_name'),
+    'kind': ('kind_category', 'kc_seq', 'kc_name'),
+    'maker': ('maker', 'm_seq', 'm_name'),
+}
+
+CACHE_TTL = 600
+RELOAD_INTERVAL = 5   # 캐시 미스로 다시 읽을 때 최소 간격(초)
+
+
+class CategoryCache:
+    def __init__(self, ttl=CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._names = {kind: {} for kind in CATEGORY_TABLES}   # kind -> {seq: name}
+        self._seqs = {kind: {} for kind in CATEGORY_TABLES}    # kind -> {name: seq}
+        self._loaded_at = 0.0
+
+    def load(self, conn):
+        """카테고리 테이블 전체를 다시 읽는다"""
+        names, seqs = {}, {}
+        curs = conn.cursor()
+        for kind, (table, seq_col, name_col) in CATEGORY_TABLES.items():
+            curs.execute(f"SELECT {seq_col}, {name_col} FROM {table}")
+            rows = curs.fetchall()
+            names[kind] = {row[0]: row[1] for row in rows}
+            seqs[kind] = {row[1]: row[0] for row in rows}
+        with self._lock:
+            self._names = names
+            self._seqs = seqs
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """다음 조회 때 다시 읽도록 표시"""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def _ensure(self, conn, force=False):
+        age = time.monotonic() - self._loaded_at
+        if age > self.ttl or (force and age > RELOAD_INTERVAL):
+            self.load(conn)
+
+    def name(self, conn, kind, seq):
+        """seq -> 이름"""
+        self._ensure(conn)
+        name = self._names[kind].get(seq)
+        if name is None:
+            self._ensure(conn, force=True)
+            name = self._names[kind].get(seq)
+        return name
+
+    def seq(self, conn, kind, name):
+        """이름 -> seq (없으면 None)"""
+        self._ensure(conn)
+        seq = self._seqs[kind].get(name)
+        if seq is None:
+            self._ensure(conn, force=True)
+            seq = self._seqs[kind].get(name)
+        return seq
+
+
+categories = CategoryCache()
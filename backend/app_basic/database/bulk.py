@@ -0,0 +1,51 @@
+"""
+다중 행 INSERT + 행별 AUTO_INCREMENT id
+
+pymysql 의 executemany 도 다중 행 INSERT 로 보내지만, 문장이 max_stmt_length(1,024,000 바이트)를
+넘으면 여러 문장으로 나눠 보내고 lastrowid 는 마지막 문장의 첫 id 만 남는다.
+그래서 lastrowid + i 로 행 id 를 계산하면 나뉜 경우 틀린다.
+여기서는 문장을 직접 max_bytes 로 나눠 보내고 문장마다 lastrowid(그 문장의 첫 id)를 받는다.
+한 문장(행 수를 아는 simple insert)의 AUTO_INCREMENT 값은 연속으로 할당된다.
+
+사용 예:
+    ids = insert_returning_ids(curs, 'product', ('p_name', 'p_price'), [('a', 1), ('b', 2)])
+"""
+
+MAX_STMT_BYTES = 1024000
+
+
+def insert_returning_ids(curs, table, columns, rows, max_bytes=MAX_STMT_BYTES):
+    """
+    rows 를 max_bytes 이하 다중 행 INSERT 문장들로 저장 (커밋은 호출한 쪽에서)
+
+    Args:
+        curs: 트랜잭션 중인 커서
+        table: 테이블 이름
+        columns: 컬럼 이름 목록
+        rows: columns 순서의 값 튜플 목록
+
+    Returns:
+        rows 순서대로 생성된 id 목록
+    """
+    prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    placeholder = f"({', '.join(['%s'] * len(columns))})"
+    ids = []
+    chunk, size = [], len(prefix)
+
+    def flush():
+        # 값은 mogrify 로 이미 escape 했으므로 인자 없이 실행한다
+        curs.execute(prefix + ", ".join(chunk))
+        first_id = curs.lastrowid
+        ids.extend(range(first_id, first_id + len(chunk)))
+
+    for row in rows:
+        value = curs.mogrify(placeholder, row)
+        value_bytes = len(value.encode('utf-8')) + 2   # 구분자 ", "
+        if chunk and size + value_bytes > max_bytes:
+            flush()
+            chunk, size = [], len(prefix)
+        chunk.append(value)
+        size += value_bytes
+    if chunk:
+        flush()
+    return ids
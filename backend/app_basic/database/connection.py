@@ -1,8 +1,16 @@
 """
 데이터베이스 연결 설정
 예제 코드 스타일로 간단하게 구현
+
+요청마다 pymysql.connect()로 TCP 연결 + 인증을 새로 하지 않도록
+커넥션 풀(ConnectionPool)에서 연결을 빌려 쓰고 반납한다.
 """
 
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import pymysql
 
 
@@ -24,14 +32,333 @@ DB_CONFIG = {
     'port': 13306
 }
 
+# 커넥션 풀 설정
+POOL_CONFIG = {
+    'min_size': 2,            # 유휴 상태로 유지할 최소 연결 수
+    'max_size': 10,           # 동시에 열 수 있는 최대 연결 수
+    'idle_timeout': 300,      # 이 시간(초) 이상 놀고 있던 연결은 닫음 (min_size 초과분만)
+    'max_lifetime': 1800,     # 생성 후 이 시간(초)이 지난 연결은 재사용하지 않음
+    'ping_interval': 30,      # 이 시간(초) 이상 놀고 있던 연결은 빌려주기 전에 ping으로 확인
+    'acquire_timeout': 10,    # 빈 연결을 기다리는 최대 시간(초)
+}
+
+
+class PoolTimeoutError(Exception):
+    """acquire_timeout 안에 빈 연결을 얻지 못한 경우"""
+
+
+class PooledConnection:
+    """
+    풀에서 빌려준 연결
+
+    pymysql.Connection과 같은 방식으로 사용하되,
+    close()를 호출하면 실제로 닫지 않고 풀에 반납한다.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        # 같은 연결을 두 번 반납하지 않도록 한 번만 처리
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    스레드 안전한 pymysql 커넥션 풀
+
+    - min_size / max_size 로 연결 수 제한
+    - idle_timeout 이 지난 유휴 연결과 max_lifetime 이 지난 연결은 폐기
+      (대여 / 반납 때마다 가장 오래 놀던 쪽부터 훑어서 닫는다, min_size 까지는 남김)
+    - 오래 놀던 연결은 빌려주기 전에 ping 으로 상태 확인 (health-check-on-borrow)
+    - 사용량/대기 시간 카운터는 stats() 로 조회
+    """
+
+    def __init__(self, db_config, min_size=2, max_size=10, idle_timeout=300,
+                 max_lifetime=1800, ping_interval=30, acquire_timeout=10):
+        self.db_config = db_config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self.acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition()
+        self._idle = deque()   # (raw, created_at, last_used)
+        self._size = 0         # 현재 열려 있는 연결 수 (유휴 + 대여 중)
+        self._in_use = 0
+        self._closed = False
+
+        # 카운터
+        self._acquired = 0
+        self._created = 0
+        self._discarded = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts = 0
+
+    # ------------------------------------------
+    # 연결 생성 / 폐기
+    # ------------------------------------------
+    def _connect(self):
+        raw = pymysql.connect(**self.db_config)
+        with self._cond:
+            self._created += 1
+        return raw, time.monotonic()
+
+    def _discard(self, raw):
+        self._close_raw(raw)
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def _close_raw(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, created_at, last_used, now, size):
+        """size: 잠금 안에서 읽은 현재 연결 수"""
+        if now - created_at > self.max_lifetime:
+            return True
+        # min_size 까지는 유휴 연결을 남겨둔다
+        return now - last_used > self.idle_timeout and size > self.min_size
+
+    def _evict_expired(self, now):
+        """
+        만료된 유휴 연결을 풀에서 뺀다 (self._cond 를 잡은 채로 호출)
+
+        대여는 LIFO 라 오래 놀던 연결은 deque 왼쪽에 남아 빌려 가지 않으므로
+        왼쪽(가장 오래 놀던 쪽)부터 훑는다.
+
+        Returns:
+            닫아야 할 연결 목록 (잠금 밖에서 _close_raw)
+        """
+        evicted = []
+        kept = deque()
+        while self._idle:
+            raw, created_at, last_used = self._idle.popleft()
+            if self._is_expired(created_at, last_used, now, self._size):
+                self._size -= 1
+                self._discarded += 1
+                evicted.append(raw)
+            else:
+                kept.append((raw, created_at, last_used))
+        self._idle = kept
+        if evicted:
+            self._cond.notify(len(evicted))
+        return evicted
+
+    # ------------------------------------------
+    # 풀 열기 / 닫기
+    # ------------------------------------------
+    def open(self):
+        """min_size 만큼 미리 연결을 만들어 둔다 (서버 시작 시 호출)"""
+        with self._cond:
+            self._closed = False
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                raw, created_at = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.append((raw, created_at, time.monotonic()))
+                self._cond.notify()
+
+    def close(self):
+        """유휴 연결을 모두 닫는다 (서버 종료 시 호출). 대여 중인 연결은 반납 시 닫힌다."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+    # ------------------------------------------
+    # 대여 / 반납
+    # ------------------------------------------
+    def acquire(self):
+        """
+        풀에서 연결 대여
+
+        Returns:
+            PooledConnection: close() 시 풀로 반납되는 연결 객체
+
+        Raises:
+            PoolTimeoutError: acquire_timeout 안에 연결을 얻지 못한 경우
+        """
+        start = time.monotonic()
+        deadline = start + self.acquire_timeout
+        waited = False
+
+        while True:
+            raw = None
+            create = False
+            with self._cond:
+                evicted = self._evict_expired(time.monotonic())
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"connection pool exhausted (max_size={self.max_size})")
+                    waited = True
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    # 가장 최근에 반납된 연결부터 사용 (LIFO)
+                    raw, created_at, last_used = self._idle.pop()
+                    size = self._size
+                else:
+                    self._size += 1
+                    create = True
+            for stale in evicted:
+                self._close_raw(stale)
+
+            now = time.monotonic()
+            if create:
+                try:
+                    raw, created_at = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif self._is_expired(created_at, last_used, now, size):
+                self._discard(raw)
+                continue
+            elif now - last_used > self.ping_interval:
+                try:
+                    raw.ping(reconnect=False)
+                except Exception:
+                    self._discard(raw)
+                    continue
+
+            wait_time = time.monotonic() - start
+            with self._cond:
+                self._in_use += 1
+                self._acquired += 1
+                if waited:
+                    self._waits += 1
+                self._wait_time_total += wait_time
+                self._wait_time_max = max(self._wait_time_max, wait_time)
+            return PooledConnection(self, raw, created_at)
+
+    def release(self, raw, created_at):
+        """연결 반납 (PooledConnection.close()에서 호출)"""
+        with self._cond:
+            self._in_use -= 1
+
+        # 커밋하지 않은 트랜잭션이 다음 요청으로 넘어가지 않도록 정리
+        try:
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        now = time.monotonic()
+        if self._closed or now - created_at > self.max_lifetime:
+            self._discard(raw)
+            return
+        with self._cond:
+            self._idle.append((raw, created_at, now))
+            self._cond.notify()
+            evicted = self._evict_expired(now)
+        for stale in evicted:
+            self._close_raw(stale)
+
+    def stats(self):
+        """
+        풀 사용량 / 대기 시간 카운터
+
+        Returns:
+            dict: size(열린 연결), in_use(대여 중), idle(유휴), 누적 카운터
+        """
+        with self._cond:
+            return {
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "acquired": self._acquired,
+                "created": self._created,
+                "discarded": self._discarded,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_total_ms": round(self._wait_time_total * 1000, 3),
+                "wait_time_max_ms": round(self._wait_time_max * 1000, 3),
+                "wait_time_avg_ms": round(self._wait_time_total * 1000 / self._acquired, 3)
+                if self._acquired else 0.0,
+            }
+
+
+pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+
 
 def connect_db():
     """
-    데이터베이스 연결
-    
+    데이터베이스 연결 (커넥션 풀에서 대여)
+
+    conn.close() 를 호출하면 연결을 닫지 않고 풀에 반납한다.
+
     Returns:
-        pymysql.Connection: 데이터베이스 연결 객체
+        PooledConnection: 데이터베이스 연결 객체
+    """
+    return pool.acquire()
+
+
+@contextmanager
+def get_connection():
+    """
+    with 문용 연결 대여
+
+    사용 예:
+        with get_connection() as conn:
+            curs = conn.cursor()
     """
-    conn = pymysql.connect(**DB_CONFIG)
-    return conn
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
 
+def get_db():
+    """
+    FastAPI 의존성 (Depends)용 연결 대여
+    요청 처리가 끝나면 자동으로 풀에 반납된다.
+
+    사용 예:
+        @app.get("/select_xxx")
+        def select_all(conn = Depends(get_db)):
+    """
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        conn.close()
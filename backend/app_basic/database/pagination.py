@@ -0,0 +1,36 @@
+"""
+목록 조회용 keyset(커서) 페이지네이션
+
+OFFSET 대신 마지막으로 받은 키(after) 다음부터 조회하므로
+테이블이 커져도 페이지 조회 비용이 일정하다.
+
+사용 예:
+    @router.get("/select_xxx")
+    def select_all(after: Optional[int] = None,
+                   limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                   conn = Depends(get_db)):
+        curs.execute("SELECT ... WHERE id > %s ORDER BY id LIMIT %s", (after or 0, limit + 1))
+        rows, next_cursor = paginate(curs.fetchall(), limit)
+        return {"results": [...], "next_cursor": next_cursor}
+"""
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def paginate(rows, limit, key_index=0):
+    """
+    LIMIT (limit + 1) 로 조회한 결과를 limit 개로 자르고 다음 커서를 계산
+
+    Args:
+        rows: curs.fetchall() 결과
+        limit: 페이지 크기
+        key_index: 정렬 키 컬럼 위치
+
+    Returns:
+        tuple: (rows, next_cursor) - 마지막 페이지면 next_cursor 는 None
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][key_index]
+    return rows, None
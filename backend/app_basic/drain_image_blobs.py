@@ -0,0 +1,89 @@
+"""
+DB 이미지 BLOB -> 이미지 저장소(blob_store) 이전 (한 번만 실행)
+실행: python drain_image_blobs.py [--dry-run] [--batch 100] [--table user]
+
+각 행의 이미지를 저장소에 쓰고(해시 이름), 해시 컬럼을 채운 뒤 BLOB 컬럼을 NULL 로 비운다.
+- 저장소 파일을 fsync 한 다음에 DB를 수정하므로 중간에 멈춰도 이미지가 사라지지 않는다
+- 이미 옮긴 행(BLOB 이 NULL)은 건너뛰므로 여러 번 실행해도 된다
+- 실행 전에 database/migrations 의 001, 002 를 먼저 적용해야 한다
+- 끝나면 OPTIMIZE TABLE 로 비운 BLOB 공간을 돌려받는다
+"""
+
+import argparse
+
+from database.connection import get_connection
+from blob_store import blob_store
+
+
+# 테이블: (PK 컬럼, BLOB 컬럼, 해시 컬럼)
+IMAGE_COLUMNS = {
+    'user': ('u_seq', 'u_image', 'u_image_hash'),
+    'staff': ('s_seq', 's_image', 's_image_hash'),
+    'Customer': ('id', 'cProfileImage', 'cProfileImageHash'),
+    'Employee': ('id', 'eProfileImage', 'eProfileImageHash'),
+}
+
+
+def drain_table(conn, table, batch, dry_run=False):
+    """table 의 BLOB 을 저장소로 옮긴다 -> (옮긴 행 수, 옮긴 바이트)"""
+    pk, blob_col, hash_col = IMAGE_COLUMNS[table]
+    curs = conn.cursor()
+    moved = moved_bytes = 0
+    last = 0
+    while True:
+        curs.execute(f"""
+            SELECT {pk}, {blob_col}
+            FROM {table}
+            WHERE {blob_col} IS NOT NULL AND {pk} > %s
+            ORDER BY {pk}
+            LIMIT %s
+        """, (last, batch))
+        rows = curs.fetchall()
+        if not rows:
+            break
+        last = rows[-1][0]
+        if dry_run:
+            moved += len(rows)
+            moved_bytes += sum(len(row[1]) for row in rows)
+            continue
+
+        updates = []
+        for seq, data in rows:
+            updates.append((blob_store.put(data), seq))
+            moved_bytes += len(data)
+        # 그 사이에 새 이미지로 바뀐 행(BLOB 이 이미 NULL)은 건드리지 않는다
+        curs.executemany(f"""
+            UPDATE {table}
+            SET {hash_col} = %s, {blob_col} = NULL
+            WHERE {pk} = %s AND {blob_col} IS NOT NULL
+        """, updates)
+        conn.commit()
+        moved += len(rows)
+        print(f"  {table}: {moved} rows ({moved_bytes / 1024 / 1024:.1f} MB)")
+    return moved, moved_bytes
+
+
+def main(args):
+    tables = args.table or list(IMAGE_COLUMNS)
+    with get_connection() as conn:
+        for table in tables:
+            try:
+                moved, moved_bytes = drain_table(conn, table, args.batch, args.dry_run)
+            except Exception as e:
+                # 이 DB에 없는 테이블(Customer/Employee 등)은 건너뛴다
+                conn.rollback()
+                print(f"⚠️ {table}: {e}")
+                continue
+            action = "옮길 예정" if args.dry_run else "완료"
+            print(f"✅ {table}: {moved} rows, {moved_bytes / 1024 / 1024:.1f} MB {action}")
+            if moved and not args.dry_run:
+                print(f"   공간 회수: OPTIMIZE TABLE {table};")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DB 이미지 BLOB 을 이미지 저장소로 이전")
+    parser.add_argument("--table", action="append", choices=list(IMAGE_COLUMNS),
+                        help="대상 테이블 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument("--batch", type=int, default=100, help="한 번에 옮길 행 수")
+    parser.add_argument("--dry-run", action="store_true", help="옮길 양만 계산")
+    main(parser.parse_args())
@@ -0,0 +1,209 @@
+"""
+상품 패싯 인덱스 (메모리 비트맵)
+
+상품마다 위치 번호를 주고, 패싯 값(제조사/색상/종류/사이즈/성별)별로
+해당 상품 위치의 비트를 켠 정수(int)를 비트맵으로 쓴다.
+필터는 비트 AND/OR, 개수는 켜진 비트 수로 계산하므로
+상품 테이블을 다시 읽지 않고 한 번에 필터 결과와 패싯별 개수를 구한다.
+
+패싯 개수는 '자기 자신 필터만 뺀' 조건으로 센다.
+(예: 제조사=Nike 로 거른 상태에서도 다른 제조사 개수가 보여야 제조사를 바꿔 고를 수 있다)
+
+- 서버 시작 시 build() 로 만든다 (main.py)
+- 상품 추가/수정/삭제 시 upsert() / remove() 로 바로 반영한다
+- 다른 워커에서 바뀐 내용은 REBUILD_INTERVAL 마다 다시 만들면서 반영된다
+"""
+
+import threading
+import time
+
+
+REBUILD_INTERVAL = 300
+
+# 패싯 이름 -> product 컬럼 (패싯 이름은 category_cache 의 종류 이름과 같다)
+FACET_COLUMNS = {
+    'maker': 'm_seq',
+    'color': 'cc_seq',
+    'kind': 'kc_seq',
+    'size': 'sc_seq',
+    'gender': 'gc_seq',
+}
+
+
+def bit_positions(mask):
+    """켜진 비트 위치 목록"""
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
+def bit_count(mask):
+    return bin(mask).count('1')
+
+
+class FacetIndex:
+    def __init__(self, rebuild_interval=REBUILD_INTERVAL):
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()   # build 는 한 번에 하나만
+        self._reset()
+        self._built_at = 0.0
+
+    def _reset(self):
+        self._positions = {}   # p_seq -> 위치
+        self._p_seqs = []      # 위치 -> p_seq
+        self._values = []      # 위치 -> {패싯: 값}
+        self._prices = []      # 위치 -> p_price
+        self._alive = 0        # 삭제되지 않은 상품 위치 비트맵
+        self._bitmaps = {facet: {} for facet in FACET_COLUMNS}   # 패싯 -> {값: 비트맵}
+
+    # ------------------------------------------
+    # 색인
+    # ------------------------------------------
+    def _set(self, pos, values, on):
+        bit = 1 << pos
+        for facet, value in values.items():
+            bitmaps = self._bitmaps[facet]
+            if on:
+                bitmaps[value] = bitmaps.get(value, 0) | bit
+            else:
+                bitmaps[value] &= ~bit
+                if not bitmaps[value]:
+                    del bitmaps[value]
+
+    def _upsert(self, p_seq, values, p_price):
+        pos = self._positions.get(p_seq)
+        if pos is None:
+            pos = len(self._p_seqs)
+            self._positions[p_seq] = pos
+            self._p_seqs.append(p_seq)
+            self._values.append(values)
+            self._prices.append(p_price)
+        else:
+            if self._alive >> pos & 1:
+                self._set(pos, self._values[pos], False)
+            self._values[pos] = values
+            self._prices[pos] = p_price
+        self._set(pos, values, True)
+        self._alive |= 1 << pos
+
+    def build(self, conn):
+        """product 테이블 전체로 인덱스를 새로 만든다"""
+        curs = conn.cursor()
+        curs.execute(f"""
+            SELECT p_seq, {', '.join(FACET_COLUMNS.values())}, p_price
+            FROM product
+            ORDER BY p_seq
+        """)
+        rows = curs.fetchall()
+        with self._lock:
+            self._reset()
+            for row in rows:
+                values = dict(zip(FACET_COLUMNS, row[1:6]))
+                self._upsert(row[0], values, row[6])
+            self._built_at = time.monotonic()
+
+    def _stale(self):
+        return time.monotonic() - self._built_at > self.rebuild_interval
+
+    def ensure(self, conn):
+        """
+        인덱스가 없거나 오래됐으면 다시 만든다 (search_index.SearchIndex.ensure 와 같은 방식)
+        - 아직 없으면: 한 요청이 만들고 나머지는 기다렸다가 그 결과를 쓴다
+        - 오래됐으면: 먼저 온 한 요청만 다시 만들고 나머지는 기다리지 않고 기존 인덱스를 쓴다
+        """
+        if not self._stale():
+            return
+        if self._built_at == 0.0:
+            with self._build_lock:
+                if self._stale():
+                    self.build(conn)
+            return
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            if self._stale():
+                self.build(conn)
+        finally:
+            self._build_lock.release()
+
+    def upsert(self, p_seq, m_seq, cc_seq, kc_seq, sc_seq, gc_seq, p_price):
+        """상품 추가/수정 반영"""
+        values = {'maker': m_seq, 'color': cc_seq, 'kind': kc_seq, 'size': sc_seq, 'gender': gc_seq}
+        with self._lock:
+            self._upsert(p_seq, values, p_price)
+
+    def remove(self, p_seq):
+        """상품 삭제 반영 (위치는 다음 build() 때 정리된다)"""
+        with self._lock:
+            pos = self._positions.get(p_seq)
+            if pos is None or not self._alive >> pos & 1:
+                return
+            self._set(pos, self._values[pos], False)
+            self._alive &= ~(1 << pos)
+
+    # ------------------------------------------
+    # 조회
+    # ------------------------------------------
+    def query(self, filters, min_price=None, max_price=None, p_seqs=None):
+        """
+        필터에 맞는 상품과 패싯별 개수
+
+        Args:
+            filters: {패싯: 값 set} - 같은 패싯 안의 값은 OR, 패싯끼리는 AND
+                     (거르지 않을 패싯은 넣지 않는다. 빈 set 은 일치하는 상품 없음)
+            min_price, max_price: 가격 범위 (None 이면 제한 없음)
+            p_seqs: 이 상품들로만 제한 (키워드 검색 결과 등, None 이면 전체)
+
+        Returns:
+            tuple: (필터에 맞는 p_seq set, {패싯: {값: 개수}})
+        """
+        with self._lock:
+            base = self._alive
+            if min_price is not None or max_price is not None:
+                price_mask = 0
+                for pos, price in enumerate(self._prices):
+                    if (min_price is None or price >= min_price) and \
+                       (max_price is None or price <= max_price):
+                        price_mask |= 1 << pos
+                base &= price_mask
+            if p_seqs is not None:
+                seq_mask = 0
+                for p_seq in p_seqs:
+                    pos = self._positions.get(p_seq)
+                    if pos is not None:
+                        seq_mask |= 1 << pos
+                base &= seq_mask
+
+            # 패싯별 필터 비트맵 (같은 패싯 값끼리 OR)
+            facet_masks = {}
+            for facet, values in filters.items():
+                mask = 0
+                for value in values:
+                    mask |= self._bitmaps[facet].get(value, 0)
+                facet_masks[facet] = mask
+
+            matched = base
+            for mask in facet_masks.values():
+                matched &= mask
+
+            counts = {}
+            for facet, bitmaps in self._bitmaps.items():
+                # 자기 패싯 필터만 빼고 적용한 상태에서 개수 계산
+                others = base
+                for other, mask in facet_masks.items():
+                    if other != facet:
+                        others &= mask
+                counts[facet] = {
+                    value: bit_count(others & bitmap)
+                    for value, bitmap in bitmaps.items()
+                    if others & bitmap
+                }
+
+            return {self._p_seqs[pos] for pos in bit_positions(matched)}, counts
+
+
+facet_index = FacetIndex()
@@ -0,0 +1,76 @@
+"""
+이미지 응답 공통 처리 (ETag / 조건부 GET / 캐시 헤더)
+
+이미지는 업로드할 때 SHA-256 해시를 계산해 이미지 옆 컬럼(u_image_hash, s_image_hash)에 저장한다.
+- ETag 는 저장된 해시를 쓴다
+- If-None-Match 가 ETag 와 같으면 BLOB 을 읽지 않고 304 만 반환한다
+- 목록 API 는 ?v=<해시 앞부분> 이 붙은 URL 을 주고,
+  v 가 현재 해시와 맞는 요청은 내용이 바뀌지 않으므로 1년 캐시(immutable)로 응답한다
+  (이미지가 바뀌면 해시가 바뀌어 URL 도 바뀐다)
+- v 없이 요청하면 매번 ETag 로 다시 확인(no-cache)하게 한다
+- 썸네일(?w=)은 variant(예: '96.webp')를 붙인 ETag 를 쓰고,
+  Accept 헤더에 따라 형식이 달라지므로 Vary: Accept 를 붙인다
+"""
+
+import hashlib
+
+from fastapi import Response
+
+
+VERSION_LENGTH = 16
+
+IMMUTABLE_CACHE = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE = "private, no-cache"
+
+
+def image_hash(data):
+    """이미지 내용 해시 (업로드 시 저장)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def image_url(path, digest):
+    """버전(해시)이 붙은 이미지 URL"""
+    if digest is None:
+        return path
+    return f"{path}?v={digest[:VERSION_LENGTH]}"
+
+
+def etag_value(digest, variant=None):
+    return digest if variant is None else f"{digest}-{variant}"
+
+
+def etag_matches(if_none_match, digest, variant=None):
+    """If-None-Match 헤더에 현재 ETag 가 있는지"""
+    if not if_none_match or digest is None:
+        return False
+    etag = etag_value(digest, variant)
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag.strip('"') == etag:
+            return True
+    return False
+
+
+def cache_headers(digest, version=None, variant=None):
+    immutable = version is not None and digest.startswith(version) and len(version) >= 8
+    headers = {
+        "ETag": f'"{etag_value(digest, variant)}"',
+        "Cache-Control": IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE,
+    }
+    if variant is not None:
+        headers["Vary"] = "Accept"
+    return headers
+
+
+def not_modified(digest, version=None, variant=None):
+    """304 Not Modified (본문 없음)"""
+    return Response(status_code=304, headers=cache_headers(digest, version, variant))
+
+
+def image_response(data, digest, version=None, media_type="image/jpeg", variant=None):
+    """이미지 바이너리 + ETag / Cache-Control"""
+    return Response(content=data, media_type=media_type, headers=cache_headers(digest, version, variant))
@@ -0,0 +1,154 @@
+"""
+이미지 업로드 처리 (크기 제한 / 형식 확인 / 임시 파일 경유)
+
+업로드 파일을 한 번에 메모리로 읽지 않고 chunk_size 씩 읽으면서
+- 첫 조각의 시그니처(magic bytes)로 이미지 형식을 확인하고 (이미지가 아니면 바로 거절)
+- 해시를 계산하면서 저장소의 임시 파일에 쓰고
+- max_bytes 를 넘는 순간 중단한다
+다 받은 임시 파일은 저장소로 이름만 바꿔 옮긴다 (blob_store.put_file).
+
+요청 본문 자체의 크기 제한은 UploadLimitMiddleware 가 맡는다 (main.py 에 등록).
+멀티파트 본문을 파싱하기 전에 Content-Length / 받은 바이트 수로 초과 요청을 끊는다.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from blob_store import blob_store
+
+
+UPLOAD_CONFIG = {
+    'max_bytes': 10 * 1024 * 1024,    # 이미지 한 장 최대 크기
+    'form_overhead': 1024 * 1024,     # 이미지 외 폼 필드/멀티파트 경계 여유분
+    'chunk_size': 64 * 1024,
+}
+
+SNIFF_BYTES = 16
+
+# 업로드를 받는 형식 (썸네일(thumbnails.render)을 만들 수 있는 형식만)
+# HEIC 는 Pillow 만으로 열 수 없어(pillow-heif 필요) 받지 않는다
+UPLOAD_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/avif')
+
+
+class UploadError(Exception):
+    pass
+
+
+def sniff_image_type(head):
+    """파일 앞부분 -> 이미지 media type (이미지가 아니면 None)"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head[4:8] == b'ftyp':
+        brand = head[8:12]
+        if brand in (b'avif', b'avis'):
+            return 'image/avif'
+        if brand in (b'heic', b'heix', b'mif1', b'msf1'):
+            return 'image/heic'
+    return None
+
+
+def store_upload(upload, max_bytes=None):
+    """
+    업로드 파일을 저장소에 저장하고 해시 반환
+
+    Args:
+        upload: UploadFile
+        max_bytes: 최대 크기 (기본 UPLOAD_CONFIG['max_bytes'])
+
+    Raises:
+        UploadError: 이미지가 아니거나 너무 큰 경우
+    """
+    max_bytes = max_bytes or UPLOAD_CONFIG['max_bytes']
+    chunk_size = UPLOAD_CONFIG['chunk_size']
+    source = upload.file
+    source.seek(0)
+
+    head = source.read(SNIFF_BYTES)
+    media_type = sniff_image_type(head)
+    if media_type == 'image/heic':
+        raise UploadError("HEIC 이미지는 지원하지 않습니다 (jpeg/png/gif/webp/avif 로 변환해 주세요)")
+    if media_type not in UPLOAD_TYPES:
+        raise UploadError("이미지 파일이 아닙니다 (jpeg/png/gif/webp/avif)")
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=blob_store.tmp_dir(), prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadError(f"이미지 크기 제한 초과 (최대 {max_bytes // 1024 // 1024} MB)")
+                digest.update(chunk)
+                f.write(chunk)
+                chunk = source.read(chunk_size)
+        return blob_store.put_file(tmp_path, digest.hexdigest())
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class UploadLimitMiddleware:
+    """
+    멀티파트 요청 본문 크기 제한 (ASGI 미들웨어)
+    Content-Length 가 크면 본문을 받기 전에, 없으면 받는 도중 한도를 넘을 때 413 으로 끊는다.
+    """
+
+    def __init__(self, app, max_body_bytes=None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes or (UPLOAD_CONFIG['max_bytes'] + UPLOAD_CONFIG['form_overhead'])
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] not in ('POST', 'PUT', 'PATCH'):
+            return await self.app(scope, receive, send)
+        headers = dict(scope['headers'])
+        if not headers.get(b'content-type', b'').startswith(b'multipart/form-data'):
+            return await self.app(scope, receive, send)
+
+        length = headers.get(b'content-length')
+        if length is not None and length.isdigit() and int(length) > self.max_body_bytes:
+            return await self._reject(send)
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {'type': 'http.disconnect'}
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_body_bytes:
+                    # 413 을 먼저 보내고, 앱에는 연결이 끊긴 것으로 알려 본문 읽기를 멈춘다
+                    rejected = True
+                    await self._reject(send)
+                    return {'type': 'http.disconnect'}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+    async def _reject(self, send):
+        body = json.dumps({
+            "result": "Error",
+            "errorMsg": f"요청 크기 제한 초과 (최대 {self.max_body_bytes // 1024 // 1024} MB)",
+        }, ensure_ascii=False).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -11,12 +11,15 @@ LoginHistory API - 고객의 로그인 이력을 저장하는 테이블 CRUD
 |      |        |      |
 """
 
-from fastapi import FastAPI, Form
+from fastapi import FastAPI, APIRouter, Form, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db, get_connection
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from login_writer import login_writer, insert_rows
+import datetime
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8000
 
@@ -33,39 +36,222 @@ class YourModel(BaseModel):
     # TODO: 컬럼 추가
 
 
+# ============================================
+# 조회 공통
+# ============================================
+# loginTime 은 DATETIME (migrations/005_login_history_datetime.sql)
+LOGIN_COLUMNS = "id, cid, loginTime, lStatus, lVersion, lAddress, lPaymentMethod"
+
+
+def login_result(row):
+    return {
+        'id': row[0],
+        'cid' : row[1],
+        'loginTime' : None if row[2] is None else str(row[2]),
+        'lStatus' : row[3],
+        'lVersion' : row[4],
+        'lAddress' : row[5],
+        'lPaymentMethod' : row[6]
+    }
+
+
+# loginTime 은 시간대 없는 서버 로컬 시각으로 저장한다 (서버 코드의 datetime.now() 와 같은 기준)
+# 시간대가 붙은 값(+09:00, Z)은 서버 시간대로 바꾼 뒤 저장 / 비교한다
+def to_storage_time(value):
+    """aware datetime -> 서버 로컬 시각 (naive 는 그대로)"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def parse_login_time(value):
+    """'YYYY-MM-DD HH:MM[:SS]' 또는 ISO-8601 문자열 -> 서버 로컬 datetime (ValueError)"""
+    return to_storage_time(datetime.datetime.fromisoformat(value.strip().replace('Z', '+00:00')))
+
+
 # ============================================
 # 전체 조회 (Read All)
 # ============================================
 # TODO: 전체 목록 조회 API 구현
 # - 이미지 BLOB 컬럼은 제외하고 조회
 # - ORDER BY id 정렬
-@app.get("/select_login_histories")
-async def select_all():
-    conn = connect_db()
+@router.get("/select_login_histories")
+def select_all(
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
     curs = conn.cursor()
     
     # TODO: SQL 작성
-    curs.execute("""
-        SELECT id, cid, loginTime, lStatus, lVersion, lAddress, lPaymentMethod 
+    curs.execute(f"""
+        SELECT {LOGIN_COLUMNS}
         FROM LoginHistory 
+        WHERE id > %s
         ORDER BY id
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
     
-    rows = curs.fetchall()
-    conn.close()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
     
-    # TODO: 결과 매핑
-    result = [{
-        'id': row[0],
-        'cid' : row[1],
-        'loginTime' : row[2],
-        'lStatus' : row[3],
-        'lVersion' : row[4],
-        'lAddress' : row[5],
-        'lPaymentMethod' : row[6]
-    } for row in rows]
+    result = [login_result(row) for row in rows]
     
-    return {"results": result}
+    return {"results": result, "next_cursor": next_cursor}
+
+
+# ============================================
+# 기간 조회 (Read Range)
+# ============================================
+# 최신순(loginTime, id 내림차순) 기간 조회
+# - cid: 고객별 (idx_login_history_cid_time), 없으면 전체 (idx_login_history_time)
+# - status: lStatus 로 거르기 (예: 오늘 실패한 로그인)
+# - from 이상 ~ to 미만 (예: from=2026-10-18&to=2026-10-19)
+# - after: 이전 응답의 next_cursor ('loginTime,id')
+@router.get("/select_login_histories_range")
+def select_range(
+    cid: Optional[int] = None,
+    status: Optional[str] = None,
+    from_time: Optional[datetime.datetime] = Query(None, alias="from"),
+    to_time: Optional[datetime.datetime] = Query(None, alias="to"),
+    after: Optional[str] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
+    from_time, to_time = to_storage_time(from_time), to_storage_time(to_time)
+    conditions, params = ["loginTime IS NOT NULL"], []
+    if cid is not None:
+        conditions.append("cid = %s")
+        params.append(cid)
+    if status is not None:
+        conditions.append("lStatus = %s")
+        params.append(status)
+    if from_time is not None:
+        conditions.append("loginTime >= %s")
+        params.append(from_time)
+    if to_time is not None:
+        conditions.append("loginTime < %s")
+        params.append(to_time)
+    if after is not None:
+        try:
+            after_time, after_id = after.rsplit(',', 1)
+            after_time, after_id = parse_login_time(after_time), int(after_id)
+        except ValueError:
+            return {"result": "Error", "errorMsg": "after 는 이전 응답의 next_cursor 값이어야 합니다"}
+        conditions.append("(loginTime < %s OR (loginTime = %s AND id < %s))")
+        params.extend([after_time, after_time, after_id])
+
+    curs = conn.cursor()
+    curs.execute(f"""
+        SELECT {LOGIN_COLUMNS}
+        FROM LoginHistory
+        WHERE {' AND '.join(conditions)}
+        ORDER BY loginTime DESC, id DESC
+        LIMIT %s
+    """, (*params, limit + 1))
+
+    rows, next_cursor = paginate(curs.fetchall(), limit)
+    if next_cursor is not None:
+        next_cursor = f"{rows[-1][2].isoformat()},{rows[-1][0]}"
+
+    result = [login_result(row) for row in rows]
+
+    return {"results": result, "next_cursor": next_cursor}
+
+
+# ============================================
+# 일별 집계 조회 (login_rollup.py 가 미리 집계한 테이블)
+# ============================================
+# 원본 이력을 세지 않고 일별 집계 행만 읽으므로 이력 양과 관계없이 기간(일 수)만큼만 읽는다
+# - from ~ to 날짜 포함 (기본: 오늘까지 30일, 최대 ROLLUP_MAX_DAYS 일)
+# - as_of: 집계가 마지막으로 갱신된 시각 (그 이후 로그인은 아직 반영 전)
+ROLLUP_MAX_DAYS = 366
+ROLLUP_GROUPS = {'day': 'day', 'version': 'lVersion', 'status': 'lStatus'}
+
+
+def rollup_range(from_day, to_day):
+    to_day = to_day or datetime.date.today()
+    from_day = from_day or to_day - datetime.timedelta(days=29)
+    if from_day > to_day:
+        raise ValueError("from 은 to 보다 늦을 수 없습니다")
+    if (to_day - from_day).days >= ROLLUP_MAX_DAYS:
+        raise ValueError(f"기간은 최대 {ROLLUP_MAX_DAYS}일입니다")
+    return from_day, to_day
+
+
+def rollup_as_of(curs):
+    curs.execute("SELECT updated_at FROM RollupWatermark WHERE name = 'login_daily'")
+    row = curs.fetchone()
+    return None if row is None else str(row[0])
+
+
+# 로그인 수: group_by 는 day, version, status 를 쉼표로 조합 (예: group_by=version -> 기간 전체 버전별)
+@router.get("/login_rollups")
+def select_rollups(
+    from_day: Optional[datetime.date] = Query(None, alias="from"),
+    to_day: Optional[datetime.date] = Query(None, alias="to"),
+    group_by: str = "day,version,status",
+    conn = Depends(get_db)
+):
+    try:
+        from_day, to_day = rollup_range(from_day, to_day)
+        groups = [name.strip() for name in group_by.split(',') if name.strip()]
+        unknown = [name for name in groups if name not in ROLLUP_GROUPS]
+        if unknown or not groups:
+            raise ValueError(f"group_by 는 {', '.join(ROLLUP_GROUPS)} 중에서 골라야 합니다")
+        names = list(dict.fromkeys(groups))
+        columns = ', '.join(ROLLUP_GROUPS[name] for name in names)
+
+        curs = conn.cursor()
+        curs.execute(f"""
+            SELECT {columns}, SUM(logins)
+            FROM LoginDailyRollup
+            WHERE day BETWEEN %s AND %s
+            GROUP BY {columns}
+            ORDER BY {columns}
+        """, (from_day, to_day))
+        result = []
+        for row in curs.fetchall():
+            item = {}
+            for name, value in zip(names, row):
+                if name == 'day':
+                    value = str(value)
+                elif name == 'version':
+                    value = float(value)
+                item[name] = value
+            item['logins'] = int(row[-1])
+            result.append(item)
+
+        return {"results": result, "as_of": rollup_as_of(curs)}
+    except Exception as e:
+        return {"result": "Error", "errorMsg": str(e)}
+
+
+# 일별 활성 고객 수: dau(그날), wau(그날까지 7일), mau(그날까지 30일)
+@router.get("/login_activity")
+def select_activity(
+    from_day: Optional[datetime.date] = Query(None, alias="from"),
+    to_day: Optional[datetime.date] = Query(None, alias="to"),
+    conn = Depends(get_db)
+):
+    try:
+        from_day, to_day = rollup_range(from_day, to_day)
+        curs = conn.cursor()
+        curs.execute("""
+            SELECT day, dau, wau, mau
+            FROM LoginDailyActive
+            WHERE day BETWEEN %s AND %s
+            ORDER BY day
+        """, (from_day, to_day))
+        result = [{
+            'day': str(row[0]),
+            'dau': row[1],
+            'wau': row[2],
+            'mau': row[3],
+        } for row in curs.fetchall()]
+
+        return {"results": result, "as_of": rollup_as_of(curs)}
+    except Exception as e:
+        return {"result": "Error", "errorMsg": str(e)}
 
 
 # ============================================
@@ -73,64 +259,42 @@ async def select_all():
 # ============================================
 # TODO: ID로 단일 조회 API 구현
 # - 존재하지 않으면 에러 응답
-@app.get("/select_login_history/{item_id}")
-async def select_one(item_id: int):
-    conn = connect_db()
+@router.get("/select_login_history/{item_id}")
+def select_one(item_id: int, conn = Depends(get_db)):
     curs = conn.cursor()
     
     # TODO: SQL 작성
-    curs.execute("""
-        SELECT id, cid, loginTime, lStatus, lVersion, lAddress, lPaymentMethod 
+    curs.execute(f"""
+        SELECT {LOGIN_COLUMNS}
         FROM LoginHistory 
         WHERE id = %s
     """, (item_id,))
     
     row = curs.fetchone()
-    conn.close()
     
     if row is None:
         return {"result": "Error", "message": "LoginHistory not found"}
     
-    # TODO: 결과 매핑
-    result = {
-        'id': row[0],
-        'cid' : row[1],
-        'loginTime' : row[2],
-        'lStatus' : row[3],
-        'lVersion' : row[4],
-        'lAddress' : row[5],
-        'lPaymentMethod' : row[6]
-        # ...
-    }
-    return {"result": result}
+    return {"result": login_result(row)}
 
 
 # ============================================
 # 추가 (Create)
 # ============================================
-# TODO: 새 레코드 추가 API 구현
-# - Form 데이터로 받기: 파라미터 = Form(...)
-# - 성공 시 생성된 ID 반환
-# - 에러 처리 필수
-@app.post("/insert_login_history")
-async def insert_one(cid: int = Form(...), loginTime: str = Form(...), lStatus: str = Form(...), lVersion: float = Form(...), lAddress: str = Form(...), lPaymentMethod: str = Form(...)
-    # TODO: Form 파라미터 정의
-    # 예: columnName: str = Form(...)
-):
+# 로그인 응답이 DB 쓰기를 기다리지 않도록 큐에 넣고 바로 응답한다 (login_writer.py)
+# - 큐에 넣은 경우 id 는 아직 없으므로 {"result": "OK", "queued": true}
+# - 큐가 가득 찼거나 writer 가 멈춰 있으면 바로 저장하고 id 반환
+@router.post("/insert_login_history")
+def insert_one(cid: int = Form(...), loginTime: str = Form(...), lStatus: str = Form(...), lVersion: float = Form(...), lAddress: str = Form(...), lPaymentMethod: str = Form(...)):
     try:
-        conn = connect_db()
-        curs = conn.cursor()
-        
-        # TODO: SQL 작성
-        sql = """
-            INSERT INTO LoginHistory (cid, loginTime, lStatus, lVersion, lAddress, lPaymentMethod) 
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        curs.execute(sql, (cid, loginTime, lStatus, lVersion, lAddress, lPaymentMethod))
-        
-        conn.commit()
-        inserted_id = curs.lastrowid
-        conn.close()
+        row = (cid, parse_login_time(loginTime), lStatus, lVersion, lAddress, lPaymentMethod)
+    except ValueError:
+        return {"result": "Error", "errorMsg": f"loginTime 형식이 잘못되었습니다: {loginTime}"}
+    if login_writer.submit(row):
+        return {"result": "OK", "queued": True}
+    try:
+        with get_connection() as conn:
+            inserted_id = insert_rows(conn, [row])
         
         return {"result": "OK", "id": inserted_id}
     except Exception as e:
@@ -142,13 +306,13 @@ async def insert_one(cid: int = Form(...), loginTime: str = Form(...), lStatus:
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_login_history")
-async def update_one(
-    id: int = Form(...), cid: int = Form(...), loginTime: str = Form(...), lStatus: str = Form(...), lVersion: float = Form(...), lAddress: str = Form(...), lPaymentMethod: str = Form(...)
+@router.post("/update_login_history")
+def update_one(
+    id: int = Form(...), cid: int = Form(...), loginTime: str = Form(...), lStatus: str = Form(...), lVersion: float = Form(...), lAddress: str = Form(...), lPaymentMethod: str = Form(...),
+    conn = Depends(get_db)
     # TODO: 수정할 Form 파라미터 정의
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -157,10 +321,9 @@ async def update_one(
             SET cid=%s, loginTime=%s, lStatus=%s, lVersion=%s, lAddress=%s, lPaymentMethod=%s
             WHERE id=%s
         """
-        curs.execute(sql, (cid, loginTime, lStatus, lVersion, lAddress, lPaymentMethod, id))
+        curs.execute(sql, (cid, parse_login_time(loginTime), lStatus, lVersion, lAddress, lPaymentMethod, id))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -172,17 +335,15 @@ async def update_one(
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_login_history/{item_id}")
-async def delete_one(item_id: int):
+@router.delete("/delete_login_history/{item_id}")
+def delete_one(item_id: int, conn = Depends(get_db)):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         sql = "DELETE FROM LoginHistory WHERE id=%s"
         curs.execute(sql, (item_id))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -195,7 +356,7 @@ async def delete_one(item_id: int):
 # TODO: 이미지 바이너리 직접 반환
 # - Response 객체 사용
 # - media_type: "image/jpeg" 또는 "image/png"
-# @app.get("/view_[테이블명]_image/{item_id}")
+# @router.get("/view_[테이블명]_image/{item_id}")
 # async def view_image(item_id: int):
 #     try:
 #         conn = connect_db()
@@ -224,7 +385,7 @@ async def delete_one(item_id: int):
 # ============================================
 # TODO: 이미지만 별도로 업데이트
 # - UploadFile = File(...) 사용
-# @app.post("/update_[테이블명]_image")
+# @router.post("/update_[테이블명]_image")
 # async def update_image(
 #     item_id: int = Form(...),
 #     file: UploadFile = File(...)
@@ -249,6 +410,8 @@ async def delete_one(item_id: int):
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 [테이블명] API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
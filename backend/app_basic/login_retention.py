@@ -0,0 +1,76 @@
+"""
+로그인 이력 보관 기간 정리 (주기 실행: cron 등)
+실행: python login_retention.py [--days 365] [--batch 1000] [--archive] [--dry-run]
+
+loginTime 이 보관 기간(--days)보다 오래된 이력을 작은 묶음(--batch)으로 지운다.
+- 묶음마다 따로 커밋하고 잠깐 쉬어서(--pause-ms) 긴 잠금 없이 로그인 기록과 같이 돌 수 있다
+- 대상은 idx_login_history_time 으로 오래된 순으로 찾고, 지우기는 PK(id)로 한다
+- --archive 면 지우기 전에 같은 트랜잭션에서 LoginHistoryArchive 로 복사한다
+- 실행 전에 database/migrations 의 005 를 먼저 적용해야 한다
+"""
+
+import argparse
+import datetime
+import time
+
+from database.connection import get_connection
+
+
+RETENTION_CONFIG = {
+    'days': 365,
+    'batch': 1000,
+    'pause_ms': 100,
+}
+
+LOGIN_COLUMNS = "id, cid, loginTime, lStatus, lVersion, lAddress, lPaymentMethod"
+
+
+def purge(conn, horizon, batch, archive=False, pause_ms=0, dry_run=False):
+    """horizon 보다 오래된 이력을 지운다 -> 지운(지울) 행 수"""
+    curs = conn.cursor()
+    if dry_run:
+        curs.execute("SELECT COUNT(*) FROM LoginHistory WHERE loginTime < %s", (horizon,))
+        return curs.fetchone()[0]
+
+    purged = 0
+    while True:
+        curs.execute("""
+            SELECT id FROM LoginHistory
+            WHERE loginTime < %s
+            ORDER BY loginTime
+            LIMIT %s
+        """, (horizon, batch))
+        ids = [row[0] for row in curs.fetchall()]
+        if not ids:
+            break
+        placeholders = ', '.join(['%s'] * len(ids))
+        if archive:
+            curs.execute(f"""
+                INSERT IGNORE INTO LoginHistoryArchive ({LOGIN_COLUMNS})
+                SELECT {LOGIN_COLUMNS} FROM LoginHistory WHERE id IN ({placeholders})
+            """, ids)
+        curs.execute(f"DELETE FROM LoginHistory WHERE id IN ({placeholders})", ids)
+        conn.commit()
+        purged += len(ids)
+        print(f"  LoginHistory: {purged} rows")
+        if pause_ms:
+            time.sleep(pause_ms / 1000)
+    return purged
+
+
+def main(args):
+    horizon = datetime.datetime.now() - datetime.timedelta(days=args.days)
+    with get_connection() as conn:
+        purged = purge(conn, horizon, args.batch, args.archive, args.pause_ms, args.dry_run)
+    action = "지울 예정" if args.dry_run else ("보관 후 삭제" if args.archive else "삭제")
+    print(f"✅ LoginHistory: {horizon:%Y-%m-%d %H:%M} 이전 {purged} rows {action}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="보관 기간이 지난 로그인 이력 정리")
+    parser.add_argument("--days", type=int, default=RETENTION_CONFIG['days'], help="보관 기간(일)")
+    parser.add_argument("--batch", type=int, default=RETENTION_CONFIG['batch'], help="한 번에 지울 행 수")
+    parser.add_argument("--pause-ms", type=int, default=RETENTION_CONFIG['pause_ms'], help="묶음 사이 쉬는 시간(ms)")
+    parser.add_argument("--archive", action="store_true", help="지우기 전에 LoginHistoryArchive 로 복사")
+    parser.add_argument("--dry-run", action="store_true", help="지울 양만 계산")
+    main(parser.parse_args())
@@ -0,0 +1,261 @@
+"""
+로그인 일별 집계 (주기 실행: 서버 안 login_rollup_job / login_check_job, 또는 직접 실행)
+실행: python login_rollup.py [--batch 10000] [--rebuild] [--check --days 7 [--repair]]
+
+LoginHistory 를 매번 GROUP BY / COUNT(DISTINCT) 하지 않도록 미리 집계해 둔다 (migrations/006_login_rollup.sql).
+- RollupWatermark('login_daily').last_id 이후 id 만 batch 건씩 읽는다 (PK 범위 읽기)
+  아직 커밋 전인 id(빈틈)를 건너뛰지 않도록 빈틈 없이 이어지는 곳까지만 읽는다 (watermark.py)
+- LoginDailyRollup: 일 x lVersion x lStatus 로그인 수를 더한다
+- LoginActiveDay: 그날 로그인한 고객 (일, cid) 을 넣는다 (INSERT IGNORE)
+- LoginDailyActive: 새 이력이 들어온 날과 그 뒤 29일의 DAU / WAU / MAU 를 LoginActiveDay 로 다시 센다
+- 한 묶음(집계 + 워터마크 이동)을 한 트랜잭션으로 처리하고, 워터마크 행을 FOR UPDATE 로 잠가
+  여러 워커가 동시에 돌아도 같은 이력을 두 번 세지 않는다
+
+- 정합성 확인(check): 최근 며칠을 워터마크까지의 원본으로 다시 세어 집계와 비교한다
+  집계 후에 바뀐 이력(수정/삭제)이나 lag 보다 늦게 커밋된 이력은 여기서 드러난다
+  -> repair 로 그날들을 원본 기준으로 다시 집계한다 (서버 안 login_check_job 은 자동으로)
+
+주의: 보관 기간 정리(login_retention.py)로 원본을 지운 날은 확인하지 않는다 (집계만 남아 있는 게 정상)
+"""
+
+import argparse
+import datetime
+
+from database.connection import get_connection
+from periodic import PeriodicJob
+from watermark import lock_watermark, next_upto
+
+
+ROLLUP_CONFIG = {
+    'interval': 60,       # 서버 안 주기 (초)
+    'batch': 10000,       # 한 트랜잭션에서 읽을 이력 수
+    'max_batches': 50,    # 서버 안 한 번 실행에서 처리할 최대 묶음 수
+    'check_interval': 86400,   # 서버 안 정합성 확인 주기 (초)
+    'check_days': 7,           # 정합성 확인 기간 (오늘까지 며칠, 보관 기간보다 짧게)
+    'check_delay': 600,        # 서버 시작 후 첫 정합성 확인까지 (초)
+}
+
+WATERMARK = 'login_daily'
+ACTIVE_WINDOWS = {'wau': 7, 'mau': 30}
+
+
+def affected_days(days, today):
+    """새 이력이 들어온 날 -> DAU/WAU/MAU 를 다시 세야 하는 날 (뒤쪽 창이 겹치는 날까지)"""
+    span = max(ACTIVE_WINDOWS.values())
+    last = max(max(days), today)
+    result = set()
+    for day in days:
+        for offset in range(span):
+            target = day + datetime.timedelta(days=offset)
+            if target > last:
+                break
+            result.add(target)
+    return sorted(result)
+
+
+def refresh_active(curs, days):
+    """LoginActiveDay 로 days 의 DAU / WAU / MAU 계산 (PK (day, cid) 범위 읽기)"""
+    for day in days:
+        wau_from = day - datetime.timedelta(days=ACTIVE_WINDOWS['wau'] - 1)
+        mau_from = day - datetime.timedelta(days=ACTIVE_WINDOWS['mau'] - 1)
+        curs.execute("""
+            REPLACE INTO LoginDailyActive (day, dau, wau, mau)
+            SELECT %s,
+                (SELECT COUNT(*) FROM LoginActiveDay WHERE day = %s),
+                (SELECT COUNT(DISTINCT cid) FROM LoginActiveDay WHERE day BETWEEN %s AND %s),
+                (SELECT COUNT(DISTINCT cid) FROM LoginActiveDay WHERE day BETWEEN %s AND %s)
+        """, (day, day, wau_from, day, mau_from, day))
+
+
+def refresh_step(conn, batch):
+    """워터마크 다음 이력 batch 건 집계 + 워터마크 이동 -> 처리한 이력 수"""
+    curs = conn.cursor()
+    last_id = lock_watermark(curs, conn, WATERMARK)
+    upto, count = next_upto(curs, WATERMARK, 'LoginHistory', last_id, batch)
+    if not count:
+        conn.commit()
+        return 0
+
+    curs.execute("""
+        INSERT INTO LoginDailyRollup (day, lVersion, lStatus, logins)
+        SELECT * FROM (
+            SELECT DATE(loginTime) AS day, COALESCE(lVersion, 0) AS version,
+                   COALESCE(lStatus, '') AS status, COUNT(*) AS n
+            FROM LoginHistory
+            WHERE id > %s AND id <= %s AND loginTime IS NOT NULL
+            GROUP BY day, version, status
+        ) AS t
+        ON DUPLICATE KEY UPDATE logins = logins + t.n
+    """, (last_id, upto))
+    curs.execute("""
+        INSERT IGNORE INTO LoginActiveDay (day, cid)
+        SELECT DISTINCT DATE(loginTime), cid
+        FROM LoginHistory
+        WHERE id > %s AND id <= %s AND loginTime IS NOT NULL
+    """, (last_id, upto))
+    curs.execute("""
+        SELECT DISTINCT DATE(loginTime)
+        FROM LoginHistory
+        WHERE id > %s AND id <= %s AND loginTime IS NOT NULL
+    """, (last_id, upto))
+    days = [row[0] for row in curs.fetchall()]
+    if days:
+        refresh_active(curs, affected_days(days, datetime.date.today()))
+
+    curs.execute("UPDATE RollupWatermark SET last_id = %s WHERE name = %s", (upto, WATERMARK))
+    conn.commit()
+    return count
+
+
+def refresh(conn, batch=ROLLUP_CONFIG['batch'], max_batches=None):
+    """밀린 이력을 모두(또는 max_batches 묶음까지) 집계 -> 처리한 이력 수"""
+    processed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = refresh_step(conn, batch)
+        if not count:
+            break
+        processed += count
+        batches += 1
+    return processed
+
+
+def rebuild(conn):
+    """집계를 비우고 워터마크를 처음으로 (이후 refresh 가 남은 이력 전체를 다시 집계)"""
+    curs = conn.cursor()
+    lock_watermark(curs, conn, WATERMARK)
+    for table in ('LoginDailyRollup', 'LoginActiveDay', 'LoginDailyActive'):
+        curs.execute(f"DELETE FROM {table}")
+    curs.execute("UPDATE RollupWatermark SET last_id = 0 WHERE name = %s", (WATERMARK,))
+    conn.commit()
+
+
+def day_bounds(day):
+    start = datetime.datetime.combine(day, datetime.time())
+    return start, start + datetime.timedelta(days=1)
+
+
+def check(conn, from_day, to_day):
+    """
+    from_day ~ to_day(포함)를 워터마크까지의 원본으로 다시 세어 LoginDailyRollup / LoginActiveDay 와 비교
+
+    Returns:
+        차이 난 날 목록 (정렬)
+    """
+    curs = conn.cursor()
+    start, end = day_bounds(from_day)[0], day_bounds(to_day)[1]
+    try:
+        # 같은 스냅샷에서 읽는다 (REPEATABLE READ) -> 사이에 집계가 돌아도 워터마크와 집계가 맞는다
+        curs.execute("SELECT last_id FROM RollupWatermark WHERE name = %s", (WATERMARK,))
+        row = curs.fetchone()
+        if row is None:
+            raise RuntimeError("RollupWatermark 가 없습니다 (migrations/006_login_rollup.sql 적용 필요)")
+        last_id = row[0]
+
+        curs.execute("""
+            SELECT day, lVersion, lStatus, logins FROM LoginDailyRollup
+            WHERE day BETWEEN %s AND %s
+        """, (from_day, to_day))
+        summary = {(row[0], float(row[1]), row[2]): int(row[3]) for row in curs.fetchall()}
+        curs.execute("""
+            SELECT DATE(loginTime) AS day, COALESCE(lVersion, 0), COALESCE(lStatus, ''), COUNT(*)
+            FROM LoginHistory
+            WHERE id <= %s AND loginTime >= %s AND loginTime < %s
+            GROUP BY 1, 2, 3
+        """, (last_id, start, end))
+        source = {(row[0], float(row[1]), row[2]): int(row[3]) for row in curs.fetchall()}
+
+        curs.execute("""
+            SELECT day, COUNT(*) FROM LoginActiveDay
+            WHERE day BETWEEN %s AND %s
+            GROUP BY day
+        """, (from_day, to_day))
+        active = dict(curs.fetchall())
+        curs.execute("""
+            SELECT DATE(loginTime) AS day, COUNT(DISTINCT cid)
+            FROM LoginHistory
+            WHERE id <= %s AND loginTime >= %s AND loginTime < %s
+            GROUP BY 1
+        """, (last_id, start, end))
+        source_active = dict(curs.fetchall())
+    finally:
+        conn.rollback()
+
+    days = {key[0] for key in summary.keys() | source.keys() if summary.get(key) != source.get(key)}
+    days |= {day for day in active.keys() | source_active.keys() if active.get(day) != source_active.get(day)}
+    return sorted(days)
+
+
+def repair(conn, days):
+    """days 의 집계를 워터마크까지의 원본으로 다시 만들고 DAU/WAU/MAU 를 다시 센다"""
+    curs = conn.cursor()
+    last_id = lock_watermark(curs, conn, WATERMARK)
+    for day in sorted(set(days)):
+        start, end = day_bounds(day)
+        curs.execute("DELETE FROM LoginDailyRollup WHERE day = %s", (day,))
+        curs.execute("""
+            INSERT INTO LoginDailyRollup (day, lVersion, lStatus, logins)
+            SELECT DATE(loginTime), COALESCE(lVersion, 0), COALESCE(lStatus, ''), COUNT(*)
+            FROM LoginHistory
+            WHERE id <= %s AND loginTime >= %s AND loginTime < %s
+            GROUP BY 1, 2, 3
+        """, (last_id, start, end))
+        curs.execute("DELETE FROM LoginActiveDay WHERE day = %s", (day,))
+        curs.execute("""
+            INSERT IGNORE INTO LoginActiveDay (day, cid)
+            SELECT DISTINCT DATE(loginTime), cid
+            FROM LoginHistory
+            WHERE id <= %s AND loginTime >= %s AND loginTime < %s
+        """, (last_id, start, end))
+    if days:
+        refresh_active(curs, affected_days(days, datetime.date.today()))
+    conn.commit()
+
+
+def check_recent(conn, days=ROLLUP_CONFIG['check_days']):
+    """오늘까지 days 일 정합성 확인 + 차이 난 날 다시 집계 (서버 안 login_check_job) -> 다시 집계한 날 수"""
+    to_day = datetime.date.today()
+    from_day = to_day - datetime.timedelta(days=days - 1)
+    changed = check(conn, from_day, to_day)
+    if changed:
+        print(f"⚠️ 로그인 집계가 원본과 달라 다시 집계합니다: {', '.join(map(str, changed))}")
+        repair(conn, changed)
+    return len(changed)
+
+
+login_rollup_job = PeriodicJob(
+    'login-rollup',
+    lambda conn: refresh(conn, ROLLUP_CONFIG['batch'], ROLLUP_CONFIG['max_batches']),
+    ROLLUP_CONFIG['interval'],
+)
+login_check_job = PeriodicJob(
+    'login-check', check_recent, ROLLUP_CONFIG['check_interval'], ROLLUP_CONFIG['check_delay'],
+)
+
+
+def main(args):
+    with get_connection() as conn:
+        if args.rebuild:
+            rebuild(conn)
+            print("🔄 로그인 집계를 비웠습니다 (보관 기간 정리로 지운 이력은 다시 집계되지 않습니다)")
+        processed = refresh(conn, args.batch)
+        print(f"✅ LoginHistory: {processed} rows 집계")
+
+        if args.check:
+            to_day = datetime.date.today()
+            from_day = to_day - datetime.timedelta(days=args.days - 1)
+            changed = check(conn, from_day, to_day)
+            print(f"{'⚠️' if changed else '✅'} {from_day} ~ {to_day}: 차이 {len(changed)}일 {', '.join(map(str, changed))}")
+            if changed and args.repair:
+                repair(conn, changed)
+                print(f"🔄 {len(changed)}일을 원본으로 다시 집계했습니다")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로그인 이력 일별 집계")
+    parser.add_argument("--batch", type=int, default=ROLLUP_CONFIG['batch'], help="한 트랜잭션에서 읽을 이력 수")
+    parser.add_argument("--rebuild", action="store_true", help="집계를 비우고 처음부터 다시")
+    parser.add_argument("--check", action="store_true", help="최근 --days 일을 원본과 비교")
+    parser.add_argument("--days", type=int, default=ROLLUP_CONFIG['check_days'], help="정합성 확인 기간(일)")
+    parser.add_argument("--repair", action="store_true", help="--check 에서 차이 난 날을 원본으로 다시 집계")
+    main(parser.parse_args())
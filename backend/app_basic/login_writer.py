@@ -0,0 +1,213 @@
+"""
+로그인 이력 지연 저장 (write-behind)
+
+로그인마다 INSERT + 커밋을 하면 원격 DB 쓰기가 로그인 응답을 기다리게 한다.
+대신 메모리 큐에 쌓아 두고 백그라운드 스레드가 모아서 저장한다.
+- flush_interval_ms 마다, 또는 batch_rows 건이 쌓이면 다중 행 INSERT 한 번 + 커밋 한 번
+- 큐는 max_queue 건까지만 (메모리 제한). 가득 차면 submit() 이 False -> 호출한 쪽에서 바로 저장
+- 묶음 INSERT 가 데이터 오류(없는 cid 의 FK 위반 등)로 실패하면 묶음을 반씩 나눠 다시 저장한다
+  끝까지 실패하는 행만 로그를 남기고 버린다 (dead_lettered) -> 나머지 행은 저장된다
+- 연결 끊김 같은 일시적인 오류면 남은 행을 큐 앞에 다시 넣고 다음 주기에 재시도한다
+  행마다 max_retries 번까지만 재시도하고, 넘거나 큐에 자리가 없으면 버리고 dropped 로 센다
+- 서버 종료 시 stop() 이 남은 이력을 모두 저장한다 (main.py lifespan)
+
+주의: 프로세스가 비정상 종료되면 아직 저장하지 않은 이력(최대 flush_interval_ms 분량)은 사라진다.
+"""
+
+import threading
+import time
+from collections import deque
+
+import pymysql
+
+from database.connection import get_connection
+
+
+WRITE_BEHIND_CONFIG = {
+    'flush_interval_ms': 200,
+    'batch_rows': 500,
+    'max_queue': 10000,
+    'max_retries': 5,
+}
+
+# 다시 보내도 같은 결과인 오류 (행 자체의 문제) -> 나눠서 해당 행만 버린다
+DATA_ERRORS = (pymysql.err.IntegrityError, pymysql.err.DataError)
+
+LOGIN_COLUMNS = ('cid', 'loginTime', 'lStatus', 'lVersion', 'lAddress', 'lPaymentMethod')
+
+
+def insert_rows(conn, rows):
+    """이력 여러 건을 다중 행 INSERT 한 번으로 저장하고 커밋 -> 첫 행 id"""
+    curs = conn.cursor()
+    curs.executemany(f"""
+        INSERT INTO LoginHistory ({', '.join(LOGIN_COLUMNS)})
+        VALUES ({', '.join(['%s'] * len(LOGIN_COLUMNS))})
+    """, rows)
+    conn.commit()
+    return curs.lastrowid
+
+
+class LoginWriter:
+    def __init__(self, flush_interval_ms, batch_rows, max_queue, max_retries):
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_rows = batch_rows
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self._cond = threading.Condition()
+        self._queue = deque()   # (이력 튜플, 재시도 횟수)
+        self._thread = None
+        self._stopping = False
+        self._queued = 0
+        self._written = 0
+        self._batches = 0
+        self._rejected = 0
+        self._failures = 0
+        self._dropped = 0
+        self._dead_lettered = 0
+        self._last_flush_ms = 0.0
+
+    def start(self):
+        """백그라운드 저장 스레드 시작"""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='login-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=30):
+        """남은 이력을 모두 저장하고 스레드 종료"""
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify()
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            self._thread = None
+            if self._queue:
+                print(f"⚠️ 로그인 이력 {len(self._queue)}건을 저장하지 못했습니다")
+                self._dropped += len(self._queue)
+                self._queue.clear()
+
+    def submit(self, row):
+        """
+        이력 한 건을 큐에 넣는다
+
+        Args:
+            row: LOGIN_COLUMNS 순서의 튜플
+
+        Returns:
+            bool: 큐에 넣었으면 True, 가득 찼거나 멈춰 있으면 False (바로 저장해야 한다)
+        """
+        with self._cond:
+            if self._thread is None or self._stopping or len(self._queue) >= self.max_queue:
+                self._rejected += 1
+                return False
+            self._queue.append((row, 0))
+            self._queued += 1
+            if len(self._queue) >= self.batch_rows:
+                self._cond.notify()
+            return True
+
+    def _run(self):
+        failed = False
+        while True:
+            with self._cond:
+                # 직전 저장이 실패했으면 쌓인 양과 관계없이 한 주기 쉬었다가 재시도
+                if not self._stopping and (failed or len(self._queue) < self.batch_rows):
+                    self._cond.wait(self.flush_interval)
+                stopping = self._stopping
+            failed = not self.flush()
+            if stopping:
+                return
+
+    def _take(self):
+        with self._cond:
+            count = min(len(self._queue), self.batch_rows)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _requeue(self, items):
+        """일시적인 오류로 저장 못 한 행을 재시도 횟수를 올려 큐 앞으로 (한도를 넘거나 자리가 없으면 버린다)"""
+        retry = [(row, attempts + 1) for row, attempts in items if attempts + 1 < self.max_retries]
+        with self._cond:
+            room = max(0, self.max_queue - len(self._queue))
+            keep = retry[:room]
+            self._queue.extendleft(reversed(keep))
+            dropped = len(items) - len(keep)
+            self._dropped += dropped
+        if dropped:
+            print(f"⚠️ 로그인 이력 {dropped}건을 재시도 한도 초과로 버렸습니다")
+
+    def _write(self, conn, items):
+        """
+        items 를 저장. 데이터 오류면 반씩 나눠 다시 저장하고 한 행만 남아도 실패하면 그 행은 버린다
+
+        Returns:
+            (저장한 행 수, 버린 [(행, 오류)], 일시적인 오류로 못 한 items, 그 오류 | None)
+        """
+        pending = [items]
+        written, dead = 0, []
+        while pending:
+            part = pending.pop()
+            try:
+                insert_rows(conn, [row for row, _ in part])
+                written += len(part)
+            except DATA_ERRORS as e:
+                conn.rollback()
+                if len(part) == 1:
+                    dead.append((part[0][0], e))
+                else:
+                    mid = len(part) // 2
+                    pending.append(part[mid:])
+                    pending.append(part[:mid])
+            except Exception as e:
+                remaining = part + [item for rest in reversed(pending) for item in rest]
+                return written, dead, remaining, e
+        return written, dead, [], None
+
+    def flush(self):
+        """큐가 빌 때까지 batch_rows 건씩 저장 -> 일시적인 오류로 실패하면 False"""
+        while True:
+            items = self._take()
+            if not items:
+                return True
+            start = time.monotonic()
+            try:
+                with get_connection() as conn:
+                    written, dead, remaining, error = self._write(conn, items)
+            except Exception as e:
+                written, dead, remaining, error = 0, [], items, e
+            for row, e in dead:
+                print(f"⚠️ 로그인 이력 저장 불가로 버림 (cid={row[0]}): {e}")
+            with self._cond:
+                self._written += written
+                self._dead_lettered += len(dead)
+                if written:
+                    self._batches += 1
+                    self._last_flush_ms = round((time.monotonic() - start) * 1000, 1)
+                if error is not None:
+                    self._failures += 1
+            if error is not None:
+                print(f"⚠️ 로그인 이력 저장 실패 ({len(remaining)}건): {error}")
+                self._requeue(remaining)
+                return False
+
+    def stats(self):
+        with self._cond:
+            return {
+                "running": self._thread is not None,
+                "pending": len(self._queue),
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "written": self._written,
+                "batches": self._batches,
+                "rejected": self._rejected,
+                "failures": self._failures,
+                "dropped": self._dropped,
+                "dead_lettered": self._dead_lettered,
+                "last_flush_ms": self._last_flush_ms,
+            }
+
+
+login_writer = LoginWriter(**WRITE_BEHIND_CONFIG)
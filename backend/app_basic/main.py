@@ -0,0 +1,162 @@
+"""
+Shoes Store API - 전체 모듈 통합 서버
+실행: python main.py
+멀티 워커 실행: uvicorn main:app --host 0.0.0.0 --port 8000 --workers 4
+
+각 모듈(product_gt.py, user_gt.py, ...)의 router를 하나의 FastAPI 앱에 등록한다.
+커넥션 풀과 시작/종료 처리는 이 앱 하나에서 관리한다.
+(--workers 사용 시 워커 프로세스마다 커넥션 풀이 하나씩 생긴다:
+ 최대 DB 연결 수 = 워커 수 x POOL_CONFIG['max_size'])
+
+작성일: 2026-10-18
+
+수정 이력:
+| 날짜 | 작성자 | 내용 |
+|------|--------|------|
+|      |        |      |
+"""
+
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
+from database.connection import pool, get_connection
+from category_cache import categories
+from response_cache import product_cache, availability_cache
+from search_index import search_index
+from thumbnails import thumbnails
+from image_upload import UploadLimitMiddleware
+from facet_index import facet_index
+from branch_index import branch_index
+from bestseller import bestsellers
+from login_writer import login_writer
+from login_rollup import login_rollup_job, login_check_job
+from sales_rollup import sales_rollup_job, sales_check_job
+
+import branch
+import branch_stock
+import login_history
+import manufacturer
+import product
+import product_base
+import product_gt
+import product_image
+import purchase
+import purchase_item
+import refund
+import sales_summary
+import staff_gt
+import user_gt
+
+ipAddress = "127.0.0.1"
+port = 8000
+
+# 서버 안에서 주기적으로 도는 작업 (periodic.PeriodicJob)
+JOBS = (login_rollup_job, login_check_job, sales_rollup_job, sales_check_job)
+
+
+# ============================================
+# 시작 / 종료 처리
+# ============================================
+def load_caches():
+    with get_connection() as conn:
+        categories.load(conn)
+        search_index.build(conn)
+        facet_index.build(conn)
+        branch_index.build(conn)
+        bestsellers.build(conn)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 시작: 커넥션 풀 미리 채우기 (실패해도 요청 시 연결을 새로 만든다)
+    try:
+        await run_in_threadpool(pool.open)
+    except Exception as e:
+        print(f"⚠️ 커넥션 풀 초기화 실패: {e}")
+    # 시작: 카테고리 캐시 / 검색·패싯·매장 위치·인기 상품 인덱스 미리 만들기 (실패하면 첫 조회 때 만든다)
+    try:
+        await run_in_threadpool(load_caches)
+    except Exception as e:
+        print(f"⚠️ 캐시 초기화 실패: {e}")
+    # 시작: 로그인 이력 지연 저장 스레드 / 주기 집계 작업
+    login_writer.start()
+    for job in JOBS:
+        job.start()
+    yield
+    # 종료: 집계 작업 멈춤 -> 큐에 남은 로그인 이력 저장 -> 유휴 연결 정리
+    for job in JOBS:
+        await run_in_threadpool(job.stop)
+    await run_in_threadpool(login_writer.stop)
+    await run_in_threadpool(pool.close)
+
+
+app = FastAPI(lifespan=lifespan)
+# 업로드 요청 본문 크기 제한 (초과하면 본문을 다 받기 전에 413)
+app.add_middleware(UploadLimitMiddleware)
+
+for module in (
+    product_gt,
+    user_gt,
+    staff_gt,
+    branch,
+    branch_stock,
+    refund,
+    sales_summary,
+    purchase,
+    purchase_item,
+    login_history,
+    product,
+    product_base,
+    product_image,
+    manufacturer,
+):
+    app.include_router(module.router)
+
+
+# ============================================
+# 커넥션 풀 상태 조회
+# ============================================
+@app.get("/pool_stats")
+def pool_stats():
+    return {"result": pool.stats()}
+
+
+# ============================================
+# 응답 캐시 상태 조회
+# ============================================
+@app.get("/cache_stats")
+def cache_stats():
+    return {"result": {
+        "products": product_cache.stats(),
+        "availability": availability_cache.stats(),
+        "thumbnails": thumbnails.stats(),
+    }}
+
+
+# ============================================
+# 로그인 이력 지연 저장 상태 조회
+# ============================================
+@app.get("/login_writer_stats")
+def login_writer_stats():
+    return {"result": login_writer.stats()}
+
+
+# ============================================
+# 주기 작업 상태 조회
+# ============================================
+@app.get("/job_stats")
+def job_stats():
+    return {"result": {job.name: job.stats() for job in JOBS}}
+
+
+# ============================================
+# 실행
+# ============================================
+if __name__ == "__main__":
+    import uvicorn
+    print(f"🚀 Shoes Store API 서버 시작")
+    print(f"   서버 주소: http://{ipAddress}:{port}")
+    print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
+    uvicorn.run("main:app", host=ipAddress, port=port)
@@ -11,12 +11,13 @@ manufacturer API - 제조사 CRUD
 |      |        |      |
 """
 
-from fastapi import FastAPI, Form, UploadFile, File, Response
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, Response, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8000
 
@@ -40,20 +41,24 @@ class Manufacturer(BaseModel):
 # TODO: 전체 목록 조회 API 구현
 # - 이미지 BLOB 컬럼은 제외하고 조회
 # - ORDER BY id 정렬
-@app.get("/select_manufacturers")
-async def select_all():
-    conn = connect_db()
+@router.get("/select_manufacturers")
+def select_all(
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
     curs = conn.cursor()
     
     # TODO: SQL 작성
     curs.execute("""
         SELECT id, mname
         FROM Manufacturer 
+        WHERE id > %s
         ORDER BY id
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
     
-    rows = curs.fetchall()
-    conn.close()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
     
     # TODO: 결과 매핑
     result = [{
@@ -61,7 +66,7 @@ async def select_all():
         'mname': row[1]
     } for row in rows]
     
-    return {"results": result}
+    return {"results": result, "next_cursor": next_cursor}
 
 
 # ============================================
@@ -69,9 +74,8 @@ async def select_all():
 # ============================================
 # TODO: ID로 단일 조회 API 구현
 # - 존재하지 않으면 에러 응답
-@app.get("/select_manufacturer/{item_id}")
-async def select_one(item_id: int):
-    conn = connect_db()
+@router.get("/select_manufacturer/{item_id}")
+def select_one(item_id: int, conn = Depends(get_db)):
     curs = conn.cursor()
     
     # TODO: SQL 작성
@@ -82,7 +86,6 @@ async def select_one(item_id: int):
     """, (item_id,))
     
     row = curs.fetchone()
-    conn.close()
     
     if row is None:
         return {"result": "Error", "message": "manufacturer not found"}
@@ -102,13 +105,13 @@ async def select_one(item_id: int):
 # - Form 데이터로 받기: 파라미터 = Form(...)
 # - 성공 시 생성된 ID 반환
 # - 에러 처리 필수
-@app.post("/insert_manufacturer")
-async def insert_one( manufacturer: Manufacturer
+@router.post("/insert_manufacturer")
+def insert_one( manufacturer: Manufacturer,
+    conn = Depends(get_db)
     # TODO: Form 파라미터 정의
     # 예: columnName: str = Form(...)
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -120,7 +123,6 @@ async def insert_one( manufacturer: Manufacturer
         
         conn.commit()
         inserted_id = curs.lastrowid
-        conn.close()
         
         return {"result": "OK", "id": inserted_id}
     except Exception as e:
@@ -132,14 +134,14 @@ async def insert_one( manufacturer: Manufacturer
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_manufacturer")
-async def update_one(
+@router.post("/update_manufacturer")
+def update_one(
     id: int = Form(...),
-    mname: str = Form(...)
+    mname: str = Form(...),
+    conn = Depends(get_db)
     # TODO: 수정할 Form 파라미터 정의
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -151,7 +153,6 @@ async def update_one(
         curs.execute(sql, (mname, id))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -163,17 +164,15 @@ async def update_one(
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_manufacturer/{item_id}")
-async def delete_one(item_id: int):
+@router.delete("/delete_manufacturer/{item_id}")
+def delete_one(item_id: int, conn = Depends(get_db)):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         sql = "DELETE FROM Manufacturer WHERE id=%s"
         curs.execute(sql, (item_id,))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -186,7 +185,7 @@ async def delete_one(item_id: int):
 # TODO: 이미지 바이너리 직접 반환
 # - Response 객체 사용
 # - media_type: "image/jpeg" 또는 "image/png"
-# @app.get("/view_[테이블명]_image/{item_id}")
+# @router.get("/view_[테이블명]_image/{item_id}")
 # async def view_image(item_id: int):
 #     try:
 #         conn = connect_db()
@@ -215,7 +214,7 @@ async def delete_one(item_id: int):
 # ============================================
 # TODO: 이미지만 별도로 업데이트
 # - UploadFile = File(...) 사용
-# @app.post("/update_[테이블명]_image")
+# @router.post("/update_[테이블명]_image")
 # async def update_image(
 #     item_id: int = Form(...),
 #     file: UploadFile = File(...)
@@ -240,6 +239,8 @@ async def delete_one(item_id: int):
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 manufacturer API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
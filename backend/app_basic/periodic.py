@@ -0,0 +1,74 @@
+"""
+주기 작업 스레드
+
+서버 안에서 집계 같은 작업을 interval 초마다 한 번씩 돌린다 (main.py lifespan 에서 start / stop).
+- 작업 함수는 fn(conn) 형태, 실행할 때마다 풀에서 연결을 하나 빌린다
+- 실패해도 스레드는 멈추지 않고 다음 주기에 다시 돈다
+- --workers 로 여러 프로세스가 같은 작업을 돌려도 되게 작업 쪽에서 잠금을 잡아야 한다
+"""
+
+import threading
+import time
+
+from database.connection import get_connection
+
+
+class PeriodicJob:
+    def __init__(self, name, fn, interval, first_delay=0):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.first_delay = first_delay
+        self._stop = threading.Event()
+        self._thread = None
+        self._runs = 0
+        self._failures = 0
+        self._last_result = None
+        self._last_run_ms = 0.0
+        self._last_error = None
+
+    def start(self):
+        """작업 스레드 시작 (첫 실행은 first_delay 초 뒤)"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=30):
+        """진행 중인 실행이 끝나길 기다렸다가 종료"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        if self.first_delay:
+            self._stop.wait(self.first_delay)
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def run_once(self):
+        start = time.monotonic()
+        try:
+            with get_connection() as conn:
+                self._last_result = self.fn(conn)
+            self._last_error = None
+        except Exception as e:
+            print(f"⚠️ {self.name} 실패: {e}")
+            self._failures += 1
+            self._last_error = str(e)
+        self._runs += 1
+        self._last_run_ms = round((time.monotonic() - start) * 1000, 1)
+
+    def stats(self):
+        return {
+            "running": self._thread is not None,
+            "interval": self.interval,
+            "runs": self._runs,
+            "failures": self._failures,
+            "last_result": self._last_result,
+            "last_run_ms": self._last_run_ms,
+            "last_error": self._last_error,
+        }
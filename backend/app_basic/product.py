@@ -11,12 +11,14 @@
 |      |        |      |
 """
 
-from fastapi import FastAPI, Form, UploadFile, File, Response
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, Response, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from bestseller import bestsellers, WINDOWS
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 #"172.16.250.175"
 port = 8000
@@ -40,20 +42,34 @@ class YourModel(BaseModel):
 # TODO: 전체 목록 조회 API 구현
 # - 이미지 BLOB 컬럼은 제외하고 조회
 # - ORDER BY id 정렬
-@app.get("/select_Products")
-async def select_all():
-    conn = connect_db()
+# - order=popular: 최근 window 일(7 / 30) 판매 수량 순 (bestseller.py 메모리 순위, 'sold' = 판매 수량)
+#   category(ProductBase.pCategory) / mfid(제조사)로 거를 수 있다, 판매 기록이 없는 상품은 나오지 않는다
+#   after: 이전 응답의 next_cursor (순위 위치)
+@router.get("/select_Products")
+def select_all(
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    order: str = Query("id", pattern="^(id|popular)$"),
+    window: int = WINDOWS[0],
+    category: Optional[str] = None,
+    mfid: Optional[int] = None,
+    conn = Depends(get_db)
+):
+    if order == 'popular':
+        return select_popular(conn, after or 0, limit, window, category, mfid)
+
     curs = conn.cursor()
     
     # TODO: SQL 작성
     curs.execute("""
         SELECT id, pbid, mfid, size, basePrice, pQuantity
         FROM Product
+        WHERE id > %s
         ORDER BY id
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
     
-    rows = curs.fetchall()
-    conn.close()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
     
     # TODO: 결과 매핑
     result = [{
@@ -65,7 +81,39 @@ async def select_all():
       'pQuantity':row[5]
     } for row in rows]
     
-    return {"results": result}
+    return {"results": result, "next_cursor": next_cursor}
+
+
+def select_popular(conn, offset, limit, window, category, mfid):
+    try:
+        bestsellers.ensure(conn)
+        ranking = bestsellers.ranking(window, category, mfid)
+        page = ranking[offset:offset + limit]
+        next_cursor = offset + limit if offset + limit < len(ranking) else None
+
+        rows = {}
+        if page:
+            curs = conn.cursor()
+            curs.execute(f"""
+                SELECT id, pbid, mfid, size, basePrice, pQuantity
+                FROM Product
+                WHERE id IN ({', '.join(['%s'] * len(page))})
+            """, [pid for pid, _ in page])
+            rows = {row[0]: row for row in curs.fetchall()}
+
+        result = [{
+          'id': row[0],
+          'pbid':row[1], 
+          'mfid':row[2], 
+          'size':row[3], 
+          'basePrice':row[4], 
+          'pQuantity':row[5],
+          'sold': sold
+        } for row, sold in ((rows.get(pid), sold) for pid, sold in page) if row is not None]
+
+        return {"results": result, "next_cursor": next_cursor}
+    except Exception as e:
+        return {"result": "Error", "errorMsg": str(e)}
 
 
 # ============================================
@@ -73,9 +121,8 @@ async def select_all():
 # ============================================
 # TODO: ID로 단일 조회 API 구현
 # - 존재하지 않으면 에러 응답
-@app.get("/select_Product/{id}")
-async def select_one(id: int):
-    conn = connect_db()
+@router.get("/select_Product/{id}")
+def select_one(id: int, conn = Depends(get_db)):
     curs = conn.cursor()
     
     # TODO: SQL 작성
@@ -86,7 +133,6 @@ async def select_one(id: int):
     """, (id,))
     
     row = curs.fetchone()
-    conn.close()
     
     if row is None:
         return {"result": "Error", "message": "[product] not found"}
@@ -110,19 +156,19 @@ async def select_one(id: int):
 # - Form 데이터로 받기: 파라미터 = Form(...)
 # - 성공 시 생성된 ID 반환
 # - 에러 처리 필수
-@app.post("/insert_Product")
-async def insert_one(
+@router.post("/insert_Product")
+def insert_one(
     pbid: int = Form(...),
     mfid: int = Form(...),
     size: int = Form(...),
     basePrice: int = Form(...),
-    pQuantity: int = Form(...)
+    pQuantity: int = Form(...),
+    conn = Depends(get_db)
 
     # TODO: Form 파라미터 정의
     # 예: columnName: str = Form(...)
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -134,7 +180,6 @@ async def insert_one(
         
         conn.commit()
         inserted_id = curs.lastrowid
-        conn.close()
         
         return {"result": "OK", "id": inserted_id}
     except Exception as e:
@@ -146,18 +191,18 @@ async def insert_one(
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_Product")
-async def update_one(
+@router.post("/update_Product")
+def update_one(
     id: int = Form(...),
     pbid: int = Form(...),
     mfid: int = Form(...),
     size: int = Form(...),
     basePrice: int = Form(...),
-    pQuantity: int = Form(...)
+    pQuantity: int = Form(...),
+    conn = Depends(get_db)
     # TODO: 수정할 Form 파라미터 정의
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -169,7 +214,6 @@ async def update_one(
         curs.execute(sql, (pbid, mfid, size, basePrice, pQuantity, id))
         #1=pbid
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -181,17 +225,15 @@ async def update_one(
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_Product/{id}")
-async def delete_one(id: int):
+@router.delete("/delete_Product/{id}")
+def delete_one(id: int, conn = Depends(get_db)):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         sql = "DELETE FROM Product WHERE id=%s"
         curs.execute(sql, (id,))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -204,7 +246,7 @@ async def delete_one(id: int):
 # TODO: 이미지 바이너리 직접 반환
 # - Response 객체 사용
 # - media_type: "image/jpeg" 또는 "image/png"
-# @app.get("/view_[테이블명]_image/{item_id}")
+# @router.get("/view_[테이블명]_image/{item_id}")
 # async def view_image(item_id: int):
 #     try:
 #         conn = connect_db()
@@ -233,7 +275,7 @@ async def delete_one(id: int):
 # ============================================
 # TODO: 이미지만 별도로 업데이트
 # - UploadFile = File(...) 사용
-# @app.post("/update_[테이블명]_image")
+# @router.post("/update_[테이블명]_image")
 # async def update_image(
 #     item_id: int = Form(...),
 #     file: UploadFile = File(...)
@@ -258,6 +300,8 @@ async def delete_one(id: int):
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 [product] API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
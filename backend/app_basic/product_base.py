@@ -11,12 +11,13 @@
 |      |        |      |
 """
 
-from fastapi import FastAPI, Form, UploadFile, File, Response
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, Response, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8000
 
@@ -31,19 +32,23 @@ class ProductBaseModel(BaseModel):
     pCategory: Optional[str] = None
     pModelNumber: Optional[str] = None
 
-@app.get("/select_productbase")
-async def select_all():
-    conn = connect_db()
+@router.get("/select_productbase")
+def select_all(
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
     curs = conn.cursor()
 
     curs.execute("""
         SELECT id, pName, pDescription, pColor, pGender, pStatus, pFeatureType, pCategory, pModelNumber
         FROM ProductBase
+        WHERE id > %s
         ORDER BY id
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
 
-    rows = curs.fetchall()
-    conn.close()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
 
     result = [{
         'id': row[0],
@@ -57,11 +62,10 @@ async def select_all():
         'pModelNumber': row[8],
     } for row in rows]
 
-    return {"results": result}
+    return {"results": result, "next_cursor": next_cursor}
 
-@app.get("/select_productbase/{item_id}")
-async def select_one(item_id:int):
-    conn = connect_db()
+@router.get("/select_productbase/{item_id}")
+def select_one(item_id:int, conn = Depends(get_db)):
     curs = conn.cursor()
 
     curs.execute("""
@@ -71,7 +75,6 @@ async def select_one(item_id:int):
     """, (item_id,))
 
     row = curs.fetchone()
-    conn.close()
 
     if row is None:
         return {"result": "Error", "message": "ProductBase not found"}
@@ -89,8 +92,8 @@ async def select_one(item_id:int):
     }
     return {"result": result}
 
-@app.post("/insert_ProductBase")
-async def insert_one(
+@router.post("/insert_ProductBase")
+def insert_one(
     pName: str = Form(...),
     pDescription: Optional[str] = Form(None),
     pColor: Optional[str] = Form(None),
@@ -99,9 +102,9 @@ async def insert_one(
     pFeatureType: Optional[str] = Form(None),
     pCategory: Optional[str] = Form(None),
     pModelNumber: Optional[str] = Form(None),
+    conn = Depends(get_db)
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
 
         sql = """
@@ -113,14 +116,13 @@ async def insert_one(
 
         conn.commit()
         inserted_id = curs.lastrowid
-        conn.close()
 
         return {"result": "OK", "id": inserted_id}
     except Exception as e:
         return {"result": "Error", "errorMsg": str(e)}
 
-@app.post("/update_ProductBase")
-async def update_one(
+@router.post("/update_ProductBase")
+def update_one(
     item_id: int = Form(...),
     pName: str = Form(...),
     pDescription: Optional[str] = Form(None),
@@ -130,9 +132,9 @@ async def update_one(
     pFeatureType: Optional[str] = Form(None),
     pCategory: Optional[str] = Form(None),
     pModelNumber: Optional[str] = Form(None),
+    conn = Depends(get_db)
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
 
         sql = """
@@ -142,23 +144,20 @@ async def update_one(
         curs.execute(sql, (pName, pDescription, pColor, pGender, pStatus, pFeatureType, pCategory, pModelNumber, item_id))
 
         conn.commit()
-        conn.close()
 
         return {"result": "OK"}
     except Exception as e:
         return {"result": "Error", "errorMsg": str(e)}
 
-@app.delete("/delete_ProductBase/{item_id}")
-async def delete_one(item_id: int):
+@router.delete("/delete_ProductBase/{item_id}")
+def delete_one(item_id: int, conn = Depends(get_db)):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         sql = "DELETE FROM ProductBase WHERE id=%s"
         curs.execute(sql, (item_id,))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -166,6 +165,8 @@ async def delete_one(item_id: int):
 
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 ProductBase API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
@@ -10,13 +10,21 @@ Product API - Product CRUD
   2025-12-29    이광태   최초 CRUD생성
 """
 
-from fastapi import FastAPI, Form, UploadFile, File, Response
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, Response, Depends, Query
 from pydantic import BaseModel
-from typing import Optional
-from database.connection import connect_db
+from typing import Optional, List
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from database.bulk import insert_returning_ids
+from category_cache import categories
+from response_cache import product_cache
+from search_index import search_index
+from facet_index import facet_index, FACET_COLUMNS
+from bisect import bisect_right
+import stock
 import datetime
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8000
 
@@ -35,160 +43,278 @@ class ProductModel(BaseModel):
     p_price: int
     p_stock: int
     p_image: Optional[str] = None
-    p_color: str
-    p_size: str
-    p_gender: str
-    p_maker: str
+    p_description: str = ""
+    p_date: Optional[str] = None
+    # 이름은 조회용 (저장할 때는 *_seq 만 사용)
+    p_color: Optional[str] = None
+    p_size: Optional[str] = None
+    p_gender: Optional[str] = None
+    p_maker: Optional[str] = None
+
+
+class ProductIdsModel(BaseModel):
+    ids: List[int]
+
+
+class StockLineModel(BaseModel):
+    p_seq: int
+    quantity: int
+
+
+class StockModel(BaseModel):
+    items: List[StockLineModel]
     
    
+# ============================================
+# 조회 공통
+# ============================================
+# product 테이블 컬럼만 조회하고 카테고리 이름은 category_cache에서 채운다
+PRODUCT_COLUMNS = """
+    p.p_seq, p.kc_seq, p.cc_seq, p.sc_seq, p.gc_seq, p.m_seq,
+    p.p_name, p.p_price, p.p_stock, p.p_image, p.p_description, p.p_date
+"""
+
+def product_result(conn, row):
+  return {
+      "p_seq": row[0],
+      "kc_seq": row[1],
+      "cc_seq": row[2],
+      "sc_seq": row[3],
+      "gc_seq": row[4],
+      "m_seq": row[5],
+      "p_name": row[6],
+      "p_price": row[7],
+      "p_stock": row[8],
+      "p_image": row[9],
+      "p_description" : row[10],
+      "p_date": str(row[11]),
+      "p_color": categories.name(conn, 'color', row[2]),
+      "p_size": categories.name(conn, 'size', row[3]),
+      "p_gender": categories.name(conn, 'gender', row[4]),
+      "p_maker": categories.name(conn, 'maker', row[5]),
+  }
+
+def select_rows_by_seqs(conn, p_seqs):
+  """p_seq 목록 순서 그대로 product 행 조회 (없는 상품은 빠진다)"""
+  if not p_seqs:
+    return []
+  curs = conn.cursor()
+  curs.execute(f"""
+        SELECT {PRODUCT_COLUMNS}
+        FROM product p
+        WHERE p.p_seq IN ({', '.join(['%s'] * len(p_seqs))})
+        """, list(p_seqs)
+  )
+  by_seq = {row[0]: row for row in curs.fetchall()}
+  return [by_seq[p_seq] for p_seq in p_seqs if p_seq in by_seq]
+
+
 # ============================================
 # 전체 조회 (Read All)
 # ============================================
-@app.get("/select_products")
-async def select_all():
-  conn = connect_db()
+@router.get("/select_products")
+def select_all(
+  after: Optional[int] = None,
+  limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+  conn = Depends(get_db)
+):
+  cache_key = product_cache.make_key("select_products", after=after, limit=limit)
+  cached = product_cache.get(cache_key)
+  if cached is not None:
+    return cached
+  # DB 를 읽기 전 세대 (읽는 사이에 수정되면 저장하지 않는다)
+  generation = product_cache.generation()
   try:
-    
     curs = conn.cursor()
-    #0 p_seq: Optional[int] = None
-    #1 kc_seq: int
-    #2 cc_seq: int
-    #3 sc_seq: int
-    #4 gc_seq: int
-    #5 m_seq: int
-    #6 p_name: str
-    #7 p_price: int
-    #8 p_stock: int
-    #9 p_image: Optional[str] = None
-    #10 p_color: str
-    #11 p_size: str
-    #12 p_gender: str
-     
-
-    curs.execute("""
-        select p.*,cc.cc_name as p_color,sc.sc_name as p_size,gc.gc_name as p_gender, ma.m_name
-        from product p 
-        inner join color_category cc on p.cc_seq=cc.cc_seq
-        inner join gender_category gc on p.gc_seq=gc.gc_seq
-        inner join size_category sc on p.sc_seq=sc.sc_seq
-        inner join maker ma on p.m_seq=ma.m_seq
+    curs.execute(f"""
+        SELECT {PRODUCT_COLUMNS}
+        FROM product p
+        WHERE p.p_seq > %s
         ORDER BY p.p_seq
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
     
-    rows = curs.fetchall()
-
-    results = [{
-        "p_seq": row[0],
-        "kc_seq": row[1],
-        "cc_seq": row[2],
-        "sc_seq": row[3],
-        "gc_seq": row[4],
-        "m_seq": row[5],
-        "p_name": row[6],
-        "p_price": row[7],
-        "p_stock": row[8],
-        "p_image": row[9],
-        "p_description" : row[10],
-        "p_date": str(row[11]),
-        "p_color": row[12],
-        "p_size": row[13],
-        "p_gender": row[14],
-        "p_maker": row[15],
-    } for row in rows]
+    rows, next_cursor = paginate(curs.fetchall(), limit)
+    results = [product_result(conn, row) for row in rows]
   
-    return {"results": results}
+    response = {"results": results, "next_cursor": next_cursor}
+    product_cache.set(cache_key, response, generation)
+    return response
   except Exception as error:
     return {"result": "Error", "errorMsg": str(error)}
-  finally:
-     conn.close()
 
 
 # ============================================
 # 전체 조회 (Read All)
 # ============================================
 # Todo: GT - search keywords validation (inject handle)   
-@app.get("/select_search")
-async def select_search(
+@router.get("/select_search")
+def select_search(
   maker: Optional[str]=None,
   kwds: Optional[str]=None,
   color: Optional[str]=None,
-  kc_name: Optional[str]=None
+  kc_name: Optional[str]=None,
+  after: Optional[int] = None,
+  limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+  conn = Depends(get_db)
 ):
-  
-  #### 쿼리 조건문 만들기
-  data = []
-  qry_condition = 'where 1=1 and '
-  if maker is not None:
-    qry_condition += 'ma.m_name=%s and '
-    data.append(maker)
-  kwds_condition = ''
+  # 키워드는 순서/중복/여러 칸 공백과 관계없이 같은 검색이므로 정규화
   if kwds is not None:
-    for kwd in kwds.split(' '):
-      kwds_condition += 'p.p_name like %s or '
-      data.append(f"%{kwd}%")
-  if kwds_condition != '':
-    qry_condition += f'({kwds_condition[0:len(kwds_condition)-3]}) and '
-  if color is not None:
-    qry_condition += 'cc.cc_name=%s and '
-    data.append(color)
-  qry_condition = qry_condition[0:len(qry_condition)-4]
-  #### END OF 쿼리 조건문 만들기
-
-  conn = connect_db()
+    kwds = ' '.join(sorted(set(kwds.split()))) or None
+  cache_key = product_cache.make_key(
+    "select_search", maker=maker, kwds=kwds, color=color, kc_name=kc_name, after=after, limit=limit)
+  cached = product_cache.get(cache_key)
+  if cached is not None:
+    return cached
+  # DB 를 읽기 전 세대 (읽는 사이에 수정되면 저장하지 않는다)
+  generation = product_cache.generation()
   try:
+    # 제조사/색상/종류 이름은 캐시에서 seq로 바꿔 product 컬럼으로 바로 거른다
+    m_seq = cc_seq = kc_seq = None
+    if maker is not None:
+      m_seq = categories.seq(conn, 'maker', maker)
+      if m_seq is None:
+        return {"results": [], "next_cursor": None}
+    if color is not None:
+      cc_seq = categories.seq(conn, 'color', color)
+      if cc_seq is None:
+        return {"results": [], "next_cursor": None}
+    if kc_name is not None:
+      kc_seq = categories.seq(conn, 'kind', kc_name)
+      if kc_seq is None:
+        return {"results": [], "next_cursor": None}
+
     curs = conn.cursor()
-    curs.execute("""
-          select p.*,cc.cc_name as p_color,sc.sc_name as p_size,gc.gc_name as p_gender, ma.m_name
-          from product p 
-          inner join color_category cc on p.cc_seq=cc.cc_seq
-          inner join gender_category gc on p.gc_seq=gc.gc_seq
-          inner join size_category sc on p.sc_seq=sc.sc_seq
-          inner join maker ma on p.m_seq=ma.m_seq 
-          """ + qry_condition,data
-    )
-    rows = curs.fetchall()
-    results = [{
-        "p_seq": row[0],
-        "kc_seq": row[1],
-        "cc_seq": row[2],
-        "sc_seq": row[3],
-        "gc_seq": row[4],
-        "m_seq": row[5],
-        "p_name": row[6],
-        "p_price": row[7],
-        "p_stock": row[8],
-        "p_image": row[9],
-        "p_description" : row[10],
-        "p_date": str(row[11]),
-        "p_color": row[12],
-        "p_size": row[13],
-        "p_gender": row[14],
-        "p_maker": row[15],
-    } for row in rows]
+    if kwds is not None:
+      #### 키워드 검색: 검색 인덱스에서 관련도 순 p_seq 목록을 얻고 해당 페이지만 조회
+      # after 는 이전 페이지 마지막 p_seq (관련도 순서 기준)
+      search_index.ensure(conn)
+      ranked = search_index.search(kwds.split(' '), m_seq=m_seq, cc_seq=cc_seq, kc_seq=kc_seq)
+      start = ranked.index(after) + 1 if after in ranked else 0
+      page = ranked[start:start + limit]
+      next_cursor = page[-1] if start + limit < len(ranked) else None
+      rows = select_rows_by_seqs(conn, page)
+    else:
+      #### 쿼리 조건문 만들기
+      data = []
+      qry_condition = 'where 1=1 and '
+      if m_seq is not None:
+        qry_condition += 'p.m_seq=%s and '
+        data.append(m_seq)
+      if cc_seq is not None:
+        qry_condition += 'p.cc_seq=%s and '
+        data.append(cc_seq)
+      if kc_seq is not None:
+        qry_condition += 'p.kc_seq=%s and '
+        data.append(kc_seq)
+      qry_condition += 'p.p_seq > %s and '
+      data.append(after or 0)
+      qry_condition = qry_condition[0:len(qry_condition)-4]
+      qry_condition += 'ORDER BY p.p_seq LIMIT %s'
+      data.append(limit + 1)
+      #### END OF 쿼리 조건문 만들기
+
+      curs.execute(f"""
+            SELECT {PRODUCT_COLUMNS}
+            FROM product p
+            """ + qry_condition,data
+      )
+      rows, next_cursor = paginate(curs.fetchall(), limit)
+    results = [product_result(conn, row) for row in rows]
   
-    return {"results": results}
+    response = {"results": results, "next_cursor": next_cursor}
+    product_cache.set(cache_key, response, generation)
+    return response
+  except Exception as error:
+    return {"result": "Error", "errorMsg": str(error)}
+
+
+# ============================================
+# 패싯 검색 (필터 + 패싯별 개수)
+# ============================================
+# 제조사/색상/종류/사이즈/성별은 같은 이름을 여러 번 주면 OR (예: ?maker=Nike&maker=Adidas)
+# facets 의 개수는 해당 패싯 자신의 필터만 빼고 나머지 필터를 모두 적용한 개수
+@router.get("/select_facets")
+def select_facets(
+  maker: Optional[List[str]] = Query(None),
+  color: Optional[List[str]] = Query(None),
+  kc_name: Optional[List[str]] = Query(None),
+  size: Optional[List[str]] = Query(None),
+  gender: Optional[List[str]] = Query(None),
+  min_price: Optional[int] = None,
+  max_price: Optional[int] = None,
+  kwds: Optional[str] = None,
+  after: Optional[int] = None,
+  limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+  conn = Depends(get_db)
+):
+  if kwds is not None:
+    kwds = ' '.join(sorted(set(kwds.split()))) or None
+  # 패싯 이름 -> 선택한 카테고리 이름 (순서/중복 무관)
+  selected = {
+    facet: tuple(sorted(set(names)))
+    for facet, names in zip(FACET_COLUMNS, (maker, color, kc_name, size, gender))
+    if names
+  }
+  cache_key = product_cache.make_key(
+    "select_facets", kwds=kwds, min_price=min_price, max_price=max_price,
+    after=after, limit=limit, **selected)
+  cached = product_cache.get(cache_key)
+  if cached is not None:
+    return cached
+  # DB 를 읽기 전 세대 (읽는 사이에 수정되면 저장하지 않는다)
+  generation = product_cache.generation()
+  try:
+    # 카테고리 이름 -> seq (없는 이름은 빼고, 전부 없으면 그 패싯은 일치 없음)
+    filters = {
+      facet: {categories.seq(conn, facet, name) for name in names} - {None}
+      for facet, names in selected.items()
+    }
+
+    facet_index.ensure(conn)
+    ranked = None
+    if kwds is not None:
+      search_index.ensure(conn)
+      ranked = search_index.search(kwds.split(' '))
+    matched, counts = facet_index.query(filters, min_price, max_price, ranked)
+
+    # 키워드가 있으면 관련도 순, 없으면 p_seq 순
+    if ranked is not None:
+      order = [p_seq for p_seq in ranked if p_seq in matched]
+      start = order.index(after) + 1 if after in order else 0
+    else:
+      order = sorted(matched)
+      start = bisect_right(order, after) if after is not None else 0
+    page = order[start:start + limit]
+    next_cursor = page[-1] if start + limit < len(order) else None
+    results = [product_result(conn, row) for row in select_rows_by_seqs(conn, page)]
+
+    facets = {}
+    for facet, values in counts.items():
+      facets[facet] = sorted(
+        (
+          {"seq": seq, "name": categories.name(conn, facet, seq), "count": count}
+          for seq, count in values.items()
+        ),
+        key=lambda item: (-item["count"], item["seq"]),
+      )
+
+    response = {"results": results, "next_cursor": next_cursor, "total": len(order), "facets": facets}
+    product_cache.set(cache_key, response, generation)
+    return response
   except Exception as error:
     return {"result": "Error", "errorMsg": str(error)}
-  finally:
-     conn.close()
 
 # ============================================
 # 단일 조회 (Read One)
 # ============================================
-@app.get("/select_product/{item_id}")
-async def select_one(item_id: int):
-  conn = connect_db()
+@router.get("/select_product/{item_id}")
+def select_one(item_id: int, conn = Depends(get_db)):
   try:
     curs = conn.cursor()
-    
-    # TODO: SQL 작성
-    curs.execute("""
-       select p.*,cc.cc_name as p_color,sc.sc_name as p_size,gc.gc_name as p_gender, ma.m_name as p_maker
-        from product p 
-        inner join color_category cc on p.cc_seq=cc.cc_seq
-        inner join gender_category gc on p.gc_seq=gc.gc_seq
-        inner join size_category sc on p.sc_seq=sc.sc_seq
-        inner join maker ma on p.m_seq=ma.m_seq
+    curs.execute(f"""
+        SELECT {PRODUCT_COLUMNS}
+        FROM product p
         WHERE p.p_seq = %s
     """, (item_id,))
     
@@ -198,36 +324,54 @@ async def select_one(item_id: int):
     if row is None:
         return {"result": "Error", "message": "[테이블명] not found"}
     
-    # TODO: 결과 매핑
-    result = {
-        "p_seq": row[0],
-        "kc_seq": row[1],
-        "cc_seq": row[2],
-        "sc_seq": row[3],
-        "gc_seq": row[4],
-        "m_seq": row[5],
-        "p_name": row[6],
-        "p_price": row[7],
-        "p_stock": row[8],
-        "p_image": row[9], #base64.b64encode(row[9]),
-        "p_description" : row[10],
-        "p_date": row[11],
-        "p_color": row[12],
-        "p_size": row[13],
-        "p_gender": row[14],
-        "p_maker": row[15],
-    }
+    result = product_result(conn, row)
+    result["p_date"] = row[11]
     return {"result": result}
   except Exception as error:
     return {"result": "Error", "errorMsg": str(error)}
-  finally:
-     conn.close()
+
+# ============================================
+# 여러 건 조회 (Read By Ids)
+# ============================================
+# 장바구니/주문 화면처럼 상품 여러 개를 한 번에 조회 (쿼리 1번)
+# 결과는 요청한 순서대로 (중복 id 는 한 번만), 없는 id 는 missing 으로 알려준다
+# id 가 많으면 POST /select_products_by_ids {"ids": [...]} 사용
+def products_by_ids(conn, ids):
+  if len(ids) > MAX_LIMIT:
+    return {"result": "Error", "errorMsg": f"ids 는 최대 {MAX_LIMIT}개까지 조회할 수 있습니다"}
+  p_seqs = list(dict.fromkeys(ids))
+  rows = select_rows_by_seqs(conn, p_seqs)
+  found = {row[0] for row in rows}
+  return {
+    "results": [product_result(conn, row) for row in rows],
+    "missing": [p_seq for p_seq in p_seqs if p_seq not in found],
+  }
+
+
+@router.get("/select_products_by_ids")
+def select_by_ids(ids: str, conn = Depends(get_db)):
+  try:
+    p_seqs = [int(item) for item in ids.split(',') if item.strip()]
+  except ValueError:
+    return {"result": "Error", "errorMsg": "ids 는 쉼표로 구분한 숫자여야 합니다 (예: ids=1,2,3)"}
+  try:
+    return products_by_ids(conn, p_seqs)
+  except Exception as error:
+    return {"result": "Error", "errorMsg": str(error)}
+
+
+@router.post("/select_products_by_ids")
+def select_by_ids_post(body: ProductIdsModel, conn = Depends(get_db)):
+  try:
+    return products_by_ids(conn, body.ids)
+  except Exception as error:
+    return {"result": "Error", "errorMsg": str(error)}
 
 # ============================================
 # 추가 (Create)
 # ============================================
-@app.post("/insert_product")
-async def insert_one(
+@router.post("/insert_product")
+def insert_one(
   p_seq: Optional[int] = None,
   kc_seq: int = Form(...),
   cc_seq: int = Form(...),
@@ -240,9 +384,9 @@ async def insert_one(
   # file: Optional[UploadFile] = None,
   p_image: str = Form(...),
   p_description: str = Form(...),
-  p_date : Optional[str] = None
+  p_date : Optional[str] = None,
+  conn = Depends(get_db)
 ):
-    conn = connect_db()
     try:
         if p_date is None:
            p_date = str(datetime.datetime.now())
@@ -269,14 +413,16 @@ async def insert_one(
         
         conn.commit()
         inserted_id = curs.lastrowid
+        search_index.upsert(inserted_id, p_name, p_description, m_seq, cc_seq, kc_seq)
+        facet_index.upsert(inserted_id, m_seq, cc_seq, kc_seq, sc_seq, gc_seq, p_price)
+        # 인덱스를 바꾼 뒤에 세대를 올린다 (그 전에 읽은 조회는 저장되지 않는다)
+        product_cache.invalidate()
        
         
         return {"result": "OK", "id": inserted_id}
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-       conn.close()
 
 
 # ============================================
@@ -284,8 +430,8 @@ async def insert_one(
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_product")
-async def update_one(
+@router.post("/update_product")
+def update_one(
   item_id: int = Form(...),
   kc_seq: int = Form(...),
   cc_seq: int = Form(...),
@@ -297,9 +443,9 @@ async def update_one(
   p_stock: int = Form(...),
   # file: Optional[UploadFile] = None,
   p_image:str = Form(...),
-  p_description: str = Form(...)
+  p_description: str = Form(...),
+  conn = Depends(get_db)
 ):
-    conn = connect_db()
     try:
         
         curs = conn.cursor()
@@ -353,21 +499,200 @@ async def update_one(
         #   """
         #   curs.execute(sql, (kc_seq,cc_seq,sc_seq,gc_seq,m_seq,p_name,p_price,p_stock, p_description, item_id))
         conn.commit()
+        search_index.upsert(item_id, p_name, p_description, m_seq, cc_seq, kc_seq)
+        facet_index.upsert(item_id, m_seq, cc_seq, kc_seq, sc_seq, gc_seq, p_price)
+        # 인덱스를 바꾼 뒤에 세대를 올린다 (그 전에 읽은 조회는 저장되지 않는다)
+        product_cache.invalidate()
         return {"result": "OK"}
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-       conn.close()
+
+# ============================================
+# 일괄 추가 / 수정 (Bulk Create / Update)
+# ============================================
+# JSON 배열([ProductModel, ...])로 여러 상품을 한 번에 추가/수정한다.
+# - 모든 행을 먼저 검사하고, 하나라도 잘못되면 아무것도 쓰지 않는다 (행별 오류 반환)
+# - 한 트랜잭션에서 다중 행 INSERT 한 문장으로 쓰고 커밋은 한 번만 한다
+#   (pymysql executemany 가 INSERT ... VALUES 를 다중 행으로 묶는다)
+# - 응답 results 는 요청 순서대로 행별 결과 {"index", "result", "id" | "errorMsg"}
+BULK_LIMIT = 1000
+
+BULK_COLUMNS = ('kc_seq', 'cc_seq', 'sc_seq', 'gc_seq', 'm_seq',
+                'p_name', 'p_price', 'p_stock', 'p_image', 'p_description', 'p_date')
+
+
+def product_errors(conn, item):
+  """상품 한 건 검사 -> 오류 메시지 목록"""
+  errors = []
+  if not item.p_name.strip():
+    errors.append("p_name 이 비어 있습니다")
+  if item.p_price < 0:
+    errors.append("p_price 는 0 이상이어야 합니다")
+  if item.p_stock < 0:
+    errors.append("p_stock 은 0 이상이어야 합니다")
+  for kind, column in FACET_COLUMNS.items():
+    if categories.name(conn, kind, getattr(item, column)) is None:
+      errors.append(f"{column}={getattr(item, column)} 가 없습니다")
+  return errors
+
+
+def bulk_rejected(errors, count):
+  """검사 실패 응답 (오류 없는 행은 Skipped)"""
+  return {
+    "result": "Error",
+    "errorMsg": f"{len(errors)}개 행이 잘못되어 아무것도 저장하지 않았습니다",
+    "results": [
+      {"index": i, "result": "Error", "errorMsg": "; ".join(errors[i])} if i in errors
+      else {"index": i, "result": "Skipped"}
+      for i in range(count)
+    ],
+  }
+
+
+def bulk_row(item, p_date):
+  return tuple(p_date if column == 'p_date' else getattr(item, column) for column in BULK_COLUMNS)
+
+
+def reindex_products(items):
+  for item in items:
+    search_index.upsert(item.p_seq, item.p_name, item.p_description, item.m_seq, item.cc_seq, item.kc_seq)
+    facet_index.upsert(item.p_seq, item.m_seq, item.cc_seq, item.kc_seq, item.sc_seq, item.gc_seq, item.p_price)
+  # 인덱스를 다 바꾼 뒤에 세대를 올린다 (중간에 옛 인덱스로 읽은 응답이 캐시에 남지 않도록)
+  product_cache.invalidate()
+
+
+@router.post("/insert_products")
+def insert_bulk(items: List[ProductModel], conn = Depends(get_db)):
+  if not items or len(items) > BULK_LIMIT:
+    return {"result": "Error", "errorMsg": f"1 ~ {BULK_LIMIT}개까지 추가할 수 있습니다"}
+  try:
+    errors = {}
+    for i, item in enumerate(items):
+      item_errors = product_errors(conn, item)
+      if item.p_seq is not None:
+        item_errors.append("p_seq 는 지정할 수 없습니다 (자동 생성)")
+      if item_errors:
+        errors[i] = item_errors
+    if errors:
+      return bulk_rejected(errors, len(items))
+
+    now = str(datetime.datetime.now())
+    curs = conn.cursor()
+    # 크기 제한으로 나눈 다중 행 INSERT 문장마다 lastrowid 로 행 id 를 받는다 (database/bulk.py)
+    ids = insert_returning_ids(curs, 'product', BULK_COLUMNS,
+                               [bulk_row(item, item.p_date or now) for item in items])
+    conn.commit()
+
+    for item, p_seq in zip(items, ids):
+      item.p_seq = p_seq
+    reindex_products(items)
+    return {
+      "result": "OK",
+      "results": [{"index": i, "result": "OK", "id": item.p_seq} for i, item in enumerate(items)],
+    }
+  except Exception as e:
+    conn.rollback()
+    return {"result": "Error", "errorMsg": str(e)}
+
+
+@router.post("/update_products")
+def update_bulk(items: List[ProductModel], conn = Depends(get_db)):
+  if not items or len(items) > BULK_LIMIT:
+    return {"result": "Error", "errorMsg": f"1 ~ {BULK_LIMIT}개까지 수정할 수 있습니다"}
+  try:
+    curs = conn.cursor()
+    p_seqs = [item.p_seq for item in items if item.p_seq is not None]
+    existing = set()
+    if p_seqs:
+      # 트랜잭션이 끝날 때까지 대상 행을 잠가 아래 INSERT 가 수정만 하도록 한다
+      curs.execute(f"""
+          SELECT p_seq FROM product
+          WHERE p_seq IN ({', '.join(['%s'] * len(p_seqs))})
+          FOR UPDATE
+      """, p_seqs)
+      existing = {row[0] for row in curs.fetchall()}
+
+    errors = {}
+    seen = set()
+    for i, item in enumerate(items):
+      item_errors = product_errors(conn, item)
+      if item.p_seq is None:
+        item_errors.append("p_seq 가 없습니다")
+      elif item.p_seq not in existing:
+        item_errors.append(f"p_seq={item.p_seq} 상품이 없습니다")
+      elif item.p_seq in seen:
+        item_errors.append(f"p_seq={item.p_seq} 가 중복되었습니다")
+      seen.add(item.p_seq)
+      if item_errors:
+        errors[i] = item_errors
+    if errors:
+      conn.rollback()
+      return bulk_rejected(errors, len(items))
+
+    # 모두 있는 행이므로 ON DUPLICATE KEY UPDATE 로 수정만 일어난다 (p_date 는 유지)
+    columns = ('p_seq',) + BULK_COLUMNS
+    updates = ', '.join(f"{column} = VALUES({column})" for column in BULK_COLUMNS if column != 'p_date')
+    now = str(datetime.datetime.now())
+    curs.executemany(f"""
+        INSERT INTO product ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        ON DUPLICATE KEY UPDATE {updates}
+    """, [(item.p_seq,) + bulk_row(item, now) for item in items])
+    conn.commit()
+
+    reindex_products(items)
+    return {
+      "result": "OK",
+      "results": [{"index": i, "result": "OK", "id": item.p_seq} for i, item in enumerate(items)],
+    }
+  except Exception as e:
+    conn.rollback()
+    return {"result": "Error", "errorMsg": str(e)}
+
+# ============================================
+# 재고 예약 / 반환 (Stock)
+# ============================================
+# 주문의 모든 줄을 한 트랜잭션에서 조건부로 차감한다 (stock.py)
+# 한 줄이라도 모자라면 전부 취소하고 shortages 로 어떤 상품이 얼마나 모자란지 알려준다
+def change_stock(conn, body, apply):
+  try:
+    curs = conn.cursor()
+    lines = apply(curs, [(item.p_seq, item.quantity) for item in body.items])
+    conn.commit()
+    product_cache.invalidate()
+    return {"result": "OK", "results": [{"p_seq": seq, "quantity": quantity} for seq, quantity in lines]}
+  except stock.StockError as e:
+    conn.rollback()
+    return {
+      "result": "Error",
+      "errorMsg": str(e),
+      "shortages": [
+        {"p_seq": item["seq"], "requested": item["requested"], "available": item["available"]}
+        for item in e.shortages
+      ],
+    }
+  except Exception as e:
+    conn.rollback()
+    return {"result": "Error", "errorMsg": str(e)}
+
+
+@router.post("/reserve_stock")
+def reserve_stock(body: StockModel, conn = Depends(get_db)):
+  return change_stock(conn, body, stock.reserve)
+
+
+@router.post("/release_stock")
+def release_stock(body: StockModel, conn = Depends(get_db)):
+  return change_stock(conn, body, stock.release)
 
 # ============================================
 # 삭제 (Delete)
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_product/{item_id}")
-async def delete_one(item_id: int):
-    conn = connect_db()
+@router.delete("/delete_product/{item_id}")
+def delete_one(item_id: int, conn = Depends(get_db)):
     try:
         
         curs = conn.cursor()
@@ -376,14 +701,16 @@ async def delete_one(item_id: int):
         curs.execute(sql, (item_id,))
         
         conn.commit()
+        search_index.remove(item_id)
+        facet_index.remove(item_id)
+        # 인덱스를 바꾼 뒤에 세대를 올린다 (그 전에 읽은 조회는 저장되지 않는다)
+        product_cache.invalidate()
         
         
         return {"result": "OK"}
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-       conn.close()
 
 
 
@@ -394,7 +721,7 @@ async def delete_one(item_id: int):
 # # ============================================
 # # [선택] 이미지 조회 (이미지 BLOB 컬럼이 있는 경우)
 # # ============================================
-# @app.get("/view_product_image/{item_id}")
+# @router.get("/view_product_image/{item_id}")
 # async def select_one(item_id: int):
 #   conn = connect_db()
 #   try:
@@ -430,7 +757,7 @@ async def delete_one(item_id: int):
 # # ============================================
 # # TODO: 이미지만 별도로 업데이트
 # # - UploadFile = File(...) 사용
-# @app.post("/update_product_image")
+# @router.post("/update_product_image")
 # async def update_image(
 #     item_id: int = Form(...),
 #     file: UploadFile = File(...)
@@ -458,6 +785,8 @@ async def delete_one(item_id: int):
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 [테이블명] API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
@@ -11,15 +11,30 @@ product_image API - 제품 이미지 CRUD
 |      |        |      |
 """
 
-from fastapi import FastAPI, Form, UploadFile, File, Response
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, Response, Depends, Query, Header
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from image_http import image_hash, etag_matches, cache_headers, not_modified, image_response
+from thumbnails import thumbnails
+import mimetypes
+import os
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8000
 
+# 제품 이미지 파일 위치 (imagePath 기준 폴더 = 프로젝트 루트)
+PRODUCT_IMAGE_ROOT = os.path.realpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+mimetypes.add_type('image/avif', '.avif')
+
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
 
 # ============================================
 # 모델 정의
@@ -41,20 +56,24 @@ class ProductImage(BaseModel):
 # TODO: 전체 목록 조회 API 구현
 # - 이미지 BLOB 컬럼은 제외하고 조회
 # - ORDER BY id 정렬
-@app.get("/select_product_images")
-async def select_all():
-    conn = connect_db()
+@router.get("/select_product_images")
+def select_all(
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
     curs = conn.cursor()
     
     # TODO: SQL 작성
     curs.execute("""
         SELECT id, pbid, imagePath
         FROM ProductImage
+        WHERE id > %s
         ORDER BY id
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
     
-    rows = curs.fetchall()
-    conn.close()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
     
     # TODO: 결과 매핑
     result = [{
@@ -63,7 +82,7 @@ async def select_all():
         'imagePath': row[2]
     } for row in rows]
     
-    return {"results": result}
+    return {"results": result, "next_cursor": next_cursor}
 
 
 # ============================================
@@ -71,9 +90,8 @@ async def select_all():
 # ============================================
 # TODO: ID로 단일 조회 API 구현
 # - 존재하지 않으면 에러 응답
-@app.get("/select_product_image/{item_id}")
-async def select_one(item_id: int):
-    conn = connect_db()
+@router.get("/select_product_image/{item_id}")
+def select_one(item_id: int, conn = Depends(get_db)):
     curs = conn.cursor()
     
     # TODO: SQL 작성
@@ -84,7 +102,6 @@ async def select_one(item_id: int):
     """, (item_id,))
     
     row = curs.fetchone()
-    conn.close()
     
     if row is None:
         return {"result": "Error", "message": "[테이블명] not found"}
@@ -105,13 +122,13 @@ async def select_one(item_id: int):
 # - Form 데이터로 받기: 파라미터 = Form(...)
 # - 성공 시 생성된 ID 반환
 # - 에러 처리 필수
-@app.post("/insert_product_image")
-async def insert_one( productImage : ProductImage
+@router.post("/insert_product_image")
+def insert_one( productImage : ProductImage,
+    conn = Depends(get_db)
     # TODO: Form 파라미터 정의
     # 예: columnName: str = Form(...)
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -123,7 +140,6 @@ async def insert_one( productImage : ProductImage
         
         conn.commit()
         inserted_id = curs.lastrowid
-        conn.close()
         
         return {"result": "OK", "id": inserted_id}
     except Exception as e:
@@ -135,15 +151,15 @@ async def insert_one( productImage : ProductImage
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_product_image")
-async def update_one(
+@router.post("/update_product_image")
+def update_one(
     id: int = Form(...),
     pbid: int = Form(...),
-    imagePath: str = Form(...)
+    imagePath: str = Form(...),
+    conn = Depends(get_db)
     # TODO: 수정할 Form 파라미터 정의
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -155,7 +171,6 @@ async def update_one(
         curs.execute(sql, (pbid, imagePath, id))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -167,17 +182,15 @@ async def update_one(
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_product_image/{item_id}")
-async def delete_one(item_id: int):
+@router.delete("/delete_product_image/{item_id}")
+def delete_one(item_id: int, conn = Depends(get_db)):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         sql = "DELETE FROM ProductImage WHERE id=%s"
         curs.execute(sql, (item_id,))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -185,33 +198,45 @@ async def delete_one(item_id: int):
 
 
 # ============================================
-# [선택] 이미지 조회 (이미지 BLOB 컬럼이 있는 경우)
+# 이미지 조회 (원본 / 썸네일)
 # ============================================
-# TODO: 이미지 바이너리 직접 반환
-# - Response 객체 사용
-# - media_type: "image/jpeg" 또는 "image/png"
-# @app.get("/view_[테이블명]_image/{item_id}")
-# async def view_image(item_id: int):
-#     try:
-#         conn = connect_db()
-#         curs = conn.cursor()
-#         curs.execute("SELECT [이미지컬럼] FROM [테이블명] WHERE id = %s", (item_id,))
-#         row = curs.fetchone()
-#         conn.close()
-#         
-#         if row is None:
-#             return {"result": "Error", "message": "Not found"}
-#         
-#         if row[0] is None:
-#             return {"result": "Error", "message": "No image"}
-#         
-#         return Response(
-#             content=row[0],
-#             media_type="image/jpeg",
-#             headers={"Cache-Control": "no-cache"}
-#         )
-#     except Exception as e:
-#         return {"result": "Error", "errorMsg": str(e)}
+# imagePath 는 프로젝트 루트 기준 경로 (예: images/Nike_Air_1/Nike_Air_1_Black_01.avif)
+# w: 썸네일 너비 (예: ?w=192) - 없으면 원본 파일
+@router.get("/view_product_image/{item_id}")
+def view_image(
+    item_id: int,
+    w: Optional[int] = Query(None, ge=1, le=4096),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    conn = Depends(get_db)
+):
+    try:
+        curs = conn.cursor()
+        curs.execute("SELECT imagePath FROM ProductImage WHERE id = %s", (item_id,))
+        row = curs.fetchone()
+        
+        if row is None:
+            return {"result": "Error", "message": "Not found"}
+        
+        path = os.path.realpath(os.path.join(PRODUCT_IMAGE_ROOT, row[0]))
+        if not path.startswith(PRODUCT_IMAGE_ROOT + os.sep) or not os.path.isfile(path):
+            return {"result": "Error", "message": "No image"}
+        
+        # 경로 + 수정 시각 + 크기로 ETag / 썸네일 캐시 키를 만든다 (파일이 바뀌면 키도 바뀐다)
+        stat = os.stat(path)
+        digest = image_hash(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+        variant = thumbnails.variant(w, accept)
+        if etag_matches(if_none_match, digest, variant):
+            return not_modified(digest, variant=variant)
+        
+        if variant is not None:
+            data = thumbnails.get(digest, variant, lambda: read_file(path))
+            return image_response(data, digest, media_type=thumbnails.media_type(variant), variant=variant)
+        
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return FileResponse(path, media_type=media_type, headers=cache_headers(digest))
+    except Exception as e:
+        return {"result": "Error", "errorMsg": str(e)}
 
 
 # ============================================
@@ -219,7 +244,7 @@ async def delete_one(item_id: int):
 # ============================================
 # TODO: 이미지만 별도로 업데이트
 # - UploadFile = File(...) 사용
-# @app.post("/update_[테이블명]_image")
+# @router.post("/update_[테이블명]_image")
 # async def update_image(
 #     item_id: int = Form(...),
 #     file: UploadFile = File(...)
@@ -244,6 +269,8 @@ async def delete_one(item_id: int):
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 product_image API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
@@ -11,12 +11,18 @@ Purchase API - 고객의 주문 정보를 저장하는 테이블 CRUD
 |      |        |      |
 """
 
-from fastapi import FastAPI, Form
+from fastapi import FastAPI, APIRouter, Form, Depends, Query
 from pydantic import BaseModel
-from typing import Optional
-from database.connection import connect_db
+from typing import Optional, List
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from database.bulk import insert_returning_ids
+import datetime
+import secrets
+import stock
+from bestseller import bestsellers
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8000
 
@@ -33,26 +39,42 @@ class YourModel(BaseModel):
     # TODO: 컬럼 추가
 
 
+class CheckoutItemModel(BaseModel):
+    pid: int
+    pcQuantity: int
+
+
+class CheckoutModel(BaseModel):
+    cid: int
+    pickupDate: Optional[str] = None
+    brid: Optional[int] = None
+    items: List[CheckoutItemModel]
+
+
 # ============================================
 # 전체 조회 (Read All)
 # ============================================
 # TODO: 전체 목록 조회 API 구현
 # - 이미지 BLOB 컬럼은 제외하고 조회
 # - ORDER BY id 정렬
-@app.get("/select_purchase")
-async def select_all():
-    conn = connect_db()
+@router.get("/select_purchase")
+def select_all(
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
     curs = conn.cursor()
     
     # TODO: SQL 작성
     curs.execute("""
         SELECT id, cid, pickupDate, orderCode, timeStamp
         FROM Purchase 
+        WHERE id > %s
         ORDER BY id
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
     
-    rows = curs.fetchall()
-    conn.close()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
     
     # TODO: 결과 매핑
     result = [{
@@ -64,7 +86,7 @@ async def select_all():
         # ...
     } for row in rows]
     
-    return {"results": result}
+    return {"results": result, "next_cursor": next_cursor}
 
 
 # ============================================
@@ -72,9 +94,8 @@ async def select_all():
 # ============================================
 # TODO: ID로 단일 조회 API 구현
 # - 존재하지 않으면 에러 응답
-@app.get("/select_purchase/{item_id}")
-async def select_one(item_id: int):
-    conn = connect_db()
+@router.get("/select_purchase/{item_id}")
+def select_one(item_id: int, conn = Depends(get_db)):
     curs = conn.cursor()
     
     # TODO: SQL 작성
@@ -85,7 +106,6 @@ async def select_one(item_id: int):
     """, (item_id))
     
     row = curs.fetchone()
-    conn.close()
     
     if row is None:
         return {"result": "Error", "message": "Purchase not found"}
@@ -109,13 +129,13 @@ async def select_one(item_id: int):
 # - Form 데이터로 받기: 파라미터 = Form(...)
 # - 성공 시 생성된 ID 반환
 # - 에러 처리 필수
-@app.post("/insert_purchase")
-async def insert_one(cid: int = Form(...), pickupDate: int = Form(...), orderCode: int = Form(...), timeStamp: str = Form(...)
+@router.post("/insert_purchase")
+def insert_one(cid: int = Form(...), pickupDate: int = Form(...), orderCode: int = Form(...), timeStamp: str = Form(...),
+    conn = Depends(get_db)
     # TODO: Form 파라미터 정의
     # 예: columnName: str = Form(...)
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -127,25 +147,107 @@ async def insert_one(cid: int = Form(...), pickupDate: int = Form(...), orderCod
         
         conn.commit()
         inserted_id = curs.lastrowid
-        conn.close()
         
         return {"result": "OK", "id": inserted_id}
     except Exception as e:
         return {"result": "Error", "errorMsg": str(e)}
 
 
+# ============================================
+# 주문 생성 (Checkout)
+# ============================================
+# 주문(Purchase) + 주문 항목(PurchaseItem) + 재고 차감을 한 트랜잭션으로 처리한다
+# - 재고를 먼저 차감하고(stock.py, Product.pQuantity) 모자라면 아무것도 쓰지 않는다
+# - brid: 픽업 매장 (branch.br_seq), 주문 항목에는 주문 당시 단가(pcPrice = basePrice)를 남긴다
+#   (migrations/007_sales_summary.sql, 매출 집계 sales_rollup.py 가 쓴다)
+# - 주문 항목은 다중 행 INSERT 로 넣는다 (큰 주문은 크기 제한으로 나눠서)
+# - 커밋 후 인기 상품 순위(bestseller.py)에 판매 수량을 더한다
+# - 생성한 orderCode 와 주문 항목까지 포함한 주문을 반환한다
+CHECKOUT_STATUS = '제품 준비 중'
+
+
+def new_order_code(now):
+    return f"ORDER-{now:%Y%m%d%H%M%S}-{secrets.token_hex(3).upper()}"
+
+
+@router.post("/checkout")
+def checkout(body: CheckoutModel, conn = Depends(get_db)):
+    if not body.items:
+        return {"result": "Error", "errorMsg": "주문 항목이 없습니다"}
+    try:
+        curs = conn.cursor()
+        lines = stock.reserve(curs, [(item.pid, item.pcQuantity) for item in body.items], table='Product')
+        # 재고 차감으로 이미 잠근 행이다
+        curs.execute(f"""
+            SELECT id, basePrice FROM Product
+            WHERE id IN ({', '.join(['%s'] * len(lines))})
+        """, [pid for pid, _ in lines])
+        prices = dict(curs.fetchall())
+
+        now = datetime.datetime.now()
+        order_code = new_order_code(now)
+        time_stamp = now.strftime('%Y-%m-%d %H:%M')
+        curs.execute("""
+            INSERT INTO Purchase (cid, pickupDate, orderCode, timeStamp, brid)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (body.cid, body.pickupDate, order_code, time_stamp, body.brid))
+        pcid = curs.lastrowid
+
+        # 크기 제한으로 나눈 다중 행 INSERT 문장마다 lastrowid 로 행 id 를 받는다 (database/bulk.py)
+        item_ids = insert_returning_ids(
+            curs, 'PurchaseItem', ('pid', 'pcid', 'pcQuantity', 'pcStatus', 'pcPrice'),
+            [(item.pid, pcid, item.pcQuantity, CHECKOUT_STATUS, prices[item.pid]) for item in body.items],
+        )
+        conn.commit()
+        # 인기 상품 순위 반영 (주문은 이미 저장됐으므로 실패해도 주문은 그대로 성공)
+        try:
+            bestsellers.record(conn, lines, now.date())
+        except Exception as e:
+            print(f"⚠️ 인기 상품 순위 반영 실패: {e}")
+
+        return {"result": {
+            'id': pcid,
+            'cid': body.cid,
+            'pickupDate': body.pickupDate,
+            'orderCode': order_code,
+            'timeStamp': time_stamp,
+            'brid': body.brid,
+            'items': [{
+                'id': item_id,
+                'pid': item.pid,
+                'pcid': pcid,
+                'pcQuantity': item.pcQuantity,
+                'pcStatus': CHECKOUT_STATUS,
+                'pcPrice': prices[item.pid],
+            } for item, item_id in zip(body.items, item_ids)],
+        }}
+    except stock.StockError as e:
+        conn.rollback()
+        return {
+            "result": "Error",
+            "errorMsg": str(e),
+            "shortages": [
+                {"pid": item["seq"], "requested": item["requested"], "available": item["available"]}
+                for item in e.shortages
+            ],
+        }
+    except Exception as e:
+        conn.rollback()
+        return {"result": "Error", "errorMsg": str(e)}
+
+
 # ============================================
 # 수정 (Update)
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_purchase")
-async def update_one(
-    id: int = Form(...), cid: int = Form(...), pickupDate: int = Form(...), orderCode: int = Form(...), timeStamp: str = Form(...)
+@router.post("/update_purchase")
+def update_one(
+    id: int = Form(...), cid: int = Form(...), pickupDate: int = Form(...), orderCode: int = Form(...), timeStamp: str = Form(...),
+    conn = Depends(get_db)
     # TODO: 수정할 Form 파라미터 정의
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         # TODO: SQL 작성
@@ -157,7 +259,6 @@ async def update_one(
         curs.execute(sql, (cid, pickupDate, orderCode, timeStamp, id))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -169,17 +270,15 @@ async def update_one(
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_purchase/{id}")
-async def delete_one(id: int):
+@router.delete("/delete_purchase/{id}")
+def delete_one(id: int, conn = Depends(get_db)):
     try:
-        conn = connect_db()
         curs = conn.cursor()
         
         sql = "DELETE FROM PurchaseItem WHERE id=%s"
         curs.execute(sql, (id,))
         
         conn.commit()
-        conn.close()
         
         return {"result": "OK"}
     except Exception as e:
@@ -192,7 +291,7 @@ async def delete_one(id: int):
 # TODO: 이미지 바이너리 직접 반환
 # - Response 객체 사용
 # - media_type: "image/jpeg" 또는 "image/png"
-# @app.get("/view_[테이블명]_image/{item_id}")
+# @router.get("/view_[테이블명]_image/{item_id}")
 # async def view_image(item_id: int):
 #     try:
 #         conn = connect_db()
@@ -221,7 +320,7 @@ async def delete_one(id: int):
 # ============================================
 # TODO: 이미지만 별도로 업데이트
 # - UploadFile = File(...) 사용
-# @app.post("/update_[테이블명]_image")
+# @router.post("/update_[테이블명]_image")
 # async def update_image(
 #     item_id: int = Form(...),
 #     file: UploadFile = File(...)
@@ -246,6 +345,8 @@ async def delete_one(id: int):
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 [테이블명] API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
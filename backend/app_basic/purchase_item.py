@@ -10,12 +10,13 @@
 |------|--------|------|
 """
 
-from fastapi import FastAPI, Form, Response, UploadFile, File
+from fastapi import FastAPI, APIRouter, Form, Response, UploadFile, File, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8001
 
@@ -26,19 +27,23 @@ class PurchaseItemModel(BaseModel):
     pcQuantity: int
     pcStatus: str
 
-@app.get("/select_purchaseitems")
-async def select_all():
-    conn = connect_db()
+@router.get("/select_purchaseitems")
+def select_all(
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    conn = Depends(get_db)
+):
     curs = conn.cursor()
 
     curs.execute("""
         SELECT id, pid, pcid, pcQuantity, pcStatus
         FROM PurchaseItem
+        WHERE id > %s
         ORDER BY id
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
 
-    rows = curs.fetchall()
-    conn.close()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
 
     result = [{
         "id": row[0],
@@ -48,11 +53,10 @@ async def select_all():
         "pcStatus": row[4]
     } for row in rows]
 
-    return {"results": result}
+    return {"results": result, "next_cursor": next_cursor}
 
-@app.get("/select_purchaseitem/{item_id}")
-async def select_one(item_id: int):
-    conn = connect_db()
+@router.get("/select_purchaseitem/{item_id}")
+def select_one(item_id: int, conn = Depends(get_db)):
     curs = conn.cursor()
 
     curs.execute("""
@@ -62,7 +66,6 @@ async def select_one(item_id: int):
     """, (item_id,))
 
     row = curs.fetchone()
-    conn.close()
 
     if row is None:
         return {"result": "Error", "message": "PurchaseItem not found"}
@@ -76,15 +79,15 @@ async def select_one(item_id: int):
     }
     return {"result": result}
 
-@app.post("/insert_purchaseitem")
-async def insert_one(
+@router.post("/insert_purchaseitem")
+def insert_one(
     pid: int = Form(...),
     pcid: int = Form(...),
     pcQuantity: int = Form(...),
-    pcStatus: str = Form(...)
+    pcStatus: str = Form(...),
+    conn = Depends(get_db)
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
 
         sql = """
@@ -95,20 +98,19 @@ async def insert_one(
 
         conn.commit()
         new_id = curs.lastrowid
-        conn.close()
 
         return {"result": "OK", "id": new_id}
     except Exception as e:
         return {"result": "Error", "errorMsg": str(e)}
 
-@app.post("/update_purchaseitem")
-async def update_one(
+@router.post("/update_purchaseitem")
+def update_one(
     item_id: int = Form(...),
     pcQuantity: int = Form(...),
-    pcStatus: str = Form(...)
+    pcStatus: str = Form(...),
+    conn = Depends(get_db)
 ):
     try:
-        conn = connect_db()
         curs = conn.cursor()
 
         sql = """
@@ -119,21 +121,18 @@ async def update_one(
         curs.execute(sql, (pcQuantity, pcStatus, item_id))
 
         conn.commit()
-        conn.close()
 
         return {"result": "OK"}
     except Exception as e:
         return {"result": "Error", "errorMsg": str(e)}
 
-@app.delete("/delete_purchaseitem/{item_id}")
-async def delete_one(item_id: int):
+@router.delete("/delete_purchaseitem/{item_id}")
+def delete_one(item_id: int, conn = Depends(get_db)):
     try:
-        conn = connect_db()
         curs = conn.cursor()
 
         curs.execute("DELETE FROM PurchaseItem WHERE id=%s", (item_id,))
         conn.commit()
-        conn.close()
 
         return {"result": "OK"}
     except Exception as e:
@@ -141,6 +140,8 @@ async def delete_one(item_id: int):
 
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print("🚀 PurchaseItem API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
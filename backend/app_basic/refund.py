@@ -11,12 +11,14 @@ refund API - 고객 반품 테이블 CRUD
 |      |        |      |
 """
 
-from fastapi import FastAPI, Form, UploadFile, File, Response
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, Response, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+import datetime
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8000
 
@@ -36,29 +38,51 @@ class YourModel(BaseModel):
 # ============================================
 # 전체 조회 (Read All)
 # ============================================
-# TODO: 전체 목록 조회 API 구현
-# - 이미지 BLOB 컬럼은 제외하고 조회
-# - ORDER BY id 정렬
-@app.get("/select_refunds")
-async def select_all():
-    conn = connect_db()
-    curs = conn.cursor()
-    
-    # TODO: SQL 작성
-    curs.execute("""
-        SELECT ref_seq, pic_seq, s_seq, r.u_seq, created_at, ref_re_seq, ref_re_content, b_seq, u_name, b_date
+# 반품 한 건은 반품한 주문 항목 한 건과 join 한다 (r.pic_seq = p.b_seq)
+# - 최신순(ref_seq 내림차순) keyset 페이지네이션: after = 이전 페이지 마지막 ref_seq
+# - from / to (YYYY-MM-DD, 둘 다 포함)로 반품일(ref_date) 범위 필터
+#   (migrations/003_refund_indexes.sql 의 인덱스 사용)
+REFUND_JOIN = """
         FROM refund as r
         inner join user as u
         on r.u_seq = u.u_seq
         inner join purchase_item as p
-        on p.u_seq = u.u_seq
-        ORDER BY ref_seq desc
-    """) # 최신순 조회
+        on p.b_seq = r.pic_seq
+"""
+
+
+@router.get("/select_refunds")
+def select_all(
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    from_date: Optional[datetime.date] = Query(None, alias="from"),
+    to_date: Optional[datetime.date] = Query(None, alias="to"),
+    conn = Depends(get_db)
+):
+    conditions, params = [], []
+    if after is not None:
+        conditions.append("r.ref_seq < %s")
+        params.append(after)
+    if from_date is not None:
+        conditions.append("r.ref_date >= %s")
+        params.append(from_date)
+    if to_date is not None:
+        conditions.append("r.ref_date < %s")
+        params.append(to_date + datetime.timedelta(days=1))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    curs = conn.cursor()
+    curs.execute(f"""
+        SELECT r.ref_seq, r.pic_seq, r.s_seq, r.u_seq, r.ref_date, r.ref_re_seq, r.ref_re_content,
+               p.b_seq, u.u_name, p.b_date
+        {REFUND_JOIN}
+        {where}
+        ORDER BY r.ref_seq desc
+        LIMIT %s
+    """, (*params, limit + 1)) # 최신순 조회
     
-    rows = curs.fetchall()
-    conn.close()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
     
-    # TODO: 결과 매핑
     result = [{
         'ref_seq': row[0],
         'pic_seq': row[1],
@@ -70,48 +94,37 @@ async def select_all():
         'b_seq': row[7],
         'u_name': row[8],
         'b_date': row[9],
-        # ...
     } for row in rows]
     
-    return {"results": result}
+    return {"results": result, "next_cursor": next_cursor}
 
 
 # ============================================
 # 상세 조회 (Read One)
 # ////// 직원페이지 반품 상세
 # ============================================
-# TODO: ID로 단일 조회 API 구현
-# - 존재하지 않으면 에러 응답
-@app.get("/select_refund/{ref_seq}")
-async def select_one(ref_seq: int):
-    conn = connect_db()
+@router.get("/select_refund/{ref_seq}")
+def select_one(ref_seq: int, conn = Depends(get_db)):
     curs = conn.cursor()
     
-    # TODO: SQL 작성
-    curs.execute("""
-        SELECT ref_seq, pic_seq, s_seq, r.u_seq, ref_date, ref_re_seq, ref_re_content, 
-                 b_seq, u_name, b_date, u_phone, u_id, p_name, sc_name, cc_name, b_quantity
-        FROM refund as r
-        inner join user as u
-        on r.u_seq = u.u_seq
-        inner join purchase_item as p
-        on p.u_seq = u.u_seq
+    curs.execute(f"""
+        SELECT r.ref_seq, r.pic_seq, r.s_seq, r.u_seq, r.ref_date, r.ref_re_seq, r.ref_re_content,
+               p.b_seq, u.u_name, p.b_date, u.u_phone, u.u_id, pr.p_name, sc.sc_name, cc.cc_name, p.b_quantity
+        {REFUND_JOIN}
         inner join product as pr
         on p.p_seq = pr.p_seq
         inner join size_category as sc
         on sc.sc_seq = pr.sc_seq
         inner join color_category as cc
         on cc.cc_seq = pr.cc_seq
-        WHERE ref_seq = %s
-    """, (ref_seq))
+        WHERE r.ref_seq = %s
+    """, (ref_seq,))
     
     row = curs.fetchone()
-    conn.close()
     
     if row is None:
         return {"result": "Error", "message": "refund not found"}
     
-    # TODO: 결과 매핑
     result = {
         'ref_seq': row[0],
         'pic_seq': row[1],
@@ -129,7 +142,6 @@ async def select_one(ref_seq: int):
         'sc_name': row[13],
         'cc_name': row[14],
         'b_quantity': row[15],
-        # ...
     }
     return {"result": result}
 
@@ -141,29 +153,28 @@ async def select_one(ref_seq: int):
 # - Form 데이터로 받기: 파라미터 = Form(...)
 # - 성공 시 생성된 ID 반환
 # - 에러 처리 필수
-@app.post("/insert_[테이블명]")
-async def insert_one(
-    # TODO: Form 파라미터 정의
-    # 예: columnName: str = Form(...)
-):
-    try:
-        conn = connect_db()
-        curs = conn.cursor()
-        
-        # TODO: SQL 작성
-        sql = """
-            INSERT INTO [테이블명] (column1, column2, ...) 
-            VALUES (%s, %s, ...)
-        """
-        curs.execute(sql, (value1, value2, ...))
-        
-        conn.commit()
-        inserted_id = curs.lastrowid
-        conn.close()
-        
-        return {"result": "OK", "id": inserted_id}
-    except Exception as e:
-        return {"result": "Error", "errorMsg": str(e)}
+# @router.post("/insert_[테이블명]")
+# def insert_one(
+#     conn = Depends(get_db)
+#     # TODO: Form 파라미터 정의
+#     # 예: columnName: str = Form(...)
+# ):
+#     try:
+#         curs = conn.cursor()
+#         
+#         # TODO: SQL 작성
+#         sql = """
+#             INSERT INTO [테이블명] (column1, column2, ...) 
+#             VALUES (%s, %s, ...)
+#         """
+#         curs.execute(sql, (value1, value2, ...))
+#         
+#         conn.commit()
+#         inserted_id = curs.lastrowid
+#         
+#         return {"result": "OK", "id": inserted_id}
+#     except Exception as e:
+#         return {"result": "Error", "errorMsg": str(e)}
 
 
 # ============================================
@@ -171,29 +182,28 @@ async def insert_one(
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_[테이블명]")
-async def update_one(
-    item_id: int = Form(...),
-    # TODO: 수정할 Form 파라미터 정의
-):
-    try:
-        conn = connect_db()
-        curs = conn.cursor()
-        
-        # TODO: SQL 작성
-        sql = """
-            UPDATE [테이블명] 
-            SET column1=%s, column2=%s, ... 
-            WHERE id=%s
-        """
-        curs.execute(sql, (value1, value2, ..., item_id))
-        
-        conn.commit()
-        conn.close()
-        
-        return {"result": "OK"}
-    except Exception as e:
-        return {"result": "Error", "errorMsg": str(e)}
+# @router.post("/update_[테이블명]")
+# def update_one(
+#     item_id: int = Form(...),
+#     conn = Depends(get_db)
+#     # TODO: 수정할 Form 파라미터 정의
+# ):
+#     try:
+#         curs = conn.cursor()
+#         
+#         # TODO: SQL 작성
+#         sql = """
+#             UPDATE [테이블명] 
+#             SET column1=%s, column2=%s, ... 
+#             WHERE id=%s
+#         """
+#         curs.execute(sql, (value1, value2, ..., item_id))
+#         
+#         conn.commit()
+#         
+#         return {"result": "OK"}
+#     except Exception as e:
+#         return {"result": "Error", "errorMsg": str(e)}
 
 
 # ============================================
@@ -201,21 +211,19 @@ async def update_one(
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_[테이블명]/{item_id}")
-async def delete_one(item_id: int):
-    try:
-        conn = connect_db()
-        curs = conn.cursor()
-        
-        sql = "DELETE FROM [테이블명] WHERE id=%s"
-        curs.execute(sql, (item_id,))
-        
-        conn.commit()
-        conn.close()
-        
-        return {"result": "OK"}
-    except Exception as e:
-        return {"result": "Error", "errorMsg": str(e)}
+# @router.delete("/delete_[테이블명]/{item_id}")
+# def delete_one(item_id: int, conn = Depends(get_db)):
+#     try:
+#         curs = conn.cursor()
+#         
+#         sql = "DELETE FROM [테이블명] WHERE id=%s"
+#         curs.execute(sql, (item_id,))
+#         
+#         conn.commit()
+#         
+#         return {"result": "OK"}
+#     except Exception as e:
+#         return {"result": "Error", "errorMsg": str(e)}
 
 
 # ============================================
@@ -224,7 +232,7 @@ async def delete_one(item_id: int):
 # TODO: 이미지 바이너리 직접 반환
 # - Response 객체 사용
 # - media_type: "image/jpeg" 또는 "image/png"
-# @app.get("/view_[테이블명]_image/{item_id}")
+# @router.get("/view_[테이블명]_image/{item_id}")
 # async def view_image(item_id: int):
 #     try:
 #         conn = connect_db()
@@ -253,7 +261,7 @@ async def delete_one(item_id: int):
 # ============================================
 # TODO: 이미지만 별도로 업데이트
 # - UploadFile = File(...) 사용
-# @app.post("/update_[테이블명]_image")
+# @router.post("/update_[테이블명]_image")
 # async def update_image(
 #     item_id: int = Form(...),
 #     file: UploadFile = File(...)
@@ -278,6 +286,8 @@ async def delete_one(item_id: int):
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 [테이블명] API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
@@ -0,0 +1,126 @@
+"""
+응답 캐시 (LRU + TTL + 바이트 크기 제한)
+
+모든 고객에게 같은 결과를 주는 조회 API(/select_products, /select_search, /select_facets,
+/branch_availability)의 응답을 엔드포인트 + 정규화된 쿼리 파라미터로 캐시한다.
+데이터를 추가/수정/삭제하면 invalidate()로 전부 비운다.
+
+invalidate() 마다 세대(generation) 번호를 올린다. 조회하는 쪽은 DB 를 읽기 전에 generation() 을 받아
+set() 에 넘긴다. 그 사이에 invalidate() 가 있었으면(읽은 값이 수정 전일 수 있으면) 저장하지 않는다.
+그래서 수정하는 쪽은 DB 커밋과 메모리 인덱스(search_index / facet_index) 반영을 모두 마친 뒤에 invalidate() 한다.
+
+주의: 캐시는 프로세스(워커)마다 따로 있다. 다른 워커에서 수정된 내용은
+TTL이 지나야 반영된다.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=60):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._items = OrderedDict()   # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._generation = 0
+        self._stale_skips = 0
+
+    @staticmethod
+    def make_key(endpoint, **params):
+        """
+        엔드포인트 + 쿼리 파라미터로 캐시 키 생성
+        None 값은 빼고 문자열은 앞뒤 공백을 제거해서 같은 요청이 같은 키가 되도록 한다.
+        """
+        items = []
+        for name, value in sorted(params.items()):
+            if value is None:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+            items.append((name, value))
+        return (endpoint, tuple(items))
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._misses += 1
+                return None
+            expires_at, size, value = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                self._bytes -= size
+                self._misses += 1
+                return None
+            self._items.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def generation(self):
+        """현재 세대 번호 (DB 를 읽기 전에 받아서 set() 에 넘긴다)"""
+        with self._lock:
+            return self._generation
+
+    def set(self, key, value, generation=None):
+        """
+        응답 저장
+
+        Args:
+            generation: DB 를 읽기 전에 받은 generation() 값
+                        그 뒤에 invalidate() 가 있었으면 저장하지 않는다
+        """
+        size = len(json.dumps(value, default=str, ensure_ascii=False).encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self._stale_skips += 1
+                return
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            # 오래 안 쓴 것부터 제거
+            while self._bytes > self.max_bytes:
+                _, (_, old_size, _) = self._items.popitem(last=False)
+                self._bytes -= old_size
+                self._evictions += 1
+
+    def invalidate(self):
+        """캐시 전체 삭제 (데이터 변경 후 호출)"""
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+            self._invalidations += 1
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "stale_skips": self._stale_skips,
+            }
+
+
+# 상품 카탈로그 조회용 캐시
+product_cache = ResponseCache()
+
+# 매장별 재고 조회용 캐시 (재고는 자주 바뀌므로 짧게)
+availability_cache = ResponseCache(max_bytes=8 * 1024 * 1024, ttl=10)
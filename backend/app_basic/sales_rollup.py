@@ -0,0 +1,225 @@
+"""
+일별 매출 집계 (주기 실행: 서버 안 sales_rollup_job / sales_check_job, 또는 직접 실행)
+실행: python sales_rollup.py [--batch 5000] [--rebuild] [--check --days 7 [--repair]]
+
+매출 조회가 Purchase / PurchaseItem / Product 를 매번 join 하지 않도록 SalesDaily 에 미리 더해 둔다
+(migrations/007_sales_summary.sql).
+- RollupWatermark('sales_daily').last_id 이후 PurchaseItem.id 만 batch 건씩 읽는다
+  아직 커밋 전인 id(빈틈)를 건너뛰지 않도록 빈틈 없이 이어지는 곳까지만 읽는다 (watermark.py)
+- 일 = Purchase.timeStamp 의 날짜, 매장 = Purchase.brid (없으면 0), 매출 = 수량 x 주문 단가(pcPrice, 없으면 basePrice)
+- 한 묶음(집계 + 워터마크 이동)을 한 트랜잭션으로 처리하고 워터마크 행을 FOR UPDATE 로 잠근다
+  (여러 워커가 동시에 돌아도 두 번 더하지 않는다, login_rollup.py 와 같은 방식)
+- 정합성 확인(check): 워터마크까지의 원본을 기간으로 다시 세어 SalesDaily 와 비교한다
+  집계 후에 바뀐 주문(수정/삭제)이나 lag 보다 늦게 커밋된 주문은 여기서 드러난다
+  -> repair 로 그날들을 원본 기준으로 다시 집계한다 (서버 안 sales_check_job 은 자동으로)
+"""
+
+import argparse
+import datetime
+
+from database.connection import get_connection
+from periodic import PeriodicJob
+from watermark import lock_watermark, next_upto
+
+
+SALES_CONFIG = {
+    'interval': 60,          # 서버 안 집계 주기 (초)
+    'batch': 5000,           # 한 트랜잭션에서 읽을 주문 항목 수
+    'max_batches': 50,       # 서버 안 한 번 실행에서 처리할 최대 묶음 수
+    'check_interval': 86400, # 서버 안 정합성 확인 주기 (초)
+    'check_days': 7,         # 정합성 확인 기간 (오늘까지 며칠)
+    'check_delay': 600,      # 서버 시작 후 첫 정합성 확인까지 (초)
+}
+
+WATERMARK = 'sales_daily'
+
+# 원본 주문 항목 -> (일, 매장, 상품, 수량, 매출) (집계와 정합성 확인이 같은 식을 쓴다)
+SALES_SOURCE = """
+    FROM PurchaseItem AS pi
+    inner join Purchase AS pc
+    on pc.id = pi.pcid
+    inner join Product AS pr
+    on pr.id = pi.pid
+"""
+SALES_COLUMNS = """
+    CAST(LEFT(pc.timeStamp, 10) AS DATE) AS sale_day,
+    COALESCE(pc.brid, 0) AS sale_brid,
+    pi.pid AS sale_pid,
+    SUM(pi.pcQuantity) AS sale_quantity,
+    SUM(pi.pcQuantity * COALESCE(pi.pcPrice, pr.basePrice)) AS sale_revenue
+"""
+# timeStamp 는 'YYYY-MM-DD HH:MM' 문자열 -> 날짜로 읽을 수 없는 주문은 집계하지 않는다
+SALES_VALID = "pc.timeStamp REGEXP '^[0-9]{4}-[0-9]{2}-[0-9]{2}'"
+SALES_GROUP = "GROUP BY sale_day, sale_brid, sale_pid"
+
+
+def refresh_step(conn, batch):
+    """워터마크 다음 주문 항목 batch 건 집계 + 워터마크 이동 -> 처리한 주문 항목 수"""
+    curs = conn.cursor()
+    last_id = lock_watermark(curs, conn, WATERMARK)
+    upto, count = next_upto(curs, WATERMARK, 'PurchaseItem', last_id, batch)
+    if not count:
+        conn.commit()
+        return 0
+
+    curs.execute(f"""
+        INSERT INTO SalesDaily (day, brid, pid, quantity, revenue)
+        SELECT * FROM (
+            SELECT {SALES_COLUMNS}
+            {SALES_SOURCE}
+            WHERE pi.id > %s AND pi.id <= %s AND {SALES_VALID}
+            {SALES_GROUP}
+        ) AS t
+        ON DUPLICATE KEY UPDATE
+            quantity = quantity + t.sale_quantity,
+            revenue = revenue + t.sale_revenue
+    """, (last_id, upto))
+
+    curs.execute("UPDATE RollupWatermark SET last_id = %s WHERE name = %s", (upto, WATERMARK))
+    conn.commit()
+    return count
+
+
+def refresh(conn, batch=SALES_CONFIG['batch'], max_batches=None):
+    """밀린 주문 항목을 모두(또는 max_batches 묶음까지) 집계 -> 처리한 주문 항목 수"""
+    processed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = refresh_step(conn, batch)
+        if not count:
+            break
+        processed += count
+        batches += 1
+    return processed
+
+
+def rebuild(conn):
+    """집계를 비우고 워터마크를 처음으로 (이후 refresh 가 전체를 다시 집계)"""
+    curs = conn.cursor()
+    lock_watermark(curs, conn, WATERMARK)
+    curs.execute("DELETE FROM SalesDaily")
+    curs.execute("UPDATE RollupWatermark SET last_id = 0 WHERE name = %s", (WATERMARK,))
+    conn.commit()
+
+
+def day_bounds(from_day, to_day):
+    """날짜 범위 -> timeStamp 문자열 비교용 [시작, 끝) (idx_purchase_time_stamp)"""
+    return from_day.isoformat(), (to_day + datetime.timedelta(days=1)).isoformat()
+
+
+def check(conn, from_day, to_day):
+    """
+    from_day ~ to_day(포함)를 워터마크까지의 원본으로 다시 세어 SalesDaily 와 비교
+
+    Returns:
+        차이 목록 [{'day', 'brid', 'pid', 'summary': (수량, 매출) | None, 'source': (수량, 매출) | None}]
+    """
+    curs = conn.cursor()
+    try:
+        # 같은 스냅샷에서 읽는다 (REPEATABLE READ) -> 사이에 집계가 돌아도 워터마크와 SalesDaily 가 맞는다
+        curs.execute("SELECT last_id FROM RollupWatermark WHERE name = %s", (WATERMARK,))
+        row = curs.fetchone()
+        if row is None:
+            raise RuntimeError("RollupWatermark 가 없습니다 (migrations/007_sales_summary.sql 적용 필요)")
+        last_id = row[0]
+
+        curs.execute("""
+            SELECT day, brid, pid, quantity, revenue
+            FROM SalesDaily
+            WHERE day BETWEEN %s AND %s
+        """, (from_day, to_day))
+        summary = {(row[0], row[1], row[2]): (int(row[3]), int(row[4])) for row in curs.fetchall()}
+
+        curs.execute(f"""
+            SELECT {SALES_COLUMNS}
+            {SALES_SOURCE}
+            WHERE pi.id <= %s AND {SALES_VALID}
+              AND pc.timeStamp >= %s AND pc.timeStamp < %s
+            {SALES_GROUP}
+        """, (last_id, *day_bounds(from_day, to_day)))
+        source = {(row[0], row[1], row[2]): (int(row[3]), int(row[4])) for row in curs.fetchall()}
+    finally:
+        conn.rollback()
+
+    mismatches = []
+    for key in sorted(summary.keys() | source.keys()):
+        if summary.get(key) != source.get(key):
+            mismatches.append({
+                'day': key[0],
+                'brid': key[1],
+                'pid': key[2],
+                'summary': summary.get(key),
+                'source': source.get(key),
+            })
+    return mismatches
+
+
+def repair(conn, days):
+    """days 의 SalesDaily 를 워터마크까지의 원본으로 다시 집계"""
+    curs = conn.cursor()
+    last_id = lock_watermark(curs, conn, WATERMARK)
+    for day in sorted(set(days)):
+        curs.execute("DELETE FROM SalesDaily WHERE day = %s", (day,))
+        curs.execute(f"""
+            INSERT INTO SalesDaily (day, brid, pid, quantity, revenue)
+            SELECT {SALES_COLUMNS}
+            {SALES_SOURCE}
+            WHERE pi.id <= %s AND {SALES_VALID}
+              AND pc.timeStamp >= %s AND pc.timeStamp < %s
+            {SALES_GROUP}
+        """, (last_id, *day_bounds(day, day)))
+    conn.commit()
+
+
+def check_recent(conn, days=SALES_CONFIG['check_days']):
+    """오늘까지 days 일 정합성 확인 + 차이 난 날 다시 집계 (서버 안 sales_check_job) -> 차이 난 (일, 매장, 상품) 수"""
+    to_day = datetime.date.today()
+    from_day = to_day - datetime.timedelta(days=days - 1)
+    mismatches = check(conn, from_day, to_day)
+    if mismatches:
+        changed = sorted({item['day'] for item in mismatches})
+        print(f"⚠️ 매출 집계가 원본과 달라 다시 집계합니다: {len(mismatches)}건 ({', '.join(map(str, changed))})")
+        repair(conn, changed)
+    return len(mismatches)
+
+
+sales_rollup_job = PeriodicJob(
+    'sales-rollup',
+    lambda conn: refresh(conn, SALES_CONFIG['batch'], SALES_CONFIG['max_batches']),
+    SALES_CONFIG['interval'],
+)
+sales_check_job = PeriodicJob(
+    'sales-check', check_recent, SALES_CONFIG['check_interval'], SALES_CONFIG['check_delay'],
+)
+
+
+def main(args):
+    with get_connection() as conn:
+        if args.rebuild:
+            rebuild(conn)
+            print("🔄 매출 집계를 비웠습니다")
+        processed = refresh(conn, args.batch)
+        print(f"✅ PurchaseItem: {processed} rows 집계")
+
+        if args.check:
+            to_day = datetime.date.today()
+            from_day = to_day - datetime.timedelta(days=args.days - 1)
+            mismatches = check(conn, from_day, to_day)
+            for item in mismatches:
+                print(f"  {item['day']} brid={item['brid']} pid={item['pid']}: "
+                      f"집계 {item['summary']} / 원본 {item['source']}")
+            print(f"{'⚠️' if mismatches else '✅'} {from_day} ~ {to_day}: 차이 {len(mismatches)}건")
+            if mismatches and args.repair:
+                days = {item['day'] for item in mismatches}
+                repair(conn, days)
+                print(f"🔄 {len(days)}일을 원본으로 다시 집계했습니다")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="주문 항목 일별 매출 집계")
+    parser.add_argument("--batch", type=int, default=SALES_CONFIG['batch'], help="한 트랜잭션에서 읽을 주문 항목 수")
+    parser.add_argument("--rebuild", action="store_true", help="집계를 비우고 처음부터 다시")
+    parser.add_argument("--check", action="store_true", help="최근 --days 일을 원본과 비교")
+    parser.add_argument("--days", type=int, default=SALES_CONFIG['check_days'], help="정합성 확인 기간(일)")
+    parser.add_argument("--repair", action="store_true", help="--check 에서 차이 난 날을 원본으로 다시 집계")
+    main(parser.parse_args())
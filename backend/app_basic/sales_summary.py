@@ -0,0 +1,101 @@
+"""
+sales_summary API - 일별 매출 집계 조회 (직원 대시보드)
+개별 실행: python sales_summary.py
+
+sales_rollup.py 가 미리 더해 둔 SalesDaily(일 x 매장 x 상품)만 읽는다 (migrations/007_sales_summary.sql).
+원본 주문(Purchase / PurchaseItem / Product)은 join 하지 않으므로 주문 양과 관계없이 기간 안의 집계 행만 읽는다.
+
+작성일: 2026-10-18
+
+수정 이력:
+| 날짜 | 작성자 | 내용 |
+|------|--------|------|
+|      |        |      |
+"""
+
+from fastapi import FastAPI, APIRouter, Depends, Query
+from typing import Optional
+from database.connection import get_db
+import datetime
+
+router = APIRouter()
+ipAddress = "127.0.0.1"
+port = 8000
+
+
+# ============================================
+# 매출 집계 조회
+# ============================================
+# - from ~ to 날짜 포함 (기본: 오늘까지 30일, 최대 SUMMARY_MAX_DAYS 일)
+# - group_by: day, branch, product 를 쉼표로 조합 (예: group_by=day,branch -> 일별 매장별 매출)
+#   매장 0 = 픽업 매장이 없는 주문
+# - brid / pid: 특정 매장 / 상품만
+# - as_of: 집계가 마지막으로 갱신된 시각 (그 이후 주문은 아직 반영 전)
+SUMMARY_MAX_DAYS = 366
+SUMMARY_GROUPS = {'day': 'day', 'branch': 'brid', 'product': 'pid'}
+
+
+@router.get("/sales_summary")
+def select_summary(
+    from_day: Optional[datetime.date] = Query(None, alias="from"),
+    to_day: Optional[datetime.date] = Query(None, alias="to"),
+    group_by: str = "day,branch",
+    brid: Optional[int] = None,
+    pid: Optional[int] = None,
+    conn = Depends(get_db)
+):
+    try:
+        to_day = to_day or datetime.date.today()
+        from_day = from_day or to_day - datetime.timedelta(days=29)
+        if from_day > to_day:
+            raise ValueError("from 은 to 보다 늦을 수 없습니다")
+        if (to_day - from_day).days >= SUMMARY_MAX_DAYS:
+            raise ValueError(f"기간은 최대 {SUMMARY_MAX_DAYS}일입니다")
+        names = list(dict.fromkeys(name.strip() for name in group_by.split(',') if name.strip()))
+        unknown = [name for name in names if name not in SUMMARY_GROUPS]
+        if unknown or not names:
+            raise ValueError(f"group_by 는 {', '.join(SUMMARY_GROUPS)} 중에서 골라야 합니다")
+        columns = ', '.join(SUMMARY_GROUPS[name] for name in names)
+
+        conditions, params = ["day BETWEEN %s AND %s"], [from_day, to_day]
+        if brid is not None:
+            conditions.append("brid = %s")
+            params.append(brid)
+        if pid is not None:
+            conditions.append("pid = %s")
+            params.append(pid)
+
+        curs = conn.cursor()
+        curs.execute(f"""
+            SELECT {columns}, SUM(quantity), SUM(revenue)
+            FROM SalesDaily
+            WHERE {' AND '.join(conditions)}
+            GROUP BY {columns}
+            ORDER BY {columns}
+        """, params)
+        result = []
+        for row in curs.fetchall():
+            item = {name: str(value) if name == 'day' else value for name, value in zip(names, row)}
+            item['quantity'] = int(row[-2])
+            item['revenue'] = int(row[-1])
+            result.append(item)
+
+        curs.execute("SELECT updated_at FROM RollupWatermark WHERE name = 'sales_daily'")
+        row = curs.fetchone()
+
+        return {"results": result, "as_of": None if row is None else str(row[0])}
+    except Exception as e:
+        return {"result": "Error", "errorMsg": str(e)}
+
+
+# ============================================
+# 개별 실행
+# ============================================
+if __name__ == "__main__":
+    import uvicorn
+    app = FastAPI()
+    app.include_router(router)
+    print(f"🚀 [sales_summary] API 서버 시작")
+    print(f"   서버 주소: http://{ipAddress}:{port}")
+    print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
+    uvicorn.run(app, host=ipAddress, port=port)
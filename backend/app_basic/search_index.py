@@ -0,0 +1,193 @@
+"""
+상품 검색 인덱스 (메모리 역색인)
+
+p_name / p_description 의 단어를 소문자로 나누고, 단어의 모든 접미사(suffix)를
+정렬된 용어 목록에 넣어둔다. 검색어로 시작하는 용어를 이분 탐색으로 찾으면
+'단어 안 어디든 포함' 검색(LIKE '%검색어%')과 같은 결과를 전체 테이블을 훑지 않고 얻는다.
+한글 상품명("에어맥스" 에서 "맥스")도 같은 방식으로 찾는다.
+
+관련도 점수
+- 상품명 일치가 설명 일치보다 높다
+- 단어 전체 일치 > 단어 앞부분 일치 > 단어 중간 일치
+- 여러 검색어 중 더 많이 일치한 상품이 앞에 온다
+
+- 서버 시작 시 build() 로 만든다 (main.py)
+- 상품 추가/수정/삭제 시 upsert() / remove() 로 바로 반영한다
+- 다른 워커에서 바뀐 내용은 REBUILD_INTERVAL 마다 다시 만들면서 반영된다
+  (다시 만드는 건 한 요청만 하고, 그동안 다른 요청은 기존 인덱스로 검색한다)
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left
+
+
+REBUILD_INTERVAL = 300
+
+NAME_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return WORD_PATTERN.findall(str(text).lower())
+
+
+class SearchIndex:
+    def __init__(self, rebuild_interval=REBUILD_INTERVAL):
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()   # build 는 한 번에 하나만
+        self._postings = {}   # 접미사 -> {p_seq: 가중치}
+        self._words = {}      # 단어 -> {p_seq: 필드 가중치} (전체 일치 가산점용)
+        self._docs = {}       # p_seq -> (색인한 접미사, 단어, 필터 값 dict)
+        self._terms = []      # 정렬된 접미사 목록
+        self._terms_dirty = False
+        self._built_at = 0.0
+
+    # ------------------------------------------
+    # 색인
+    # ------------------------------------------
+    def _add(self, p_seq, p_name, p_description, filters):
+        suffixes, words = set(), set()
+        for field_weight, text in ((NAME_WEIGHT, p_name), (DESCRIPTION_WEIGHT, p_description)):
+            for word in tokenize(text):
+                words.add(word)
+                w = self._words.setdefault(word, {})
+                w[p_seq] = max(w.get(p_seq, 0), field_weight)
+                for i in range(len(word)):
+                    suffix = word[i:]
+                    # 단어 시작 위치 일치는 중간 일치보다 2배
+                    weight = field_weight * (2 if i == 0 else 1)
+                    posting = self._postings.get(suffix)
+                    if posting is None:
+                        posting = self._postings[suffix] = {}
+                        self._terms_dirty = True
+                    posting[p_seq] = max(posting.get(p_seq, 0), weight)
+                    suffixes.add(suffix)
+        self._docs[p_seq] = (suffixes, words, filters)
+
+    def _remove(self, p_seq):
+        doc = self._docs.pop(p_seq, None)
+        if doc is None:
+            return
+        suffixes, words, _ = doc
+        for suffix in suffixes:
+            posting = self._postings.get(suffix)
+            if posting is not None:
+                posting.pop(p_seq, None)
+                if not posting:
+                    del self._postings[suffix]
+                    self._terms_dirty = True
+        for word in words:
+            w = self._words.get(word)
+            if w is not None:
+                w.pop(p_seq, None)
+                if not w:
+                    del self._words[word]
+
+    def build(self, conn):
+        """product 테이블 전체로 인덱스를 새로 만든다"""
+        curs = conn.cursor()
+        curs.execute("""
+            SELECT p_seq, p_name, p_description, m_seq, cc_seq, kc_seq
+            FROM product
+        """)
+        rows = curs.fetchall()
+        fresh = SearchIndex(self.rebuild_interval)
+        for row in rows:
+            fresh._add(row[0], row[1], row[2], {"m_seq": row[3], "cc_seq": row[4], "kc_seq": row[5]})
+        fresh._terms = sorted(fresh._postings)
+        with self._lock:
+            self._postings = fresh._postings
+            self._words = fresh._words
+            self._docs = fresh._docs
+            self._terms = fresh._terms
+            self._terms_dirty = False
+            self._built_at = time.monotonic()
+
+    def _stale(self):
+        return time.monotonic() - self._built_at > self.rebuild_interval
+
+    def ensure(self, conn):
+        """
+        인덱스가 없거나 오래됐으면 다시 만든다
+        - 아직 없으면: 한 요청이 만들고 나머지는 기다렸다가 그 결과를 쓴다
+        - 오래됐으면: 먼저 온 한 요청만 다시 만들고 나머지는 기다리지 않고 기존 인덱스를 쓴다
+        """
+        if not self._stale():
+            return
+        if self._built_at == 0.0:
+            with self._build_lock:
+                if self._stale():
+                    self.build(conn)
+            return
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            if self._stale():
+                self.build(conn)
+        finally:
+            self._build_lock.release()
+
+    def upsert(self, p_seq, p_name, p_description, m_seq, cc_seq, kc_seq):
+        """상품 추가/수정 반영"""
+        with self._lock:
+            self._remove(p_seq)
+            self._add(p_seq, p_name, p_description, {"m_seq": m_seq, "cc_seq": cc_seq, "kc_seq": kc_seq})
+
+    def remove(self, p_seq):
+        """상품 삭제 반영"""
+        with self._lock:
+            self._remove(p_seq)
+
+    # ------------------------------------------
+    # 검색
+    # ------------------------------------------
+    def _match(self, keyword):
+        """keyword 를 포함하는 상품별 최고 가중치"""
+        if self._terms_dirty:
+            self._terms = sorted(self._postings)
+            self._terms_dirty = False
+        scores = {}
+        i = bisect_left(self._terms, keyword)
+        while i < len(self._terms) and self._terms[i].startswith(keyword):
+            for p_seq, weight in self._postings[self._terms[i]].items():
+                if weight > scores.get(p_seq, 0):
+                    scores[p_seq] = weight
+            i += 1
+        # 단어 전체 일치 가산점
+        for p_seq, field_weight in self._words.get(keyword, {}).items():
+            scores[p_seq] += field_weight
+        return scores
+
+    def search(self, keywords, **filters):
+        """
+        검색어 중 하나라도 포함하는 상품을 관련도 순으로 반환
+
+        Args:
+            keywords: 검색어 목록
+            filters: 필터 값 (예: m_seq=1, cc_seq=2, kc_seq=3). None 인 필터는 무시
+
+        Returns:
+            list: 관련도 높은 순 p_seq 목록 (점수가 같으면 p_seq 순)
+        """
+        filters = {k: v for k, v in filters.items() if v is not None}
+        totals = {}
+        with self._lock:
+            for keyword in {k for kw in keywords for k in tokenize(kw)}:
+                for p_seq, score in self._match(keyword).items():
+                    totals[p_seq] = totals.get(p_seq, 0) + score
+            if filters:
+                totals = {
+                    p_seq: score for p_seq, score in totals.items()
+                    if all(self._docs[p_seq][2].get(k) == v for k, v in filters.items())
+                }
+        return sorted(totals, key=lambda p_seq: (-totals[p_seq], p_seq))
+
+
+search_index = SearchIndex()
@@ -11,15 +11,20 @@ Employee API - Employee CRUD
 2025-12-29    이광태    최초 CRUD생성. 
 """
 
-from fastapi import FastAPI, Form, UploadFile, File, Response
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, Response, Depends, Query, Header
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from image_http import image_url, etag_matches, cache_headers, not_modified, image_response
+from blob_store import blob_store
+from image_upload import store_upload
+from thumbnails import thumbnails
 import base64
 from datetime import datetime
 
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8000
 
@@ -42,52 +47,57 @@ class EmployeeModel(BaseModel):
 # ============================================
 # 전체 조회 (Read All)
 # ============================================
-@app.get("/select_staffs")
-async def select_all():
-  conn = connect_db()
+@router.get("/select_staffs")
+def select_all(
+  after: Optional[int] = None,
+  limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+  conn = Depends(get_db)
+):
   try:
     curs = conn.cursor()
     
-    # id,cEmail,cPhoneNumber,cName,cPassword,cProfileImage
+    # 목록에서는 이미지 해시만 읽는다
+    # 이미지는 s_image 의 URL(/view_staff_image/{s_seq}?v=해시)로 따로 받는다
     curs.execute("""
-        SELECT *
+        SELECT s_seq, s_id, br_seq, s_rank, s_phone, s_name, s_superseq, created_at, s_quit_date,
+               s_image_hash
         FROM staff 
+        WHERE s_seq > %s
         ORDER BY s_seq
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
     
-    rows = curs.fetchall()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
     
 
     results = [{
         "s_seq":row[0],
         "s_id":row[1],
         "br_seq":row[2],
-        "s_image":base64.b64encode(row[4]),
-        "s_rank":row[5],
-        "s_phone":row[6],
-        "s_name":row[7],
-        "s_superseq":row[8],
-        "created_at":row[9],
-        "s_quit_date":row[10],
+        "s_image": image_url(f"/view_staff_image/{row[0]}", row[9]) if row[9] else None,
+        "s_rank":row[3],
+        "s_phone":row[4],
+        "s_name":row[5],
+        "s_superseq":row[6],
+        "created_at":row[7],
+        "s_quit_date":row[8],
         
     } for row in rows]
   
-    return {"results": results}
+    return {"results": results, "next_cursor": next_cursor}
   except Exception as error:
     return {"result": "Error", "errorMsg": str(error)}
-  finally:
-     conn.close()
 
 # ============================================
 # 단일 조회 (Read One)
 # ============================================
-@app.get("/select_staff/{item_id}")
-async def select_one(item_id: int):
-  conn = connect_db()
+@router.get("/select_staff/{item_id}")
+def select_one(item_id: int, conn = Depends(get_db)):
   try:
     curs = conn.cursor()
     curs.execute("""
-        SELECT *
+        SELECT s_seq, s_id, br_seq, s_password, s_image, s_rank, s_phone, s_name, s_superseq,
+               created_at, s_quit_date, s_image_hash
         FROM staff
         WHERE s_seq = %s
     """, (item_id,))
@@ -98,12 +108,17 @@ async def select_one(item_id: int):
     if row is None:
         return {"result": "Error", "message": "staff not found"}
     
+    # 저장소로 옮긴 이미지는 s_image 가 비어 있고 해시로 저장소에서 읽는다
+    image = row[4]
+    if image is None and row[11] is not None:
+      image = blob_store.read(row[11])
+
     # TODO: 결과 매핑
     result = {
         "s_seq":row[0],
         "s_id":row[1],
         "br_seq":row[2],
-        "s_image":base64.b64encode(row[4]),
+        "s_image":base64.b64encode(image) if image is not None else None,
         "s_rank":row[5],
         "s_phone":row[6],
         "s_name":row[7],
@@ -114,14 +129,12 @@ async def select_one(item_id: int):
     return {"result": result}
   except Exception as error:
     return {"result": "Error", "errorMsg": str(error)}
-  finally:
-     conn.close()
 
 # ============================================
 # 추가 (Create)
 # ============================================
-@app.post("/insert_staff")
-async def insert_one(
+@router.post("/insert_staff")
+def insert_one(
   s_id:str = Form(...),
   br_seq:int=Form(...),
   s_password:str=Form(...),
@@ -130,21 +143,22 @@ async def insert_one(
   s_phone:str=Form(...),
   s_name:str=Form(...),
   s_superseq:int=Form(...),
-  created_at:Optional[str] = None 
+  created_at:Optional[str] = None,
+  conn = Depends(get_db)
  
 ):  
     if created_at is None:
        created_at = datetime.now()
-    conn = connect_db()
     try:
         curs = conn.cursor()
         if s_image is not None:
-          imageData = await s_image.read()
+          # 이미지는 저장소에 두고 DB에는 해시만 저장 (조각 단위로 받아 임시 파일 경유)
+          digest = store_upload(s_image)
           sql = """
-            INSERT INTO staff (s_id,br_seq,s_password,s_image,s_rank,s_phone,s_name,s_superseq,created_at) 
+            INSERT INTO staff (s_id,br_seq,s_password,s_image_hash,s_rank,s_phone,s_name,s_superseq,created_at) 
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
           """
-          curs.execute(sql, (s_id,br_seq,s_password,imageData,s_rank,s_phone,s_name,s_superseq,created_at))
+          curs.execute(sql, (s_id,br_seq,s_password,digest,s_rank,s_phone,s_name,s_superseq,created_at))
         else:
           sql = """
             INSERT INTO staff (s_id,br_seq,s_password,s_rank,s_phone,s_name,s_superseq,created_at) 
@@ -160,16 +174,14 @@ async def insert_one(
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-      conn.close()
 
 # ============================================
 # 수정 (Update)
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_staff")
-async def update_one(
+@router.post("/update_staff")
+def update_one(
   s_seq:Optional[int] = None, 
   s_id:str = Form(...),
   br_seq:int=Form(...),
@@ -178,21 +190,21 @@ async def update_one(
   s_rank:str=Form(...),
   s_phone:str=Form(...),
   s_name:str=Form(...),
-  s_superseq:int=Form(...)
+  s_superseq:int=Form(...),
+  conn = Depends(get_db)
 ):
-    conn = connect_db()
     try:
         curs = conn.cursor()
         # File 
         if s_image is not None:
            
-          imageData = await s_image.read()
+          digest = store_upload(s_image)
           sql = """
               UPDATE staff
-              SET br_seq=%s, s_image=%s, s_rank=%s,s_phone=%s,s_name=%s,s_superseq=%s
+              SET br_seq=%s, s_image=NULL, s_image_hash=%s, s_rank=%s,s_phone=%s,s_name=%s,s_superseq=%s
               WHERE s_seq=%s
           """
-          curs.execute(sql, (br_seq, imageData, s_rank,s_phone,s_name,s_superseq,s_seq))
+          curs.execute(sql, (br_seq, digest, s_rank,s_phone,s_name,s_superseq,s_seq))
         else:
           sql = """
               UPDATE staff
@@ -206,17 +218,14 @@ async def update_one(
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-       conn.close()
 
 # ============================================
 # 삭제 (Delete)
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_staff/{item_id}")
-async def delete_one(item_id: int):
-    conn = connect_db()
+@router.delete("/delete_staff/{item_id}")
+def delete_one(item_id: int, conn = Depends(get_db)):
     try:
         curs = conn.cursor()
         sql = "DELETE FROM staff WHERE s_seq=%s"
@@ -227,8 +236,6 @@ async def delete_one(item_id: int):
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-       conn.close()
 
 
 
@@ -238,33 +245,71 @@ async def delete_one(item_id: int):
 # ============================================
 # [선택] 이미지 조회 (이미지 BLOB 컬럼이 있는 경우)
 # ============================================
-# @app.get("/select_employee/{item_id}/profile_image")
-@app.get("/view_staff_image/{item_id}")
-async def select_one(item_id: int):
-  conn = connect_db()
-  try:
+def read_staff_image(conn, item_id, digest):
+  """원본 이미지 바이너리 (저장소에 없으면 아직 옮기지 않은 DB BLOB)"""
+  data = blob_store.read(digest)
+  if data is None:
     curs = conn.cursor()
     curs.execute("""
         SELECT s_image
         FROM staff
         WHERE s_seq = %s
     """, (item_id,))
+    row = curs.fetchone()
+    data = row[0] if row else None
+  return data
+
+
+# @router.get("/select_employee/{item_id}/profile_image")
+# v: 목록 API 가 준 이미지 버전(해시 앞부분) - 맞으면 오래 캐시해도 된다
+# w: 썸네일 너비 (예: ?w=96) - 없으면 원본
+@router.get("/view_staff_image/{item_id}")
+def select_one(
+  item_id: int,
+  v: Optional[str] = None,
+  w: Optional[int] = Query(None, ge=1, le=4096),
+  if_none_match: Optional[str] = Header(None),
+  accept: Optional[str] = Header(None),
+  conn = Depends(get_db)
+):
+  try:
+    curs = conn.cursor()
+    
+    # BLOB 은 읽지 않고 해시만 먼저 확인
+    curs.execute("""
+        SELECT s_image_hash
+        FROM staff
+        WHERE s_seq = %s
+    """, (item_id,))
     
     row = curs.fetchone()
     if row is None:
       return {"result": "Error", "message": "Customer not found"}
-    if row[0] is None:
+    digest = row[0]
+    if digest is None:
       return {"result": "Error", "message": "No profile image"}
-    # Response 객체로 바이너리 직접 반환
-    return Response(
-      content=row[0],
-      media_type="image/jpeg",
-      headers={"Cache-Control": "no-cache, no-store, must-revalidate"}
-    )
+    variant = thumbnails.variant(w, accept)
+    # 클라이언트가 가진 이미지와 같으면 304
+    if etag_matches(if_none_match, digest, variant):
+      return not_modified(digest, v, variant)
+
+    # 썸네일 (처음 요청 때 만들어 디스크에 캐시)
+    if variant is not None:
+      data = thumbnails.get(digest, variant, lambda: read_staff_image(conn, item_id, digest))
+      if data is None:
+        return {"result": "Error", "message": "No profile image"}
+      return image_response(data, digest, v, thumbnails.media_type(variant), variant)
+
+    # 저장소 파일을 그대로 전송
+    if blob_store.exists(digest):
+      return blob_store.response(digest, headers=cache_headers(digest, v))
+    # 아직 저장소로 옮기지 않은 이미지 (drain_image_blobs.py 실행 전)
+    data = read_staff_image(conn, item_id, digest)
+    if data is None:
+      return {"result": "Error", "message": "No profile image"}
+    return image_response(data, digest, v)
   except Exception as error:
     return {"result": "Error", "errorMsg": str(error)}
-  finally:
-    conn.close()
 
 
 
@@ -274,19 +319,18 @@ async def select_one(item_id: int):
 # ============================================
 #TODO: 이미지만 별도로 업데이트
 # - UploadFile = File(...) 사용
-@app.post("/update_staff_image")
-async def update_image(
+@router.post("/update_staff_image")
+def update_image(
     item_id: int = Form(...),
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    conn = Depends(get_db)
 ):
-    conn = connect_db()
     try:
-        image_data = await file.read()
-        
-        
+        digest = store_upload(file)
+
         curs = conn.cursor()
-        sql = "UPDATE staff SET s_image=%s WHERE s_seq=%s"
-        curs.execute(sql, (image_data, item_id))
+        sql = "UPDATE staff SET s_image=NULL, s_image_hash=%s WHERE s_seq=%s"
+        curs.execute(sql, (digest, item_id))
         conn.commit()
        
         
@@ -294,8 +338,6 @@ async def update_image(
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-      conn.close()
 
 
 # ============================================
@@ -303,6 +345,8 @@ async def update_image(
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 [테이블명] API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
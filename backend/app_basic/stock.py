@@ -0,0 +1,108 @@
+"""
+재고 예약 / 반환 (원자적 차감)
+
+재고를 읽어서 계산한 값으로 덮어쓰면(read-modify-write) 동시에 주문이 들어올 때
+서로의 차감을 덮어써 재고보다 많이 팔린다(oversell).
+대신 DB 가 조건부로 차감하게 한다.
+
+    UPDATE product SET p_stock = p_stock - 수량 WHERE p_seq = ? AND p_stock >= 수량
+
+- 주문의 모든 줄을 UPDATE 한 문장(VALUES ROW 목록과 join)으로 한 번에 차감한다
+- 한 줄이라도 재고가 모자라면 StockError 를 던진다 -> 호출한 쪽에서 rollback
+- 같은 상품 줄은 합치고 seq 순서로 정렬해 잠금 순서를 고정한다 (교착 상태 방지)
+- 커밋은 호출한 쪽에서 한다 (주문 생성 등 다른 쓰기와 한 트랜잭션으로 묶을 수 있다)
+"""
+
+
+# 테이블 이름: (테이블, 키 컬럼, 재고 컬럼)
+STOCK_TABLES = {
+    'product': ('product', 'p_seq', 'p_stock'),      # product_gt.py
+    'Product': ('Product', 'id', 'pQuantity'),       # Purchase / PurchaseItem 이 참조
+}
+
+
+class StockError(Exception):
+    """재고 부족 / 없는 상품 (shortages: [{"seq", "requested", "available"}])"""
+
+    def __init__(self, shortages, message="재고가 부족합니다"):
+        super().__init__(message)
+        self.shortages = shortages
+
+
+def merge_lines(lines):
+    """
+    [(seq, 수량), ...] -> 같은 seq 를 합치고 seq 순으로 정렬한 목록
+
+    Raises:
+        ValueError: 수량이 1 미만인 줄이 있을 때
+    """
+    merged = {}
+    for seq, quantity in lines:
+        if quantity < 1:
+            raise ValueError(f"수량은 1 이상이어야 합니다 (seq={seq}, 수량={quantity})")
+        merged[seq] = merged.get(seq, 0) + quantity
+    return sorted(merged.items())
+
+
+def _apply(curs, lines, table, sign):
+    """lines 전체에 재고 증감을 한 문장으로 적용 -> 바뀐 행 수"""
+    name, key, column = STOCK_TABLES[table]
+    rows = ', '.join(['ROW(%s, %s)'] * len(lines))
+    condition = f"WHERE t.{column} >= r.quantity" if sign == '-' else ""
+    curs.execute(f"""
+        UPDATE {name} t
+        JOIN (VALUES {rows}) AS r (seq, quantity) ON t.{key} = r.seq
+        SET t.{column} = t.{column} {sign} r.quantity
+        {condition}
+    """, [value for line in lines for value in line])
+    return curs.rowcount
+
+
+def _shortages(curs, lines, table):
+    name, key, column = STOCK_TABLES[table]
+    curs.execute(f"""
+        SELECT {key}, {column} FROM {name}
+        WHERE {key} IN ({', '.join(['%s'] * len(lines))})
+    """, [seq for seq, _ in lines])
+    available = dict(curs.fetchall())
+    return [
+        {"seq": seq, "requested": quantity, "available": available.get(seq)}
+        for seq, quantity in lines
+        if available.get(seq) is None or available[seq] < quantity
+    ]
+
+
+def reserve(curs, lines, table='product'):
+    """
+    재고 차감 (전부 아니면 전무)
+
+    Args:
+        curs: 트랜잭션 중인 커서
+        lines: [(seq, 수량), ...]
+        table: STOCK_TABLES 의 키
+
+    Returns:
+        합쳐서 정렬한 lines
+
+    Raises:
+        StockError: 재고가 모자라거나 없는 상품이 있을 때 (rollback 해야 한다)
+    """
+    lines = merge_lines(lines)
+    if lines and _apply(curs, lines, table, '-') != len(lines):
+        raise StockError(_shortages(curs, lines, table))
+    return lines
+
+
+def release(curs, lines, table='product'):
+    """
+    재고 반환 (주문 취소 등)
+
+    Raises:
+        StockError: 없는 상품이 있을 때 (available 이 None)
+    """
+    lines = merge_lines(lines)
+    if lines and _apply(curs, lines, table, '+') != len(lines):
+        raise StockError([
+            shortage for shortage in _shortages(curs, lines, table) if shortage["available"] is None
+        ], "없는 상품이 있습니다")
+    return lines
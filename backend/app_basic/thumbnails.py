@@ -0,0 +1,168 @@
+"""
+썸네일 생성 / 디스크 캐시
+
+이미지 조회 API 에 ?w=<너비> 를 주면 원본 대신 썸네일을 내려준다.
+- 너비는 THUMBNAIL_WIDTHS 중 요청 이상인 가장 작은 크기로 맞춘다 (캐시 종류를 고정)
+- 클라이언트가 WebP 를 받으면(Accept: image/webp) WebP, 아니면 JPEG
+- 처음 요청할 때 만들어 디스크에 저장하고, 이후에는 저장한 파일을 쓴다
+- 전체 크기가 max_bytes 를 넘으면 오래 안 쓴 썸네일부터 지운다 (LRU)
+- Pillow 가 없으면 썸네일 없이 원본으로 응답한다
+"""
+
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+
+THUMBNAIL_WIDTHS = (48, 96, 192, 384, 768)
+
+# 썸네일 캐시 설정
+THUMBNAIL_CONFIG = {
+    'root': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thumbs'),
+    'max_bytes': 256 * 1024 * 1024,
+    'quality': 80,
+}
+
+# 형식: (Pillow 형식 이름, media type)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+
+def render(data, width, fmt, quality):
+    """원본 바이너리 -> width 너비 썸네일 바이너리 (원본보다 키우지 않는다)"""
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS)
+        if fmt == 'jpeg' and img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        elif fmt == 'webp' and img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA')
+        out = io.BytesIO()
+        img.save(out, FORMATS[fmt][0], quality=quality)
+        return out.getvalue()
+
+
+class ThumbnailCache:
+    def __init__(self, root, max_bytes, quality):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self._lock = threading.Lock()
+        self._entries = None   # 파일 경로 -> 크기 (오래 안 쓴 순서)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def variant(self, w, accept=None):
+        """
+        요청 너비/Accept 헤더 -> 썸네일 종류 (예: '96.webp')
+        w 가 없거나 Pillow 가 없으면 None (원본으로 응답)
+        """
+        if w is None or Image is None:
+            return None
+        width = next((size for size in THUMBNAIL_WIDTHS if size >= w), THUMBNAIL_WIDTHS[-1])
+        fmt = 'webp' if accept and 'image/webp' in accept else 'jpeg'
+        return f"{width}.{fmt}"
+
+    @staticmethod
+    def media_type(variant):
+        return FORMATS[variant.split('.')[1]][1]
+
+    def _load_index(self):
+        """처음 한 번 디스크의 썸네일 목록을 읽는다 (접근 시간 순)"""
+        if self._entries is not None:
+            return
+        files = []
+        for folder, _, names in os.walk(self.root):
+            for name in names:
+                if name.startswith('.tmp-'):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_atime, path, stat.st_size))
+        files.sort()
+        self._entries = OrderedDict((path, size) for _, path, size in files)
+        self._bytes = sum(self._entries.values())
+
+    def get(self, key, variant, load_source):
+        """
+        썸네일 바이너리 (없으면 만들어서 저장)
+
+        Args:
+            key: 원본 이미지 식별자 (해시 등 파일 이름으로 쓸 수 있는 문자열)
+            variant: variant() 결과
+            load_source: 원본 바이너리를 반환하는 함수 (만들 때만 호출, 없으면 None 반환)
+
+        Returns:
+            bytes 또는 None (원본이 없을 때)
+        """
+        path = os.path.join(self.root, key[:2], f"{key}_{variant}")
+        with self._lock:
+            self._load_index()
+            if path in self._entries:
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                    self._entries.move_to_end(path)
+                    self._hits += 1
+                    return data
+                except FileNotFoundError:
+                    self._bytes -= self._entries.pop(path)
+            self._misses += 1
+
+        source = load_source()
+        if source is None:
+            return None
+        width, fmt = variant.split('.')
+        data = render(source, int(width), fmt, self.quality)
+
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._bytes += len(data) - self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            # 오래 안 쓴 것부터 제거 (방금 만든 것은 남긴다)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_path, old_size = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self._evictions += 1
+                try:
+                    os.remove(old_path)
+                except FileNotFoundError:
+                    pass
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": Image is not None,
+                "entries": len(self._entries or ()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+thumbnails = ThumbnailCache(**THUMBNAIL_CONFIG)
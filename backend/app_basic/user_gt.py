@@ -10,14 +10,19 @@ Customer API - Customer CRUD
   2025-12-29    이광태   최초 CRUD생성
 """
 
-from fastapi import FastAPI, Form, UploadFile, File, Response
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, Response, Depends, Query, Header
 from pydantic import BaseModel
 from typing import Optional
-from database.connection import connect_db
+from database.connection import get_db
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from image_http import image_url, etag_matches, cache_headers, not_modified, image_response
+from blob_store import blob_store
+from image_upload import store_upload
+from thumbnails import thumbnails
 import base64
 from datetime import datetime
 
-app = FastAPI()
+router = APIRouter()
 ipAddress = "127.0.0.1"
 port = 8000
 
@@ -40,21 +45,28 @@ class CustomerModel(BaseModel):
 # ============================================
 # 전체 조회 (Read All)
 # ============================================
-@app.get("/select_users")
-async def select_all():
-  conn = connect_db()
+@router.get("/select_users")
+def select_all(
+  after: Optional[int] = None,
+  limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+  conn = Depends(get_db)
+):
   try:
     
     curs = conn.cursor()
     
-    # id,cEmail,cPhoneNumber,cName,cPassword,cProfileImage
+    # 목록에서는 이미지 해시만 읽는다
+    # 이미지는 u_image 의 URL(/view_user_image/{u_seq}?v=해시)로 따로 받는다
     curs.execute("""
-        SELECT *
+        SELECT u_seq, u_id, u_password, u_name, u_phone, u_address, created_at, u_quit_date,
+               u_image_hash
         FROM user 
+        WHERE u_seq > %s
         ORDER BY u_seq
-    """)
+        LIMIT %s
+    """, (after or 0, limit + 1))
     
-    rows = curs.fetchall()
+    rows, next_cursor = paginate(curs.fetchall(), limit)
 
     results = [{
         "u_seq":row[0],
@@ -62,31 +74,28 @@ async def select_all():
         "u_password":row[2],
         "u_name":row[3],
         "u_phone":row[4],
-        "u_image": base64.b64encode(row[5]),
-        "u_address":row[6],
-        "created_at":row[7],
-        "u_quit_date":row[8]
+        "u_image": image_url(f"/view_user_image/{row[0]}", row[8]) if row[8] else None,
+        "u_address":row[5],
+        "created_at":row[6],
+        "u_quit_date":row[7]
         
     } for row in rows]
   
-    return {"results": results}
+    return {"results": results, "next_cursor": next_cursor}
   except Exception as error:
     return {"result": "Error", "errorMsg": str(error)}
-  finally:
-     conn.close()
 
 # ============================================
 # 단일 조회 (Read One)
 # ============================================
-@app.get("/select_user/{item_id}")
-async def select_one(item_id: int):
-  conn = connect_db()
+@router.get("/select_user/{item_id}")
+def select_one(item_id: int, conn = Depends(get_db)):
   try:
     curs = conn.cursor()
     
-    # TODO: SQL 작성
     curs.execute("""
-        SELECT *
+        SELECT u_seq, u_id, u_password, u_name, u_phone, u_image, u_address, created_at, u_quit_date,
+               u_image_hash
         FROM user
         WHERE u_seq = %s
     """, (item_id,))
@@ -97,6 +106,11 @@ async def select_one(item_id: int):
     if row is None:
         return {"result": "Error", "message": "user not found"}
     
+    # 저장소로 옮긴 이미지는 u_image 가 비어 있고 해시로 저장소에서 읽는다
+    image = row[5]
+    if image is None and row[9] is not None:
+      image = blob_store.read(row[9])
+
     # TODO: 결과 매핑
     result = {
         "u_seq":row[0],
@@ -104,7 +118,7 @@ async def select_one(item_id: int):
         "u_password":row[2],
         "u_name":row[3],
         "u_phone":row[4],
-        "u_image": base64.b64encode(row[5]),
+        "u_image": base64.b64encode(image) if image is not None else None,
         "u_address":row[6],
         "created_at":row[7],
         "u_quit_date":row[8]
@@ -112,14 +126,12 @@ async def select_one(item_id: int):
     return {"result": result}
   except Exception as error:
     return {"result": "Error", "errorMsg": str(error)}
-  finally:
-     conn.close()
 
 # ============================================
 # 추가 (Create)
 # ============================================
-@app.post("/insert_user")
-async def insert_one(
+@router.post("/insert_user")
+def insert_one(
   u_id:str = Form(...),
   u_password:str=Form(...),
   u_name:str=Form(...),
@@ -127,24 +139,25 @@ async def insert_one(
   u_image:Optional[UploadFile] = None,
   u_address:str=Form(...),
   created_at:Optional[str] = None,
-  u_quit:Optional[str] = None
+  u_quit:Optional[str] = None,
+  conn = Depends(get_db)
 ):
     if created_at is None:
       created_at = datetime.now()
 
-    conn = connect_db()
     try:
        
         curs = conn.cursor()
         
         if u_image is not None:
           
-          imageData = await u_image.read()
+          # 이미지는 저장소에 두고 DB에는 해시만 저장 (조각 단위로 받아 임시 파일 경유)
+          digest = store_upload(u_image)
           sql = """
-            INSERT INTO user (u_id,u_password,u_name,u_phone,u_image,u_address,created_at) 
+            INSERT INTO user (u_id,u_password,u_name,u_phone,u_image_hash,u_address,created_at) 
             VALUES (%s, %s, %s, %s, %s, %s, %s)
           """
-          curs.execute(sql, (u_id,u_password,u_name,u_phone,imageData,u_address,created_at))
+          curs.execute(sql, (u_id,u_password,u_name,u_phone,digest,u_address,created_at))
         else:
           sql = """
             INSERT INTO user (u_id,u_password,u_name,u_phone,u_address,created_at) 
@@ -160,8 +173,6 @@ async def insert_one(
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-       conn.close()
 
 
 # ============================================
@@ -169,15 +180,15 @@ async def insert_one(
 # ============================================
 # TODO: 레코드 수정 API 구현
 # - 이미지 BLOB이 있는 경우: 이미지 제외/포함 두 가지 API 구현 권장
-@app.post("/update_user")
-async def update_one(
+@router.post("/update_user")
+def update_one(
     u_seq: int = Form(...),
     u_name:str=Form(...),
     u_phone:str=Form(...),
     u_image:Optional[UploadFile] = None,
-    u_address:str=Form(...)
+    u_address:str=Form(...),
+    conn = Depends(get_db)
 ):
-    conn = connect_db()
     try:
         
         curs = conn.cursor()
@@ -185,13 +196,13 @@ async def update_one(
         # File 
         if u_image is not None:
            
-          imageData = await u_image.read()
+          digest = store_upload(u_image)
           sql = """
               UPDATE user
-              SET u_name=%s, u_phone=%s,u_image=%s,u_address=%s
+              SET u_name=%s, u_phone=%s,u_image=NULL,u_image_hash=%s,u_address=%s
               WHERE u_seq=%s
           """
-          curs.execute(sql, (u_name, u_phone,imageData,u_address,u_seq))
+          curs.execute(sql, (u_name, u_phone,digest,u_address,u_seq))
         else:
           sql = """
               UPDATE user
@@ -204,17 +215,14 @@ async def update_one(
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-       conn.close()
 
 # ============================================
 # 삭제 (Delete)
 # ============================================
 # TODO: 레코드 삭제 API 구현
 # - FK 참조 시 삭제 실패할 수 있음 (에러 처리)
-@app.delete("/delete_user/{item_id}")
-async def delete_one(item_id: int):
-    conn = connect_db()
+@router.delete("/delete_user/{item_id}")
+def delete_one(item_id: int, conn = Depends(get_db)):
     try:
         
         curs = conn.cursor()
@@ -229,8 +237,6 @@ async def delete_one(item_id: int):
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-       conn.close()
 
 
 
@@ -241,15 +247,38 @@ async def delete_one(item_id: int):
 # ============================================
 # [선택] 이미지 조회 (이미지 BLOB 컬럼이 있는 경우)
 # ============================================
-@app.get("/view_user_image/{item_id}")
-async def select_one(item_id: int):
-  conn = connect_db()
+def read_user_image(conn, item_id, digest):
+  """원본 이미지 바이너리 (저장소에 없으면 아직 옮기지 않은 DB BLOB)"""
+  data = blob_store.read(digest)
+  if data is None:
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT u_image
+        FROM user
+        WHERE u_seq = %s
+    """, (item_id,))
+    row = curs.fetchone()
+    data = row[0] if row else None
+  return data
+
+
+# v: 목록 API 가 준 이미지 버전(해시 앞부분) - 맞으면 오래 캐시해도 된다
+# w: 썸네일 너비 (예: ?w=96) - 없으면 원본
+@router.get("/view_user_image/{item_id}")
+def select_one(
+  item_id: int,
+  v: Optional[str] = None,
+  w: Optional[int] = Query(None, ge=1, le=4096),
+  if_none_match: Optional[str] = Header(None),
+  accept: Optional[str] = Header(None),
+  conn = Depends(get_db)
+):
   try:
     curs = conn.cursor()
     
-    # TODO: SQL 작성
+    # BLOB 은 읽지 않고 해시만 먼저 확인
     curs.execute("""
-        SELECT u_image
+        SELECT u_image_hash
         FROM user
         WHERE u_seq = %s
     """, (item_id,))
@@ -257,18 +286,31 @@ async def select_one(item_id: int):
     row = curs.fetchone()
     if row is None:
       return {"result": "Error", "message": "Customer not found"}
-    if row[0] is None:
+    digest = row[0]
+    if digest is None:
       return {"result": "Error", "message": "No profile image"}
-    # Response 객체로 바이너리 직접 반환
-    return Response(
-      content=row[0],
-      media_type="image/jpeg",
-      headers={"Cache-Control": "no-cache, no-store, must-revalidate"}
-    )
+    variant = thumbnails.variant(w, accept)
+    # 클라이언트가 가진 이미지와 같으면 304
+    if etag_matches(if_none_match, digest, variant):
+      return not_modified(digest, v, variant)
+
+    # 썸네일 (처음 요청 때 만들어 디스크에 캐시)
+    if variant is not None:
+      data = thumbnails.get(digest, variant, lambda: read_user_image(conn, item_id, digest))
+      if data is None:
+        return {"result": "Error", "message": "No profile image"}
+      return image_response(data, digest, v, thumbnails.media_type(variant), variant)
+
+    # 저장소 파일을 그대로 전송
+    if blob_store.exists(digest):
+      return blob_store.response(digest, headers=cache_headers(digest, v))
+    # 아직 저장소로 옮기지 않은 이미지 (drain_image_blobs.py 실행 전)
+    data = read_user_image(conn, item_id, digest)
+    if data is None:
+      return {"result": "Error", "message": "No profile image"}
+    return image_response(data, digest, v)
   except Exception as error:
     return {"result": "Error", "errorMsg": str(error)}
-  finally:
-     conn.close()
 
 
 
@@ -277,18 +319,18 @@ async def select_one(item_id: int):
 # ============================================
 # TODO: 이미지만 별도로 업데이트
 # - UploadFile = File(...) 사용
-@app.post("/update_uesr_image")
-async def update_image(
+@router.post("/update_uesr_image")
+def update_image(
     item_id: int = Form(...),
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    conn = Depends(get_db)
 ):
     try:
-        image_data = await file.read()
-        
-        conn = connect_db()
+        digest = store_upload(file)
+
         curs = conn.cursor()
-        sql = "UPDATE user SET u_image=%s WHERE u_seq=%s"
-        curs.execute(sql, (image_data, item_id))
+        sql = "UPDATE user SET u_image=NULL, u_image_hash=%s WHERE u_seq=%s"
+        curs.execute(sql, (digest, item_id))
         conn.commit()
         
         
@@ -296,8 +338,6 @@ async def update_image(
     except Exception as e:
         conn.rollback()
         return {"result": "Error", "errorMsg": str(e)}
-    finally:
-       conn.close()
 
 
 # ============================================
@@ -305,6 +345,8 @@ async def update_image(
 # ============================================
 if __name__ == "__main__":
     import uvicorn
+    app = FastAPI()
+    app.include_router(router)
     print(f"🚀 [테이블명] API 서버 시작")
     print(f"   서버 주소: http://{ipAddress}:{port}")
     print(f"   Swagger UI: http://{ipAddress}:{port}/docs")
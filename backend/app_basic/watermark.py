@@ -0,0 +1,69 @@
+"""
+집계 작업 워터마크 (RollupWatermark, migrations/006_login_rollup.sql)
+
+AUTO_INCREMENT id 는 INSERT 할 때 정해지지만 다른 연결에는 커밋해야 보인다.
+그래서 id 10 이 아직 커밋 전인데 11 이 먼저 보이면, 워터마크를 11 로 옮기는 순간 10 은 영영 집계되지 않는다.
+next_upto() 는 워터마크 다음 id 들이 빈틈 없이 이어지는 곳까지만 집계 대상으로 삼는다.
+- 읽은 묶음 안의 빈틈(아직 안 보이는 id)마다 처음 본 시각을 기억하고, 아직 lag 가 안 된 첫 빈틈에서 멈춘다
+- 빈틈이 lag 초 넘게 그대로면 롤백 / 삭제 / AUTO_INCREMENT 건너뜀으로 보고 넘어간다
+  묶음 안의 빈틈은 한꺼번에 기억하므로 롤백이 여러 번 몰려도 lag 한 번만 기다린다
+  (긴 트랜잭션이 lag 보다 늦게 커밋하면 여전히 빠질 수 있다 -> 정합성 확인 작업이 다시 센다)
+
+주의: 빈틈을 처음 본 시각은 프로세스(워커)마다 따로 기억한다 (--workers 로 여러 개 띄운 경우).
+워터마크는 워커 사이에 FOR UPDATE 로 한 번에 하나씩만 옮기므로 같은 행을 두 번 세지는 않고,
+빈틈을 늦게 본 워커는 자기가 본 때부터 lag 를 다시 기다린다 (넘어가는 게 조금 늦어질 뿐).
+"""
+
+import time
+
+
+WATERMARK_CONFIG = {
+    'lag': 30,   # 빈틈을 기다리는 최대 시간 (초)
+}
+
+# (워터마크 이름, 빈틈 id) -> 처음 본 시각 (프로세스마다 따로)
+_gaps = {}
+
+
+def lock_watermark(curs, conn, name):
+    """워터마크 행을 잠그고 last_id 반환 (트랜잭션이 끝날 때까지 같은 작업은 기다린다)"""
+    curs.execute("SELECT last_id FROM RollupWatermark WHERE name = %s FOR UPDATE", (name,))
+    row = curs.fetchone()
+    if row is None:
+        conn.rollback()
+        raise RuntimeError(f"RollupWatermark('{name}') 가 없습니다 (database/migrations 적용 필요)")
+    return row[0]
+
+
+def next_upto(curs, name, table, last_id, batch, lag=None, now=None):
+    """
+    last_id 다음 id 를 batch 개까지 읽어 빈틈 없이 이어지는 마지막 id 를 구한다
+
+    Returns:
+        (upto, 행 수) - 집계할 행이 없으면 (last_id, 0)
+    """
+    lag = WATERMARK_CONFIG['lag'] if lag is None else lag
+    now = time.time() if now is None else now
+    curs.execute(f"SELECT id FROM {table} WHERE id > %s ORDER BY id LIMIT %s", (last_id, batch))
+    ids = [row[0] for row in curs.fetchall()]
+
+    # 묶음 안의 빈틈을 모두 기억한다 (앞 빈틈을 넘어간 뒤 다음 빈틈을 그때 처음 보면 lag 를 또 기다리게 된다)
+    previous = last_id
+    for row_id in ids:
+        if row_id != previous + 1:
+            _gaps.setdefault((name, previous + 1), now)
+        previous = row_id
+
+    upto, count = last_id, 0
+    for row_id in ids:
+        if row_id != upto + 1:
+            # upto + 1 ~ row_id - 1 이 아직 안 보인다
+            if now - _gaps[(name, upto + 1)] < lag:
+                break
+            del _gaps[(name, upto + 1)]
+        upto, count = row_id, count + 1
+
+    # 지나간 빈틈 기록 정리
+    for key in [key for key in _gaps if key[0] == name and key[1] <= upto]:
+        del _gaps[key]
+    return upto, count
@@ -0,0 +1,75 @@
+"""
+동시 요청 처리량 벤치마크
+실행: python benchmark/bench_concurrency.py --url http://127.0.0.1:8000/select_products
+
+느린 요청(slow_url)을 계속 보내는 동안 일반 요청(url)의 처리량/지연 시간을 측정한다.
+핸들러가 이벤트 루프를 막으면(async def + pymysql) 일반 요청 지연이 느린 요청만큼 늘어나고,
+스레드풀에서 실행되면(def) 서로 영향을 받지 않는다.
+
+변경 전/후 커밋에서 각각 서버를 띄우고 같은 옵션으로 실행해 비교한다.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+async def worker(client, url, deadline, latencies, errors):
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        try:
+            res = await client.get(url)
+            if res.status_code != 200:
+                errors.append(res.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.monotonic() - start)
+
+
+async def run(args):
+    latencies, errors = [], []
+    slow_latencies, slow_errors = [], []
+    limits = httpx.Limits(max_connections=args.concurrency + args.slow_concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        deadline = time.monotonic() + args.duration
+        tasks = [worker(client, args.url, deadline, latencies, errors)
+                 for _ in range(args.concurrency)]
+        if args.slow_url:
+            tasks += [worker(client, args.slow_url, deadline, slow_latencies, slow_errors)
+                      for _ in range(args.slow_concurrency)]
+        start = time.monotonic()
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - start
+
+    print(f"url          : {args.url}")
+    print(f"concurrency  : {args.concurrency}  duration: {elapsed:.1f}s")
+    print(f"requests     : {len(latencies)}  errors: {len(errors)}")
+    print(f"throughput   : {len(latencies) / elapsed:.1f} req/s")
+    print(f"latency p50  : {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"latency p99  : {percentile(latencies, 99) * 1000:.1f} ms")
+    if args.slow_url:
+        print(f"slow url     : {args.slow_url}  x{args.slow_concurrency}")
+        print(f"slow requests: {len(slow_latencies)}  errors: {len(slow_errors)}")
+        print(f"slow p50     : {percentile(slow_latencies, 50) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="동시 요청 처리량 벤치마크")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/select_product/1")
+    parser.add_argument("--slow-url", default="http://127.0.0.1:8000/select_products",
+                        help="동시에 계속 호출할 무거운 요청 (빈 문자열이면 사용 안 함)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--slow-concurrency", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(run(parser.parse_args()))
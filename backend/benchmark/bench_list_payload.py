@@ -0,0 +1,118 @@
+"""
+목록 API 응답 크기 / 지연 시간 벤치마크
+실행: python benchmark/bench_list_payload.py --seed 10000 --endpoint /select_users
+
+--seed N 이면 프로필 이미지가 있는 테스트 사용자(u_id 'bench_...')를 N명 넣는다.
+next_cursor 를 따라 목록 전체를 끝까지 조회하면서
+페이지별 지연 시간과 응답 바이트 수를 측정한다.
+
+변경 전(SELECT * + base64 이미지) / 후(스칼라 컬럼 + 이미지 URL) 커밋에서 각각 서버를 띄우고
+같은 옵션으로 실행해 비교한다. 테스트 데이터는 --cleanup 으로 지운다.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app_basic"))
+
+from database.connection import connect_db  # noqa: E402
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def seed_users(count, image_kb):
+    conn = connect_db()
+    try:
+        curs = conn.cursor()
+        rows = [
+            (f"bench_{i}", "bench", f"bench user {i}", "010-0000-0000",
+             os.urandom(image_kb * 1024), "bench address")
+            for i in range(count)
+        ]
+        for start in range(0, count, 500):
+            curs.executemany("""
+                INSERT INTO user (u_id, u_password, u_name, u_phone, u_image, u_address, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s, NOW())
+            """, rows[start:start + 500])
+            conn.commit()
+        print(f"seeded       : {count} users (image {image_kb} KB)")
+    finally:
+        conn.close()
+
+
+def cleanup_users():
+    conn = connect_db()
+    try:
+        curs = conn.cursor()
+        curs.execute("DELETE FROM user WHERE u_id LIKE %s", ("bench\\_%",))
+        conn.commit()
+        print(f"cleanup      : {curs.rowcount} users deleted")
+    finally:
+        conn.close()
+
+
+def walk(client, url, limit):
+    """목록 전체를 끝까지 조회 -> (페이지 지연 시간 목록, 총 바이트, 총 건수)"""
+    latencies, total_bytes, total_rows = [], 0, 0
+    after = None
+    while True:
+        params = {"limit": limit}
+        if after is not None:
+            params["after"] = after
+        start = time.monotonic()
+        res = client.get(url, params=params)
+        latencies.append(time.monotonic() - start)
+        total_bytes += len(res.content)
+        body = res.json()
+        if "results" not in body:
+            raise RuntimeError(body)
+        total_rows += len(body["results"])
+        after = body.get("next_cursor")
+        if after is None:
+            return latencies, total_bytes, total_rows
+
+
+def run(args):
+    if args.seed:
+        seed_users(args.seed, args.image_kb)
+
+    url = args.base_url + args.endpoint
+    with httpx.Client(timeout=args.timeout) as client:
+        for n in range(1, args.rounds + 1):
+            start = time.monotonic()
+            latencies, total_bytes, total_rows = walk(client, url, args.limit)
+            elapsed = time.monotonic() - start
+            print(f"[round {n}] {url}")
+            print(f"  rows         : {total_rows}  pages: {len(latencies)}")
+            print(f"  payload      : {total_bytes / 1024 / 1024:.2f} MB "
+                  f"({total_bytes / max(total_rows, 1):.0f} B/row)")
+            print(f"  total time   : {elapsed:.2f}s")
+            print(f"  page p50     : {percentile(latencies, 50) * 1000:.1f} ms")
+            print(f"  page p99     : {percentile(latencies, 99) * 1000:.1f} ms")
+
+    if args.cleanup:
+        cleanup_users()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="목록 API 응답 크기 / 지연 시간 벤치마크")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", default="/select_users",
+                        help="/select_users 또는 /select_staffs")
+    parser.add_argument("--limit", type=int, default=500, help="페이지 크기")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0, help="테스트 사용자 수 (0이면 넣지 않음)")
+    parser.add_argument("--image-kb", type=int, default=50, help="테스트 프로필 이미지 크기(KB)")
+    parser.add_argument("--cleanup", action="store_true", help="끝나고 테스트 사용자 삭제")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    run(parser.parse_args())
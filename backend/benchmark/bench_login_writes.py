@@ -0,0 +1,104 @@
+"""
+로그인 이력 저장 처리량 벤치마크
+실행: python benchmark/bench_login_writes.py --url http://127.0.0.1:8000 --concurrency 50 --duration 10
+
+동시 클라이언트 --concurrency 개가 --duration 초 동안 /insert_login_history 를 계속 호출하면서
+초당 처리 건수(logins/sec)와 지연 시간(p50/p99)을 측정한다.
+요청마다 바로 INSERT + 커밋하면 DB 왕복 시간이 그대로 응답 시간이 되고,
+지연 저장(write-behind)이면 큐에 넣고 바로 응답한다.
+
+변경 전/후 커밋에서 각각 서버를 띄우고 같은 옵션으로 실행해 비교한다.
+테스트 이력(lAddress 'bench')은 --cleanup 으로 지운다.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app_basic"))
+
+from database.connection import connect_db  # noqa: E402
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def cleanup():
+    conn = connect_db()
+    try:
+        curs = conn.cursor()
+        curs.execute("DELETE FROM LoginHistory WHERE lAddress = %s", ("bench",))
+        conn.commit()
+        print(f"cleanup      : {curs.rowcount} rows deleted")
+    finally:
+        conn.close()
+
+
+async def worker(client, url, cid, deadline, latencies, outcomes):
+    form = {
+        "cid": str(cid),
+        "loginTime": "",
+        "lStatus": "bench",
+        "lVersion": "1.0",
+        "lAddress": "bench",
+        "lPaymentMethod": "bench",
+    }
+    while time.monotonic() < deadline:
+        form["loginTime"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        start = time.monotonic()
+        try:
+            res = await client.post(url, data=form)
+            body = res.json()
+            if body.get("result") != "OK":
+                outcomes["error"] += 1
+            elif body.get("queued"):
+                outcomes["queued"] += 1
+            else:
+                outcomes["direct"] += 1
+        except httpx.HTTPError:
+            outcomes["error"] += 1
+        latencies.append(time.monotonic() - start)
+
+
+async def run(args):
+    url = f"{args.url}/insert_login_history"
+    latencies = []
+    outcomes = {"queued": 0, "direct": 0, "error": 0}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(*[
+            worker(client, url, args.cid, deadline, latencies, outcomes)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.monotonic() - start
+
+    print(f"url          : {url}")
+    print(f"concurrency  : {args.concurrency}  duration: {elapsed:.1f}s")
+    print(f"requests     : {len(latencies)}  ({len(latencies) / elapsed:.0f} logins/sec)")
+    print(f"outcomes     : queued {outcomes['queued']}  direct {outcomes['direct']}  error {outcomes['error']}")
+    print(f"latency p50  : {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"latency p99  : {percentile(latencies, 99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로그인 이력 저장 처리량 벤치마크")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--cid", type=int, default=1, help="이력을 남길 고객 id (Customer.id)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--cleanup", action="store_true", help="측정 후 테스트 이력 삭제")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+    if args.cleanup:
+        cleanup()
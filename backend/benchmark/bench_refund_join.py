@@ -0,0 +1,112 @@
+"""
+반품 목록 join 비용 회귀 벤치마크
+실행: python benchmark/bench_refund_join.py --url http://127.0.0.1:8000
+
+반품 목록 쿼리가 반품 건수에 비례하는 행만 읽는지 확인한다.
+- old: 사용자 기준 join (p.u_seq = u.u_seq) - 반품 x 그 사용자의 주문 항목 수만큼 행이 늘어난다
+- new: 반품한 주문 항목 기준 join (p.b_seq = r.pic_seq) - 반품 한 건당 한 행
+
+join 별로 결과 행 수, 읽은 행 수(Handler_read_*), 실행 시간을 비교하고
+--url 을 주면 /select_refunds 를 끝까지 넘기며 페이지 지연 시간도 잰다.
+new join 의 결과 행 수가 반품 건수와 다르면 종료 코드 1 (회귀).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app_basic"))
+
+from database.connection import connect_db  # noqa: E402
+
+
+JOINS = {
+    "old": "p.u_seq = u.u_seq",
+    "new": "p.b_seq = r.pic_seq",
+}
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def handler_reads(curs):
+    curs.execute("SHOW SESSION STATUS LIKE 'Handler_read%'")
+    return sum(int(value) for _, value in curs.fetchall())
+
+
+def measure_join(curs, condition):
+    """join 결과 행 수 / 읽은 행 수 / 실행 시간(초)"""
+    before = handler_reads(curs)
+    start = time.monotonic()
+    curs.execute(f"""
+        SELECT COUNT(*)
+        FROM refund as r
+        inner join user as u
+        on r.u_seq = u.u_seq
+        inner join purchase_item as p
+        on {condition}
+    """)
+    rows = curs.fetchone()[0]
+    elapsed = time.monotonic() - start
+    return rows, handler_reads(curs) - before, elapsed
+
+
+def walk(url, limit):
+    """/select_refunds 전체 -> (페이지 지연 시간 목록, 총 건수)"""
+    latencies, total = [], 0
+    after = None
+    with httpx.Client(timeout=60.0) as client:
+        while True:
+            params = {"limit": limit}
+            if after is not None:
+                params["after"] = after
+            start = time.monotonic()
+            body = client.get(f"{url}/select_refunds", params=params).json()
+            latencies.append(time.monotonic() - start)
+            if "results" not in body:
+                raise RuntimeError(body)
+            total += len(body["results"])
+            after = body.get("next_cursor")
+            if after is None:
+                return latencies, total
+
+
+def main(args):
+    conn = connect_db()
+    try:
+        curs = conn.cursor()
+        curs.execute("SELECT COUNT(*) FROM refund")
+        refunds = curs.fetchone()[0]
+        print(f"refunds      : {refunds}")
+        results = {}
+        for name, condition in JOINS.items():
+            rows, reads, elapsed = measure_join(curs, condition)
+            results[name] = rows
+            per_refund = reads / refunds if refunds else 0.0
+            print(f"{name:<4} join     : rows {rows}  handler reads {reads} ({per_refund:.1f}/refund)  {elapsed * 1000:.1f} ms")
+    finally:
+        conn.close()
+
+    if args.url:
+        latencies, total = walk(args.url, args.limit)
+        print(f"/select_refunds: {total} rows in {len(latencies)} pages  "
+              f"p50 {percentile(latencies, 50) * 1000:.0f} ms  p99 {percentile(latencies, 99) * 1000:.0f} ms")
+
+    if results["new"] != refunds:
+        print(f"REGRESSION   : new join returned {results['new']} rows for {refunds} refunds")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="반품 목록 join 비용 회귀 벤치마크")
+    parser.add_argument("--url", default=None, help="서버 주소 (주면 /select_refunds 전체 조회 시간도 잰다)")
+    parser.add_argument("--limit", type=int, default=50)
+    main(parser.parse_args())
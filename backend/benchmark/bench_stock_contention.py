@@ -0,0 +1,128 @@
+"""
+재고 동시 차감 벤치마크 (oversell 확인)
+실행: python benchmark/bench_stock_contention.py --p-seq 1 --stock 50 --buyers 200
+
+상품(--p-seq)의 재고를 --stock 으로 맞춘 뒤 구매자 --buyers 명이 동시에 1개씩 산다.
+- reserve: /reserve_stock (조건부 차감, 한 트랜잭션)
+- rmw: /select_product 로 재고를 읽고 1 뺀 값을 /update_product 로 덮어쓰는 기존 방식
+
+성공한 구매 수와 DB 의 최종 재고를 비교해 oversell(재고보다 많이 팔린 수)을 출력한다.
+reserve 는 성공 수 = 시작 재고 - 최종 재고 이고 재고가 0 아래로 내려가지 않아야 한다.
+끝나면 재고를 원래 값으로 되돌린다.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app_basic"))
+
+from database.connection import connect_db  # noqa: E402
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def get_stock(p_seq):
+    conn = connect_db()
+    try:
+        curs = conn.cursor()
+        curs.execute("SELECT p_stock FROM product WHERE p_seq = %s", (p_seq,))
+        row = curs.fetchone()
+        if row is None:
+            raise SystemExit(f"product p_seq={p_seq} 가 없습니다")
+        return row[0]
+    finally:
+        conn.close()
+
+
+def set_stock(p_seq, value):
+    conn = connect_db()
+    try:
+        curs = conn.cursor()
+        curs.execute("UPDATE product SET p_stock = %s WHERE p_seq = %s", (value, p_seq))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+async def buy_reserve(client, base_url, p_seq):
+    res = await client.post(f"{base_url}/reserve_stock",
+                            json={"items": [{"p_seq": p_seq, "quantity": 1}]})
+    return res.json().get("result") == "OK"
+
+
+async def buy_rmw(client, base_url, p_seq):
+    res = await client.get(f"{base_url}/select_product/{p_seq}")
+    product = res.json()["result"]
+    if product["p_stock"] < 1:
+        return False
+    form = {
+        "item_id": p_seq,
+        "p_stock": product["p_stock"] - 1,
+        **{key: product[key] for key in (
+            "kc_seq", "cc_seq", "sc_seq", "gc_seq", "m_seq",
+            "p_name", "p_price", "p_image", "p_description")},
+    }
+    form["p_image"] = form["p_image"] or ""
+    form["p_description"] = form["p_description"] or ""
+    res = await client.post(f"{base_url}/update_product", data=form)
+    return res.json().get("result") == "OK"
+
+
+async def run(args):
+    original = get_stock(args.p_seq)
+    set_stock(args.p_seq, args.stock)
+    buy = buy_reserve if args.mode == "reserve" else buy_rmw
+
+    latencies, results = [], []
+
+    async def buyer(client):
+        start = time.monotonic()
+        try:
+            results.append(await buy(client, args.url, args.p_seq))
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            results.append(False)
+            print(f"error        : {type(e).__name__}: {e}")
+        latencies.append(time.monotonic() - start)
+
+    try:
+        limits = httpx.Limits(max_connections=args.buyers)
+        async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+            start = time.monotonic()
+            await asyncio.gather(*[buyer(client) for _ in range(args.buyers)])
+            elapsed = time.monotonic() - start
+        final = get_stock(args.p_seq)
+    finally:
+        set_stock(args.p_seq, original)
+
+    sold = sum(results)
+    decremented = args.stock - final
+    print(f"mode         : {args.mode}")
+    print(f"buyers       : {args.buyers}  stock: {args.stock}")
+    print(f"elapsed      : {elapsed:.2f}s")
+    print(f"latency p50  : {percentile(latencies, 50) * 1000:.0f} ms")
+    print(f"latency p99  : {percentile(latencies, 99) * 1000:.0f} ms")
+    print(f"sold (OK)    : {sold}")
+    print(f"final stock  : {final}  (decremented {decremented})")
+    print(f"oversell     : {max(0, sold - args.stock)}  lost updates: {max(0, sold - decremented)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="재고 동시 차감 벤치마크")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--p-seq", type=int, default=1, help="대상 상품 p_seq")
+    parser.add_argument("--stock", type=int, default=50, help="시작 재고")
+    parser.add_argument("--buyers", type=int, default=200, help="동시 구매자 수 (1개씩 구매)")
+    parser.add_argument("--mode", choices=("reserve", "rmw"), default="reserve")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    asyncio.run(run(parser.parse_args()))
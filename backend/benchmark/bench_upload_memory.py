@@ -0,0 +1,93 @@
+"""
+동시 이미지 업로드 메모리 벤치마크
+실행: python benchmark/bench_upload_memory.py --pid <서버 PID> --item-id 1
+
+크기가 큰 이미지(기본 10 MB)를 동시에(기본 50개) /update_uesr_image 로 올리면서
+서버 프로세스의 RSS(/proc/<pid>/status 의 VmRSS, Linux)를 주기적으로 기록한다.
+업로드를 메모리로 한 번에 읽으면 동시 업로드 수 x 파일 크기만큼 RSS 가 늘고,
+조각 단위로 임시 파일에 쓰면 거의 늘지 않는다.
+
+변경 전/후 커밋에서 각각 서버를 띄우고 같은 옵션으로 실행해 비교한다.
+(업로드한 이미지는 --item-id 사용자의 프로필 이미지로 저장된다)
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def sample_rss(pid, interval, samples, stop):
+    while not stop.is_set():
+        samples.append(rss_mb(pid))
+        await asyncio.sleep(interval)
+
+
+async def upload(client, url, item_id, payload, results):
+    start = time.monotonic()
+    try:
+        res = await client.post(url, data={"item_id": str(item_id)},
+                                files={"file": ("bench.jpg", payload, "image/jpeg")})
+        body = res.json()
+        ok = res.status_code == 200 and body.get("result") == "OK"
+        results.append((ok, time.monotonic() - start, res.status_code if ok else body))
+    except httpx.HTTPError as e:
+        results.append((False, time.monotonic() - start, type(e).__name__))
+
+
+async def run(args):
+    # JPEG 시그니처 + 임의 바이트 (업로드마다 내용을 달리해 저장소 중복 제거를 피한다)
+    size = args.size_mb * 1024 * 1024
+    payloads = [b"\xff\xd8\xff\xe0" + os.urandom(size - 4) for _ in range(args.concurrency)]
+
+    baseline = rss_mb(args.pid)
+    samples, stop = [], asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(args.pid, 0.05, samples, stop))
+
+    results = []
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        start = time.monotonic()
+        await asyncio.gather(*[
+            upload(client, args.url, args.item_id, payload, results) for payload in payloads
+        ])
+        elapsed = time.monotonic() - start
+    await asyncio.sleep(0.5)
+    stop.set()
+    await sampler
+
+    ok = [r for r in results if r[0]]
+    failed = [r for r in results if not r[0]]
+    peak = max(samples) if samples else baseline
+    print(f"url          : {args.url}")
+    print(f"uploads      : {len(results)} x {args.size_mb} MB  ok: {len(ok)}  failed: {len(failed)}")
+    print(f"elapsed      : {elapsed:.1f}s  ({len(results) * args.size_mb / elapsed:.1f} MB/s)")
+    if ok:
+        latencies = sorted(r[1] for r in ok)
+        print(f"latency p50  : {latencies[len(latencies) // 2] * 1000:.0f} ms")
+        print(f"latency max  : {latencies[-1] * 1000:.0f} ms")
+    print(f"RSS baseline : {baseline:.1f} MB")
+    print(f"RSS peak     : {peak:.1f} MB  (+{peak - baseline:.1f} MB)")
+    if failed:
+        print(f"first error  : {failed[0][2]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="동시 이미지 업로드 메모리 벤치마크")
+    parser.add_argument("--pid", type=int, required=True, help="서버(uvicorn) 프로세스 PID")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/update_uesr_image")
+    parser.add_argument("--item-id", type=int, default=1, help="이미지를 올릴 사용자 u_seq")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--size-mb", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(run(parser.parse_args()))
@@ -27,6 +27,12 @@ USE shoes_store_db;
 -- ============================================
 SET FOREIGN_KEY_CHECKS = 0;
 
+DROP TABLE IF EXISTS SalesDaily;
+DROP TABLE IF EXISTS LoginDailyActive;
+DROP TABLE IF EXISTS LoginActiveDay;
+DROP TABLE IF EXISTS LoginDailyRollup;
+DROP TABLE IF EXISTS RollupWatermark;
+DROP TABLE IF EXISTS LoginHistoryArchive;
 DROP TABLE IF EXISTS LoginHistory;
 DROP TABLE IF EXISTS PurchaseItem;
 DROP TABLE IF EXISTS Purchase;
@@ -97,6 +103,7 @@ CREATE TABLE Customer (
     cName VARCHAR(255) NOT NULL,
     cPassword VARCHAR(255) NOT NULL,
     cProfileImage MEDIUMBLOB NULL,
+    cProfileImageHash CHAR(64) NULL,
     UNIQUE INDEX idx_customer_email (cEmail),
     UNIQUE INDEX idx_customer_phone (cPhoneNumber)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -110,6 +117,7 @@ CREATE TABLE Employee (
     ePassword VARCHAR(255) NOT NULL,
     eRole VARCHAR(100),
     eProfileImage MEDIUMBLOB NULL,
+    eProfileImageHash CHAR(64) NULL,
     UNIQUE INDEX idx_employee_email (eEmail),
     UNIQUE INDEX idx_employee_phone (ePhoneNumber),
     INDEX idx_employee_role (eRole)
@@ -122,8 +130,11 @@ CREATE TABLE Purchase (
     pickupDate VARCHAR(50),
     orderCode VARCHAR(100) NOT NULL,
     timeStamp VARCHAR(50),
+    brid INT NULL,
     FOREIGN KEY (cid) REFERENCES Customer(id) ON DELETE CASCADE,
     INDEX idx_purchase_cid (cid),
+    INDEX idx_purchase_brid (brid),
+    INDEX idx_purchase_time_stamp (timeStamp),
     UNIQUE INDEX idx_purchase_order_code (orderCode)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -134,6 +145,7 @@ CREATE TABLE PurchaseItem (
     pcid INT NOT NULL,
     pcQuantity INT NOT NULL,
     pcStatus VARCHAR(100) NOT NULL,
+    pcPrice INT NULL,
     FOREIGN KEY (pid) REFERENCES Product(id) ON DELETE CASCADE,
     FOREIGN KEY (pcid) REFERENCES Purchase(id) ON DELETE CASCADE,
     INDEX idx_purchase_item_pcid (pcid),
@@ -145,15 +157,72 @@ CREATE TABLE PurchaseItem (
 CREATE TABLE LoginHistory (
     id INT AUTO_INCREMENT PRIMARY KEY,
     cid INT NOT NULL,
-    loginTime VARCHAR(50),
+    loginTime DATETIME NULL,
     lStatus VARCHAR(50),
     lVersion DECIMAL(5,2),
     lAddress VARCHAR(255),
     lPaymentMethod VARCHAR(100),
     FOREIGN KEY (cid) REFERENCES Customer(id) ON DELETE CASCADE,
-    INDEX idx_login_history_cid (cid)
+    INDEX idx_login_history_cid_time (cid, loginTime),
+    INDEX idx_login_history_time (loginTime)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- LoginHistoryArchive (보관 기간이 지난 로그인 이력, login_retention.py --archive)
+CREATE TABLE LoginHistoryArchive LIKE LoginHistory;
+
+-- RollupWatermark (집계 작업별 마지막 처리 id, login_rollup.py / sales_rollup.py)
+CREATE TABLE RollupWatermark (
+    name VARCHAR(50) PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO RollupWatermark (name) VALUES ('login_daily');
+
+-- LoginDailyRollup (일 x 앱 버전 x 상태별 로그인 수)
+CREATE TABLE LoginDailyRollup (
+    day DATE NOT NULL,
+    lVersion DECIMAL(5,2) NOT NULL DEFAULT 0,
+    lStatus VARCHAR(50) NOT NULL DEFAULT '',
+    logins INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, lVersion, lStatus)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- LoginActiveDay (일 x 그날 로그인한 고객)
+CREATE TABLE LoginActiveDay (
+    day DATE NOT NULL,
+    cid INT NOT NULL,
+    PRIMARY KEY (day, cid)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- LoginDailyActive (일별 DAU / WAU / MAU)
+CREATE TABLE LoginDailyActive (
+    day DATE PRIMARY KEY,
+    dau INT NOT NULL DEFAULT 0,
+    wau INT NOT NULL DEFAULT 0,
+    mau INT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- SalesDaily (일 x 매장 x 상품별 판매 수량 / 매출, sales_rollup.py)
+CREATE TABLE SalesDaily (
+    day DATE NOT NULL,
+    brid INT NOT NULL DEFAULT 0,
+    pid INT NOT NULL,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, brid, pid),
+    INDEX idx_sales_daily_brid (brid, day),
+    INDEX idx_sales_daily_pid (pid, day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO RollupWatermark (name) VALUES ('sales_daily');
+
+-- Purchase.brid -> branch(br_seq) (픽업 매장)
+-- branch 는 앱(gt) 테이블이라 이 스크립트에서 만들지 않는다 -> 외래키 확인을 끄고 추가한다
+SET FOREIGN_KEY_CHECKS = 0;
+ALTER TABLE Purchase ADD FOREIGN KEY (brid) REFERENCES branch(br_seq) ON DELETE SET NULL;
+SET FOREIGN_KEY_CHECKS = 1;
+
 -- ============================================
 -- 3단계: 더미 데이터 삽입
 -- ============================================
@@ -0,0 +1,15 @@
+-- ============================================
+-- 001: 프로필 이미지 해시 컬럼 추가
+-- ============================================
+-- user / staff 프로필 이미지의 SHA-256(hex) 을 업로드 시 같이 저장한다.
+-- /view_user_image, /view_staff_image 는 이 값을 ETag 로 쓰고
+-- If-None-Match 가 같으면 BLOB 을 읽지 않고 304 를 반환한다.
+--
+-- 실행: mysql -u <user> -p shoes_shop_db < backend/database/migrations/001_image_hash.sql
+
+ALTER TABLE user ADD COLUMN u_image_hash CHAR(64) NULL AFTER u_image;
+ALTER TABLE staff ADD COLUMN s_image_hash CHAR(64) NULL AFTER s_image;
+
+-- 기존 이미지 해시 채우기 (hashlib.sha256(data).hexdigest() 와 같은 값)
+UPDATE user SET u_image_hash = SHA2(u_image, 256) WHERE u_image IS NOT NULL;
+UPDATE staff SET s_image_hash = SHA2(s_image, 256) WHERE s_image IS NOT NULL;
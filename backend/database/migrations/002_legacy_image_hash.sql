@@ -0,0 +1,12 @@
+-- ============================================
+-- 002: Customer / Employee 프로필 이미지 해시 컬럼 추가
+-- ============================================
+-- 프로필 이미지를 이미지 저장소(app_basic/blob_store.py)로 옮긴 뒤
+-- DB에는 SHA-256(hex) 해시만 남긴다. (user / staff 는 001 에서 추가)
+-- 이 테이블이 없는 DB 에서는 실행하지 않는다.
+--
+-- 실행: mysql -u <user> -p shoes_store_db < backend/database/migrations/002_legacy_image_hash.sql
+-- 이후: cd backend/app_basic && python drain_image_blobs.py
+
+ALTER TABLE Customer ADD COLUMN cProfileImageHash CHAR(64) NULL AFTER cProfileImage;
+ALTER TABLE Employee ADD COLUMN eProfileImageHash CHAR(64) NULL AFTER eProfileImage;
@@ -0,0 +1,12 @@
+-- ============================================
+-- 003: 반품 조회 인덱스
+-- ============================================
+-- /select_refunds 는 반품한 주문 항목과 r.pic_seq = p.b_seq 로 join 하고
+-- 반품일(ref_date) 범위 + ref_seq 내림차순 keyset 으로 페이지를 나눈다.
+-- - idx_refund_ref_date: from / to 범위 필터 (InnoDB 보조 인덱스에는 PK(ref_seq)가 포함된다)
+-- - idx_refund_pic_seq: 주문 항목 -> 반품 조회 (purchase_item.b_seq 는 PK 라 따로 만들지 않는다)
+--
+-- 실행: mysql -u <user> -p shoes_shop_db < backend/database/migrations/003_refund_indexes.sql
+
+CREATE INDEX idx_refund_ref_date ON refund (ref_date);
+CREATE INDEX idx_refund_pic_seq ON refund (pic_seq);
@@ -0,0 +1,19 @@
+-- ============================================
+-- 004: 매장별 재고
+-- ============================================
+-- product(사이즈별 상품) x branch(매장) 재고 수량.
+-- PK 가 (p_seq, br_seq) 라 "이 상품이 재고로 있는 매장" 조회는 PK 범위 읽기 한 번으로 끝난다.
+-- 매장별 재고 목록(/select_branch_stock)은 (br_seq, p_seq) 인덱스를 쓴다.
+--
+-- 실행: mysql -u <user> -p shoes_shop_db < backend/database/migrations/004_branch_stock.sql
+
+CREATE TABLE branch_stock (
+    p_seq INT NOT NULL,
+    br_seq INT NOT NULL,
+    bs_stock INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (p_seq, br_seq),
+    INDEX idx_branch_stock_br_seq (br_seq, p_seq),
+    FOREIGN KEY (p_seq) REFERENCES product(p_seq) ON DELETE CASCADE,
+    FOREIGN KEY (br_seq) REFERENCES branch(br_seq) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,34 @@
+-- ============================================
+-- 005: LoginHistory.loginTime VARCHAR(50) -> DATETIME
+-- ============================================
+-- 문자열 비교/전체 스캔 대신 시간 범위 조회가 인덱스를 쓰도록 한다.
+-- - idx_login_history_cid_time (cid, loginTime): 고객별 기간 조회 (cid FK 인덱스도 겸한다)
+-- - idx_login_history_time (loginTime): 전체 기간 조회 (오늘 실패한 로그인 등), 보관 기간 정리
+-- - LoginHistoryArchive: 보관 기간이 지난 이력을 옮겨 두는 테이블 (login_retention.py --archive)
+--
+-- 기존 값은 'YYYY-MM-DD HH:MM[:SS]' (더미 데이터) 또는 ISO-8601 'YYYY-MM-DDTHH:MM:SS.ffffff' (앱).
+-- 앞 19자리만 읽어 변환하고, 형식이 다른 값은 NULL 이 된다.
+-- 변환 전에 확인:
+--   SELECT id, loginTime FROM LoginHistory
+--   WHERE loginTime IS NOT NULL
+--     AND loginTime NOT REGEXP '^[0-9]{4}-[0-9]{2}-[0-9]{2}[ T][0-9]{2}:[0-9]{2}';
+--
+-- 실행: mysql -u <user> -p shoes_shop_db < backend/database/migrations/005_login_history_datetime.sql
+
+ALTER TABLE LoginHistory ADD COLUMN loginAt DATETIME NULL AFTER loginTime;
+
+UPDATE LoginHistory
+SET loginAt = CAST(REPLACE(LEFT(loginTime, 19), 'T', ' ') AS DATETIME)
+WHERE loginTime REGEXP '^[0-9]{4}-[0-9]{2}-[0-9]{2}[ T][0-9]{2}:[0-9]{2}';
+
+ALTER TABLE LoginHistory DROP COLUMN loginTime;
+ALTER TABLE LoginHistory RENAME COLUMN loginAt TO loginTime;
+
+ALTER TABLE LoginHistory
+    ADD INDEX idx_login_history_cid_time (cid, loginTime),
+    ADD INDEX idx_login_history_time (loginTime);
+
+-- (cid, loginTime) 가 cid FK 인덱스를 대신한다
+ALTER TABLE LoginHistory DROP INDEX idx_login_history_cid;
+
+CREATE TABLE LoginHistoryArchive LIKE LoginHistory;
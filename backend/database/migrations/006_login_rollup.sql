@@ -0,0 +1,40 @@
+-- ============================================
+-- 006: 로그인 일별 집계 (login_rollup.py)
+-- ============================================
+-- 집계 작업이 LoginHistory 에서 마지막으로 처리한 id(워터마크) 이후 행만 읽어 아래 테이블을 갱신한다.
+-- - RollupWatermark: 집계 작업별 마지막 처리 id (007 매출 집계도 같이 쓴다)
+-- - LoginDailyRollup: 일 x 앱 버전 x 상태별 로그인 수
+-- - LoginActiveDay: 일 x 고객 (그날 로그인한 고객, DAU/WAU/MAU 계산용)
+-- - LoginDailyActive: 일별 DAU / WAU(7일) / MAU(30일)
+-- 보관 기간 정리(login_retention.py)로 원본 이력을 지워도 집계는 남는다.
+--
+-- 실행: mysql -u <user> -p shoes_shop_db < backend/database/migrations/006_login_rollup.sql
+
+CREATE TABLE RollupWatermark (
+    name VARCHAR(50) PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO RollupWatermark (name) VALUES ('login_daily');
+
+CREATE TABLE LoginDailyRollup (
+    day DATE NOT NULL,
+    lVersion DECIMAL(5,2) NOT NULL DEFAULT 0,
+    lStatus VARCHAR(50) NOT NULL DEFAULT '',
+    logins INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, lVersion, lStatus)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE LoginActiveDay (
+    day DATE NOT NULL,
+    cid INT NOT NULL,
+    PRIMARY KEY (day, cid)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE LoginDailyActive (
+    day DATE PRIMARY KEY,
+    dau INT NOT NULL DEFAULT 0,
+    wau INT NOT NULL DEFAULT 0,
+    mau INT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
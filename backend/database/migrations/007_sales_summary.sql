@@ -0,0 +1,33 @@
+-- ============================================
+-- 007: 일별 매출 집계 (sales_rollup.py)
+-- ============================================
+-- 매출 조회(/sales_summary)가 Purchase / PurchaseItem / Product 를 매번 join 하지 않도록
+-- 일 x 매장 x 상품 단위로 수량 / 매출을 미리 더해 둔다.
+-- - Purchase.brid: 픽업 매장 (branch.br_seq, 없으면 집계에서 0 = 매장 미지정)
+-- - PurchaseItem.pcPrice: 주문 당시 단가 (없으면 집계 시점의 Product.basePrice)
+-- - SalesDaily: 집계 작업이 RollupWatermark('sales_daily') 이후 주문 항목만 읽어 더한다
+-- - idx_purchase_time_stamp: 정합성 확인(--check)이 원본을 기간으로 다시 셀 때 사용
+-- 006 을 먼저 적용해야 한다 (RollupWatermark).
+--
+-- 실행: mysql -u <user> -p shoes_shop_db < backend/database/migrations/007_sales_summary.sql
+
+ALTER TABLE Purchase
+    ADD COLUMN brid INT NULL,
+    ADD INDEX idx_purchase_brid (brid),
+    ADD INDEX idx_purchase_time_stamp (timeStamp),
+    ADD FOREIGN KEY (brid) REFERENCES branch(br_seq) ON DELETE SET NULL;
+
+ALTER TABLE PurchaseItem ADD COLUMN pcPrice INT NULL;
+
+CREATE TABLE SalesDaily (
+    day DATE NOT NULL,
+    brid INT NOT NULL DEFAULT 0,
+    pid INT NOT NULL,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, brid, pid),
+    INDEX idx_sales_daily_brid (brid, day),
+    INDEX idx_sales_daily_pid (pid, day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO RollupWatermark (name) VALUES ('sales_daily');
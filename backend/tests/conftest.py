@@ -0,0 +1,80 @@
+"""
+백엔드 테스트 공통 설정
+실행: cd backend && python -m pytest -q
+
+DB 없이 돌 수 있도록 app_basic 모듈을 그대로 import 하고,
+DB 연결 대신 FakeConnection(실행한 SQL 기록 + responder 로 결과 지정)을 넘긴다.
+커넥션 풀은 main.py lifespan 에서만 열리므로 import 만으로는 DB 에 연결하지 않는다.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app_basic"))
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def execute(self, sql, params=None):
+        self.conn.log.append((sql, params))
+        result = self.conn.responder(sql, params)
+        if isinstance(result, Exception):
+            raise result
+        self.rows = list(result or [])
+        self.rowcount = len(self.rows)
+        self.lastrowid = self.conn.lastrowid
+
+    def executemany(self, sql, seq):
+        seq = list(seq)
+        self.conn.log.append((sql, seq))
+        result = self.conn.responder(sql, seq)
+        if isinstance(result, Exception):
+            raise result
+        self.rows = []
+        self.rowcount = len(seq)
+
+    def mogrify(self, query, args=None):
+        if args is None:
+            return query
+        return query % tuple(repr(arg) for arg in args)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class FakeConnection:
+    """responder(sql, params) -> 결과 행 목록 (예외 객체를 돌려주면 그 예외를 던진다)"""
+
+    def __init__(self, responder=None):
+        self.responder = responder or (lambda sql, params: [])
+        self.log = []
+        self.commits = 0
+        self.lastrowid = None   # responder 가 INSERT 때 채운다 (cursor.lastrowid)
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_conn():
+    return FakeConnection()
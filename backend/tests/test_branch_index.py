@@ -0,0 +1,46 @@
+import random
+import time
+
+import pytest
+
+from branch_index import BranchIndex, haversine_km
+
+
+def seoul_index():
+    rng = random.Random(19)
+    index = BranchIndex()
+    for br_seq in range(1, 51):
+        lat = 37.45 + rng.random() * 0.25
+        lng = 126.85 + rng.random() * 0.35
+        index.upsert(br_seq, "02-000-0000", "서울", f"매장{br_seq}", lat, lng)
+    return index
+
+
+def brute_force(index, lat, lng, k, radius_km=None):
+    found = []
+    for branch in index._branches.values():
+        distance = haversine_km(lat, lng, branch['br_lat'], branch['br_lng'])
+        if radius_km is None or distance <= radius_km:
+            found.append((distance, branch['br_seq']))
+    return sorted(found)[:k]
+
+
+@pytest.mark.parametrize("lat, lng", [(37.55, 126.98), (37.3, 127.2), (0.0, 0.0), (-33.8, 151.2)])
+def test_nearest_matches_brute_force(lat, lng):
+    index = seoul_index()
+    result = [(distance, branch['br_seq']) for distance, branch in index.nearest(lat, lng, 5)]
+    assert result == brute_force(index, lat, lng, 5)
+
+
+def test_far_query_does_not_scan_every_ring():
+    index = seoul_index()
+    start = time.monotonic()
+    result = index.nearest(0.0, 0.0, 5)
+    assert time.monotonic() - start < 0.5
+    assert len(result) == 5
+
+
+def test_far_query_respects_radius():
+    index = seoul_index()
+    assert index.nearest(0.0, 0.0, 5, radius_km=100) == []
+    assert len(index.nearest(-33.8, 151.2, 5, radius_km=9000)) == 5
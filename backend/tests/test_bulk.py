@@ -0,0 +1,41 @@
+import re
+
+from database.bulk import insert_returning_ids
+from conftest import FakeConnection
+
+
+def auto_increment_conn(start=100):
+    """INSERT 문장마다 행 수만큼 id 를 할당하는 연결 (lastrowid = 문장의 첫 id)"""
+    state = {"next_id": start}
+    statements = []
+
+    def responder(sql, params):
+        if sql.startswith("INSERT"):
+            count = len(re.findall(r"'row-\d+'", sql))
+            statements.append(count)
+            conn.lastrowid = state["next_id"]
+            state["next_id"] += count
+        return []
+
+    conn = FakeConnection(responder)
+    return conn, statements
+
+
+def test_ids_follow_each_statement_when_split_by_size():
+    conn, statements = auto_increment_conn()
+    rows = [(f"row-{i}", "x" * 300) for i in range(20)]
+    ids = insert_returning_ids(conn.cursor(), "product", ("p_name", "p_description"), rows, max_bytes=2000)
+
+    # 여러 문장으로 나뉘었어도 행마다 자기 id
+    assert len(statements) > 1
+    assert sum(statements) == 20
+    assert ids == list(range(100, 120))
+    for sql, _ in conn.log:
+        assert len(sql.encode("utf-8")) <= 2000
+
+
+def test_single_statement_when_small():
+    conn, statements = auto_increment_conn(start=7)
+    ids = insert_returning_ids(conn.cursor(), "PurchaseItem", ("pid", "note"), [(1, "row-1"), (2, "row-2")])
+    assert statements == [2]
+    assert ids == [7, 8]
@@ -0,0 +1,47 @@
+import functools
+import re
+
+import purchase
+from database import bulk
+from conftest import FakeConnection
+
+
+def test_large_cart_item_ids_follow_each_insert_statement(monkeypatch):
+    # 문장 크기 제한을 작게 해서 주문 항목 INSERT 가 여러 문장으로 나뉘게 한다
+    monkeypatch.setattr(purchase, "insert_returning_ids",
+                        functools.partial(bulk.insert_returning_ids, max_bytes=400))
+    recorded = []
+    monkeypatch.setattr(purchase.bestsellers, "record", lambda conn, lines, day: recorded.append(lines))
+
+    pids = list(range(1, 31))
+    state = {"next_id": 500}
+    statements = []
+
+    def responder(sql, params):
+        if sql.lstrip().startswith("UPDATE Product"):
+            return [()] * len(pids)   # 재고 차감: 모든 줄 성공
+        if "basePrice" in sql:
+            return [(pid, 1000 + pid) for pid in pids]
+        if sql.startswith("INSERT INTO PurchaseItem"):
+            count = len(re.findall(r"'제품 준비 중'", sql))
+            statements.append(count)
+            conn.lastrowid = state["next_id"]
+            state["next_id"] += count + 7   # 다른 주문이 사이에 id 를 가져간 것처럼
+        elif "INSERT INTO Purchase" in sql:
+            conn.lastrowid = 42
+        return []
+
+    conn = FakeConnection(responder)
+    body = purchase.CheckoutModel(cid=1, items=[{"pid": pid, "pcQuantity": 1} for pid in pids])
+    response = purchase.checkout(body, conn=conn)
+
+    result = response["result"]
+    assert len(statements) > 1
+    expected, next_id = [], 500
+    for count in statements:
+        expected.extend(range(next_id, next_id + count))
+        next_id += count + 7
+    assert [item["id"] for item in result["items"]] == expected
+    assert [item["pcPrice"] for item in result["items"]] == [1000 + pid for pid in pids]
+    assert recorded == [[(pid, 1) for pid in pids]]
+    assert conn.commits == 1
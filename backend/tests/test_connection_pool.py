@@ -0,0 +1,62 @@
+import pytest
+
+from database import connection
+from database.connection import ConnectionPool
+
+
+class FakeRaw:
+    def __init__(self):
+        self.closed = False
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(connection.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(connection.pymysql, "connect", lambda **config: FakeRaw())
+    return now
+
+
+def make_pool():
+    return ConnectionPool({}, min_size=1, max_size=5, idle_timeout=10, max_lifetime=1000, ping_interval=1000)
+
+
+def test_release_closes_idle_connections_left_at_cold_end(clock):
+    pool = make_pool()
+    conns = [pool.acquire() for _ in range(3)]
+    raws = [conn._raw for conn in conns]
+    conns[0].close()
+    conns[1].close()
+
+    clock[0] += 20
+    conns[2].close()
+
+    # LIFO 라 다시 빌려 가지 않는 두 연결이 닫힌다 (min_size 는 남김)
+    assert [raw.closed for raw in raws] == [True, True, False]
+    assert pool.stats()["size"] == 1
+    assert pool.stats()["idle"] == 1
+
+
+def test_acquire_evicts_expired_idle_but_keeps_min_size(clock):
+    pool = make_pool()
+    conns = [pool.acquire() for _ in range(3)]
+    raws = [conn._raw for conn in conns]
+    for conn in conns:
+        conn.close()
+
+    clock[0] += 20
+    conn = pool.acquire()
+
+    assert conn._raw is raws[2]
+    assert [raw.closed for raw in raws] == [True, True, False]
+    assert pool.stats()["size"] == 1
+    assert pool.stats()["discarded"] == 2
@@ -0,0 +1,62 @@
+import glob
+import io
+import os
+
+import pytest
+
+import image_upload
+from blob_store import LocalBlobStore
+from image_upload import store_upload, sniff_image_type, UploadError
+from thumbnails import render
+
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "images")
+
+
+@pytest.fixture(autouse=True)
+def blob_root(tmp_path, monkeypatch):
+    # 업로드 임시 파일이 실제 app_basic/blobs 에 남지 않도록 저장소를 tmp_path 로
+    monkeypatch.setattr(image_upload, "blob_store", LocalBlobStore(str(tmp_path / "blobs")))
+    return tmp_path / "blobs"
+
+
+class Upload:
+    def __init__(self, data):
+        self.file = io.BytesIO(data)
+
+
+def test_heic_upload_is_rejected():
+    head = b"\x00\x00\x00\x18ftypheic\x00\x00\x00\x00"
+    assert sniff_image_type(head) == 'image/heic'
+    with pytest.raises(UploadError, match="HEIC"):
+        store_upload(Upload(head + b"\x00" * 64))
+
+
+def test_non_image_upload_is_rejected():
+    with pytest.raises(UploadError):
+        store_upload(Upload(b"%PDF-1.7\n" + b"\x00" * 64))
+
+
+PNG_HEAD = b"\x89PNG\r\n\x1a\n"
+
+
+def test_upload_is_stored_under_blob_root(blob_root):
+    digest = store_upload(Upload(PNG_HEAD + b"\x00" * 64))
+    assert os.path.exists(os.path.join(blob_root, digest[0:2], digest[2:4], digest))
+    assert os.listdir(blob_root / "tmp") == []
+
+
+def test_oversized_upload_leaves_no_temp_file(blob_root):
+    with pytest.raises(UploadError):
+        store_upload(Upload(PNG_HEAD + b"\x00" * 4096), max_bytes=1024)
+    assert os.listdir(blob_root / "tmp") == []
+
+
+def test_shipped_avif_images_render_thumbnails():
+    pytest.importorskip("PIL")
+    paths = sorted(glob.glob(os.path.join(IMAGES_DIR, "*", "*.avif")))
+    assert paths
+    with open(paths[0], "rb") as f:
+        data = f.read()
+    thumb = render(data, 96, 'jpeg', 80)
+    assert sniff_image_type(thumb[:16]) == 'image/jpeg'
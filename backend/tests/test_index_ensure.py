@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from bestseller import BestsellerIndex
+from branch_index import BranchIndex
+from facet_index import FacetIndex
+from conftest import FakeConnection
+from test_search_index import run_concurrently
+
+
+INDEXES = [FacetIndex, BranchIndex, BestsellerIndex]
+
+
+def slow_conn(builds):
+    def responder(sql, params):
+        builds.append(sql)
+        time.sleep(0.3)
+        return []
+    return FakeConnection(responder)
+
+
+@pytest.mark.parametrize("index_class", INDEXES)
+def test_stale_index_is_rebuilt_once(index_class):
+    index = index_class(rebuild_interval=60)
+    index.build(FakeConnection())
+    index._built_at -= 120   # 오래된 인덱스
+
+    builds = []
+    durations = run_concurrently(lambda: index.ensure(slow_conn(builds)))
+
+    assert len(builds) == 1
+    # 다시 만드는 요청 하나만 기다린다
+    assert sorted(durations)[-2] < 0.1
+
+
+@pytest.mark.parametrize("index_class", INDEXES)
+def test_cold_start_builds_once(index_class):
+    index = index_class(rebuild_interval=60)
+    builds = []
+    durations = run_concurrently(lambda: index.ensure(slow_conn(builds)))
+
+    assert len(builds) == 1
+    assert min(durations) > 0.2
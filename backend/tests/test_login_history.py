@@ -0,0 +1,34 @@
+import datetime
+import time
+
+import pytest
+
+import login_history
+
+
+@pytest.fixture
+def seoul_server(monkeypatch):
+    # 서버 시간대를 KST 로 고정
+    monkeypatch.setenv("TZ", "Asia/Seoul")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_offsets_are_converted_to_server_time(seoul_server):
+    parse = login_history.parse_login_time
+    assert parse("2026-01-01T09:00+09:00") == datetime.datetime(2026, 1, 1, 9, 0)
+    assert parse("2026-01-01T09:00Z") == datetime.datetime(2026, 1, 1, 18, 0)
+    assert parse("2026-01-01T09:00:00-05:00") == datetime.datetime(2026, 1, 1, 23, 0)
+    # 시간대가 없으면 이미 서버 시각
+    assert parse("2026-01-01 09:00") == datetime.datetime(2026, 1, 1, 9, 0)
+
+
+def test_range_bounds_with_offsets_are_converted(seoul_server, fake_conn):
+    from_time = datetime.datetime(2026, 1, 1, 0, 0, tzinfo=datetime.timezone.utc)
+    login_history.select_range(cid=None, status=None, from_time=from_time, to_time=None,
+                               after=None, limit=10, conn=fake_conn)
+    _, params = fake_conn.log[-1]
+    assert params[0] == datetime.datetime(2026, 1, 1, 9, 0)
+    assert params[0].tzinfo is None
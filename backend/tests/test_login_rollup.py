@@ -0,0 +1,57 @@
+import datetime
+
+import pytest
+
+import login_rollup
+import watermark
+from conftest import FakeConnection
+
+
+@pytest.fixture(autouse=True)
+def clear_gaps():
+    watermark._gaps.clear()
+    yield
+    watermark._gaps.clear()
+
+
+def test_refresh_step_stops_before_uncommitted_id():
+    # id 2 는 아직 커밋 전 -> 1 까지만 집계하고 워터마크도 1 로
+    def responder(sql, params):
+        if "FOR UPDATE" in sql:
+            return [(0,)]
+        if sql.startswith("SELECT id FROM LoginHistory"):
+            return [(1,), (3,)]
+        return []
+
+    conn = FakeConnection(responder)
+    assert login_rollup.refresh_step(conn, 100) == 1
+    aggregate = [params for sql, params in conn.log if "INSERT INTO LoginDailyRollup" in sql]
+    assert aggregate == [(0, 1)]
+    assert [params for sql, params in conn.log if "UPDATE RollupWatermark" in sql] == [(1, 'login_daily')]
+    assert conn.commits == 1
+
+
+def test_check_recent_repairs_mismatched_days():
+    day = datetime.date.today()
+    stale = day - datetime.timedelta(days=1)
+
+    def responder(sql, params):
+        if "FROM RollupWatermark" in sql:
+            return [(10,)]
+        if "FROM LoginDailyRollup" in sql:
+            # 어제 집계에 늦게 커밋된 이력 1건이 빠져 있다
+            return [(day, 1.0, 'OK', 3), (stale, 1.0, 'OK', 1)]
+        if "FROM LoginActiveDay" in sql:
+            return [(day, 2), (stale, 1)]
+        if "COUNT(DISTINCT cid)" in sql and "FROM LoginHistory" in sql:
+            return [(day, 2), (stale, 1)]
+        if "COUNT(*)" in sql and "FROM LoginHistory" in sql:
+            return [(day, 1.0, 'OK', 3), (stale, 1.0, 'OK', 2)]
+        return []
+
+    conn = FakeConnection(responder)
+    assert login_rollup.check_recent(conn, 7) == 1
+    deleted = [params for sql, params in conn.log if sql.startswith("DELETE FROM LoginDailyRollup")]
+    assert deleted == [(stale,)]
+    assert any("REPLACE INTO LoginDailyActive" in sql for sql, _ in conn.log)
+    assert conn.commits == 1
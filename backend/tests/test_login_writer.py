@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+
+import pymysql
+import pytest
+
+import login_writer
+from login_writer import LoginWriter
+from conftest import FakeConnection
+
+
+BAD_CID = 999
+
+
+def row(cid):
+    return (cid, "2026-10-18 10:00:00", "OK", 1.0, "seoul", "card")
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    conn = FakeConnection()
+    saved = []
+
+    def responder(sql, params):
+        if not sql.lstrip().startswith("INSERT INTO LoginHistory"):
+            return []
+        if conn.down:
+            return pymysql.err.OperationalError(2013, "Lost connection to MySQL server")
+        # 다중 행 INSERT 는 한 행이라도 FK 를 어기면 전체가 실패한다
+        if any(r[0] == BAD_CID for r in params):
+            return pymysql.err.IntegrityError(1452, "Cannot add or update a child row: a foreign key constraint fails")
+        saved.extend(params)
+        conn.lastrowid = len(saved)
+        return []
+
+    conn.responder = responder
+    conn.down = False
+
+    @contextmanager
+    def get_connection():
+        yield conn
+
+    monkeypatch.setattr(login_writer, "get_connection", get_connection)
+    w = LoginWriter(flush_interval_ms=200, batch_rows=500, max_queue=10000, max_retries=3)
+    w._thread = object()   # 스레드 없이 submit / flush 를 직접 호출
+    return w, conn, saved
+
+
+def test_invalid_cid_in_batch_does_not_block_valid_rows(writer):
+    w, conn, saved = writer
+    cids = [1, 2, 3, BAD_CID, 5, 6, 7, 8]
+    for cid in cids:
+        assert w.submit(row(cid))
+
+    assert w.flush() is True
+
+    assert sorted(r[0] for r in saved) == [cid for cid in cids if cid != BAD_CID]
+    stats = w.stats()
+    assert stats["pending"] == 0
+    assert stats["written"] == 7
+    assert stats["dead_lettered"] == 1
+    assert stats["failures"] == 0
+
+    # 다음 묶음은 다시 한 번에 저장된다
+    w.submit(row(9))
+    assert w.flush() is True
+    assert saved[-1][0] == 9
+
+
+def test_transient_failures_are_retried_then_capped(writer):
+    w, conn, saved = writer
+    conn.down = True
+    for cid in (1, 2, 3):
+        w.submit(row(cid))
+
+    # max_retries 번 실패하면 큐가 계속 자라지 않고 버린다
+    for _ in range(3):
+        assert w.flush() is False
+    stats = w.stats()
+    assert stats["pending"] == 0
+    assert stats["dropped"] == 3
+    assert saved == []
+
+
+def test_transient_failure_then_recovery_keeps_rows(writer):
+    w, conn, saved = writer
+    conn.down = True
+    for cid in (1, 2):
+        w.submit(row(cid))
+    assert w.flush() is False
+    assert w.stats()["pending"] == 2
+
+    conn.down = False
+    assert w.flush() is True
+    assert [r[0] for r in saved] == [1, 2]
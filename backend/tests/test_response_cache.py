@@ -0,0 +1,68 @@
+from response_cache import ResponseCache
+import product_gt
+from response_cache import product_cache
+from conftest import FakeConnection
+
+
+def test_set_after_invalidate_is_skipped():
+    cache = ResponseCache()
+    key = cache.make_key("select_products", after=None, limit=50)
+
+    # 요청 A: DB 를 읽기 전 세대를 받는다
+    generation = cache.generation()
+    # 그 사이에 수정 요청이 커밋 후 캐시를 비운다
+    cache.invalidate()
+    # 요청 A 가 수정 전에 읽은 응답을 저장하려 한다 -> 저장하지 않아야 한다
+    cache.set(key, {"results": ["old"]}, generation)
+
+    assert cache.get(key) is None
+    assert cache.stats()["stale_skips"] == 1
+
+    # 수정 후에 읽은 응답은 저장된다
+    cache.set(key, {"results": ["new"]}, cache.generation())
+    assert cache.get(key) == {"results": ["new"]}
+
+
+def test_select_products_does_not_cache_page_read_before_write(fake_conn):
+    product_cache.invalidate()
+
+    def responder(sql, params):
+        # 상품 목록을 읽는 동안 다른 요청의 수정이 커밋되고 캐시를 비운다
+        product_cache.invalidate()
+        return []
+
+    fake_conn.responder = responder
+    response = product_gt.select_all(after=None, limit=50, conn=fake_conn)
+    assert response == {"results": [], "next_cursor": None}
+
+    key = product_cache.make_key("select_products", after=None, limit=50)
+    assert product_cache.get(key) is None
+
+
+def test_search_read_during_product_update_is_not_cached(monkeypatch):
+    from search_index import SearchIndex
+
+    index = SearchIndex()
+    index.build(FakeConnection(lambda sql, params: [(1, "에어맥스", "러닝화", 1, 1, 1)]))
+    monkeypatch.setattr(product_gt, "search_index", index)
+    monkeypatch.setattr(product_gt.facet_index, "upsert", lambda *args: None)
+    product_cache.invalidate()
+    key = product_cache.make_key("select_search", kwds="에어맥스", after=None, limit=50)
+    reader = FakeConnection()
+    upsert = index.upsert
+
+    def upsert_with_concurrent_search(*args):
+        # 수정 요청이 커밋한 뒤 인덱스를 바꾸기 전에 검색이 옛 인덱스로 응답을 만든다
+        product_gt.select_search(
+            maker=None, kwds="에어맥스", color=None, kc_name=None, after=None, limit=50, conn=reader)
+        upsert(*args)
+
+    monkeypatch.setattr(index, "upsert", upsert_with_concurrent_search)
+    response = product_gt.update_one(
+        item_id=1, kc_seq=1, cc_seq=1, sc_seq=1, gc_seq=1, m_seq=1, p_name="조던", p_price=1000,
+        p_stock=1, p_image="", p_description="농구화", conn=FakeConnection())
+
+    assert response == {"result": "OK"}
+    assert any("p_seq" in sql for sql, _ in reader.log)
+    assert product_cache.get(key) is None
+    assert index.search(["에어맥스"]) == []
@@ -0,0 +1,7 @@
+import main
+
+
+def test_no_template_placeholder_routes_are_mounted():
+    paths = list(main.app.openapi()["paths"])
+    assert "/select_refunds" in paths
+    assert not [path for path in paths if "[테이블명]" in path]
@@ -0,0 +1,48 @@
+import datetime
+
+import pytest
+
+import sales_rollup
+import watermark
+from conftest import FakeConnection
+
+
+@pytest.fixture(autouse=True)
+def clear_gaps():
+    watermark._gaps.clear()
+    yield
+    watermark._gaps.clear()
+
+
+def test_refresh_step_stops_before_uncommitted_id():
+    # PurchaseItem id 6 은 아직 커밋 전 -> 5 까지만 집계
+    def responder(sql, params):
+        if "FOR UPDATE" in sql:
+            return [(3,)]
+        if sql.startswith("SELECT id FROM PurchaseItem"):
+            return [(4,), (5,), (7,)]
+        return []
+
+    conn = FakeConnection(responder)
+    assert sales_rollup.refresh_step(conn, 100) == 2
+    assert [params for sql, params in conn.log if "INSERT INTO SalesDaily" in sql] == [(3, 5)]
+    assert [params for sql, params in conn.log if "UPDATE RollupWatermark" in sql] == [(5, 'sales_daily')]
+
+
+def test_check_recent_repairs_mismatched_days():
+    day = datetime.date.today()
+
+    def responder(sql, params):
+        if "FROM RollupWatermark" in sql:
+            return [(10,)]
+        if "FROM SalesDaily" in sql:
+            return [(day, 1, 7, 2, 2000)]
+        if "FROM PurchaseItem" in sql:
+            return [(day, 1, 7, 3, 3000)]
+        return []
+
+    conn = FakeConnection(responder)
+    assert sales_rollup.check_recent(conn, 7) == 1
+    assert [params for sql, params in conn.log if sql.startswith("DELETE FROM SalesDaily")] == [(day,)]
+    assert any("INSERT INTO SalesDaily" in sql for sql, _ in conn.log)
+    assert conn.commits == 1
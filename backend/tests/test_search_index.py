@@ -0,0 +1,60 @@
+import threading
+import time
+
+from search_index import SearchIndex
+from conftest import FakeConnection
+
+
+PRODUCT_ROWS = [(1, "에어맥스 90", "러닝화", 1, 1, 1), (2, "조던 1", "농구화", 2, 1, 2)]
+
+
+def slow_conn(builds):
+    def responder(sql, params):
+        builds.append(time.monotonic())
+        time.sleep(0.3)
+        return PRODUCT_ROWS
+    return FakeConnection(responder)
+
+
+def run_concurrently(fn, count=8):
+    durations = []
+    lock = threading.Lock()
+
+    def call():
+        start = time.monotonic()
+        fn()
+        with lock:
+            durations.append(time.monotonic() - start)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return durations
+
+
+def test_stale_index_is_rebuilt_once_while_others_keep_serving():
+    index = SearchIndex(rebuild_interval=60)
+    index.build(FakeConnection(lambda sql, params: PRODUCT_ROWS))
+    index._built_at -= 120   # 오래된 인덱스
+
+    builds = []
+    conn = slow_conn(builds)
+    durations = run_concurrently(lambda: index.ensure(conn))
+
+    assert len(builds) == 1
+    # 다시 만드는 요청 하나만 기다리고 나머지는 바로 기존 인덱스로 돌아간다
+    assert sorted(durations)[-2] < 0.1
+    assert index.search(["맥스"]) == [1]
+
+
+def test_cold_start_builds_once_and_everyone_waits_for_it():
+    index = SearchIndex(rebuild_interval=60)
+    builds = []
+    conn = slow_conn(builds)
+    results = []
+    run_concurrently(lambda: (index.ensure(conn), results.append(index.search(["조던"]))))
+
+    assert len(builds) == 1
+    assert results == [[2]] * 8
@@ -0,0 +1,52 @@
+import pytest
+
+import watermark
+from watermark import next_upto
+from conftest import FakeConnection
+
+
+@pytest.fixture(autouse=True)
+def clear_gaps():
+    watermark._gaps.clear()
+    yield
+    watermark._gaps.clear()
+
+
+def cursor_with(ids):
+    conn = FakeConnection(lambda sql, params: [(i,) for i in ids if i > params[0]][:params[1]])
+    return conn.cursor()
+
+
+def test_contiguous_ids_advance_to_last():
+    assert next_upto(cursor_with([1, 2, 3]), 'test', 'T', 0, 10, lag=30, now=0) == (3, 3)
+
+
+def test_gap_stops_until_lag_passes():
+    # id 3 이 아직 커밋 전 (4, 5 만 보인다)
+    curs = cursor_with([1, 2, 4, 5])
+    assert next_upto(curs, 'test', 'T', 0, 10, lag=30, now=100) == (2, 2)
+    assert next_upto(curs, 'test', 'T', 2, 10, lag=30, now=120) == (2, 0)
+    # lag 가 지나면 롤백된 id 로 보고 넘어간다
+    assert next_upto(curs, 'test', 'T', 2, 10, lag=30, now=130) == (5, 2)
+    assert watermark._gaps == {}
+
+
+def test_late_commit_inside_lag_is_included():
+    ids = [1, 2, 4]
+    curs = cursor_with(ids)
+    assert next_upto(curs, 'test', 'T', 0, 10, lag=30, now=100) == (2, 2)
+    ids.insert(2, 3)
+    assert next_upto(curs, 'test', 'T', 2, 10, lag=30, now=110) == (4, 2)
+    assert watermark._gaps == {}
+
+
+def test_batch_limits_rows():
+    assert next_upto(cursor_with(range(1, 100)), 'test', 'T', 10, 5, lag=30, now=0) == (15, 5)
+
+
+def test_many_gaps_in_one_batch_wait_for_one_lag():
+    # 3, 5, 7 이 롤백됐다 -> lag 한 번 뒤에 한 번에 넘어간다
+    curs = cursor_with([1, 2, 4, 6, 8, 9])
+    assert next_upto(curs, 'test', 'T', 0, 10, lag=30, now=100) == (2, 2)
+    assert next_upto(curs, 'test', 'T', 2, 10, lag=30, now=130) == (9, 4)
+    assert watermark._gaps == {}